@@ -0,0 +1 @@
+spotinst_controller.py
\ No newline at end of file
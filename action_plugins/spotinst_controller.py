@@ -0,0 +1,189 @@
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+# Runs the spotinst modules in-process on the controller.
+#
+# The modules only talk to the Spotinst API, so instead of packaging them with AnsiballZ and
+# starting a new interpreter for every task, the module source is loaded once per controller
+# process and its main() is called with a controller side stand-in for AnsibleModule.
+# The loaded modules and their API clients are kept for the life of the process, so the items
+# of a loop share them.
+#
+# Every action plugin of a spotinst module (spotinst_aws_elastigroup.py, ...) is a link to this file,
+# the module to run is the action of the task.
+# By default only the tasks with a local connection (localhost, or delegated to it) run on the controller,
+# the others run on their host the usual way, where their credentials_path and output files are.
+# Set the spotinst_controller_execution variable to true or false to choose for every host.
+
+import importlib.util
+import os
+import shutil
+import traceback
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.errors import UnsupportedError
+from ansible.module_utils.common.parameters import remove_values
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.utils.display import Display
+
+display = Display()
+
+# loaded module source and API clients by module name, shared by the tasks run in this process
+_MODULES = dict()
+_CLIENTS = dict()
+
+
+class ControllerModuleExit(Exception):
+
+    def __init__(self, result, no_log_values):
+        super(ControllerModuleExit, self).__init__(result.get('msg'))
+        self.result = result
+        self.no_log_values = no_log_values
+
+
+class ControllerModule(object):
+    """
+    Stand-in for AnsibleModule that validates the task args with the argument spec of the module
+    and hands the result of exit_json/fail_json back to the action plugin.
+    """
+
+    module_name = None
+    task_args = dict()
+    task_check_mode = False
+
+    def __init__(self, argument_spec, supports_check_mode=False, mutually_exclusive=None, required_together=None,
+                 required_one_of=None, required_if=None, required_by=None, **kwargs):
+        self.no_log_values = set()
+        self.check_mode = self.task_check_mode
+
+        validator = ArgumentSpecValidator(argument_spec,
+                                          mutually_exclusive=mutually_exclusive,
+                                          required_together=required_together,
+                                          required_one_of=required_one_of,
+                                          required_if=required_if,
+                                          required_by=required_by)
+        validation_result = validator.validate(dict(self.task_args))
+
+        self.no_log_values = validation_result._no_log_values
+        self.params = validation_result.validated_parameters
+        # the user input as it was given, see SpotAnsibleModule
+        self.custom_params = dict(self.task_args)
+
+        # fail with the messages of AnsibleModule
+        if validation_result.error_messages:
+            msg = validation_result.errors.msg
+            if isinstance(validation_result.errors[0], UnsupportedError):
+                msg = "Unsupported parameters for ({0}) module: {1}".format(self.module_name, msg)
+
+            self.fail_json(msg=msg)
+
+        if self.check_mode and not supports_check_mode:
+            self.exit_json(skipped=True, msg="remote module ({0}) does not support check mode".format(self.module_name))
+
+    def debug(self, msg):
+        display.debug(msg)
+
+    def warn(self, warning):
+        display.warning(warning)
+
+    def atomic_move(self, src, dest, unsafe_writes=False):
+        # like AnsibleModule, keep the mode of an existing dest and apply the umask to a new one
+        if os.path.exists(dest):
+            shutil.copymode(dest, src)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(src, 0o666 & ~umask)
+
+        os.rename(src, dest)
+
+    def exit_json(self, **kwargs):
+        kwargs.setdefault('changed', False)
+        kwargs['invocation'] = dict(module_args=self.params)
+
+        raise ControllerModuleExit(kwargs, self.no_log_values)
+
+    def fail_json(self, msg, **kwargs):
+        kwargs['failed'] = True
+        kwargs['msg'] = msg
+
+        self.exit_json(**kwargs)
+
+
+class ActionModule(ActionBase):
+
+    _supports_check_mode = True
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = task_vars or dict()
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        if not self._run_on_controller(task_vars):
+            result.update(self._execute_module(module_name=self._task.action, task_vars=task_vars))
+            return result
+
+        module = self._load_module(self._task.action)
+        module_class = type('ControllerModule', (ControllerModule,),
+                            dict(module_name=self._task.action.split('.')[-1], task_args=self._task.args,
+                                 task_check_mode=bool(self._task.check_mode)))
+
+        # the modules build their AnsibleModule (or a subclass of it) in main()
+        module.AnsibleModule = module_class
+        if hasattr(module, 'SpotAnsibleModule'):
+            module.SpotAnsibleModule = module_class
+
+        try:
+            module.main()
+        except ControllerModuleExit as exit_result:
+            result.update(remove_values(exit_result.result, exit_result.no_log_values))
+        except Exception as exc:
+            result.update(failed=True, msg="{0} failed on the controller: {1}".format(self._task.action, exc),
+                          exception=traceback.format_exc())
+        else:
+            result.update(failed=True, msg="{0} did not return a result".format(self._task.action))
+
+        return result
+
+    def _run_on_controller(self, task_vars):
+        controller_execution = task_vars.get('spotinst_controller_execution')
+
+        if controller_execution is None:
+            # the module reads credentials_path and writes its files on the host it runs on
+            return getattr(self._connection, 'transport', None) == 'local'
+
+        return boolean(controller_execution, strict=False)
+
+    def _load_module(self, name):
+        module_name = name.split('.')[-1]
+
+        if module_name not in _MODULES:
+            path = self._shared_loader_obj.module_loader.find_plugin(name)
+            if path is None:
+                raise AnsibleError("Could not find the {0} module to run on the controller".format(name))
+
+            spec = importlib.util.spec_from_file_location("spotinst_controller_" + module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            module.get_client = cache_client(module_name, module.get_client)
+            _MODULES[module_name] = module
+
+        return _MODULES[module_name]
+
+
+def cache_client(module_name, get_client):
+    def get_cached_client(module):
+        key = (module_name, module.params.get('token'), module.params.get('account_id'),
+               module.params.get('credentials_path'))
+
+        if key not in _CLIENTS:
+            _CLIENTS[key] = get_client(module=module)
+
+        return _CLIENTS[key]
+
+    return get_cached_client
@@ -0,0 +1,93 @@
+"""
+Memory/CPU comparison of preparing a managed instance update payload.
+
+Compares the previous approach (`copy.deepcopy` of the whole `managed_instance` param, then
+deleting the `do_not_update` paths in place) with `clean_do_not_update_fields`, which only
+copies the dicts along the removed paths.
+
+    python benchmarks/bench_managed_instance_memory.py
+"""
+import copy
+import sys
+import time
+import tracemalloc
+
+from mock import MagicMock
+
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst.spotinst_aws_managed_instance import clean_do_not_update_fields
+
+USER_DATA_SIZE = 64 * 1024
+RECORD_SETS = 2000
+ROUNDS = 50
+
+DO_NOT_UPDATE = ['compute.product', 'compute.launch_specification.image_id', 'strategy.revert_to_spot']
+
+
+def build_managed_instance():
+    record_sets = [dict(name='record-{}.example.com'.format(i), use_public_ip=True, use_public_dns=False)
+                   for i in range(RECORD_SETS)]
+
+    return dict(
+        name='mi-benchmark',
+        region='us-west-2',
+        strategy=dict(life_cycle='spot', revert_to_spot=dict(perform_at='always')),
+        compute=dict(
+            product='Linux/UNIX',
+            subnet_ids=['subnet-{}'.format(i) for i in range(16)],
+            launch_specification=dict(
+                image_id='ami-123456',
+                user_data='#!/bin/bash\n' + 'x' * USER_DATA_SIZE,
+                shutdown_script='#!/bin/bash\n' + 'y' * USER_DATA_SIZE,
+                instance_types=dict(types=['t3.micro', 't3.small'], preferred_type='t3.micro'),
+                security_group_ids=['sg-123456'])),
+        integrations=dict(route53=dict(domains=[dict(hosted_zone_id='Z1', record_set_type='a',
+                                                     record_sets=record_sets)])))
+
+
+def deepcopy_and_prune(managed_instance, do_not_update_list):
+    ret_val = copy.deepcopy(managed_instance)
+
+    for dotted_path in sorted(do_not_update_list, key=len, reverse=True):
+        curr_dict = ret_val
+        path_as_list = dotted_path.split('.')
+
+        for path_part in path_as_list[:-1]:
+            curr_dict = curr_dict.get(path_part)
+
+        if curr_dict.get(path_as_list[-1]) is not None:
+            del curr_dict[path_as_list[-1]]
+
+    return ret_val
+
+
+def measure(func, managed_instance):
+    tracemalloc.start()
+    result = func(managed_instance, DO_NOT_UPDATE)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(managed_instance, DO_NOT_UPDATE)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+
+    return peak, elapsed
+
+
+def main():
+    managed_instance = build_managed_instance()
+
+    assert deepcopy_and_prune(managed_instance, DO_NOT_UPDATE) == \
+        clean_do_not_update_fields(managed_instance, DO_NOT_UPDATE)
+
+    for label, func in (('deepcopy + prune', deepcopy_and_prune),
+                        ('structural sharing', clean_do_not_update_fields)):
+        peak, elapsed = measure(func, managed_instance)
+        print('{:<20} peak {:>10.1f} KiB   {:>9.3f} ms/op'.format(label, peak / 1024.0, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""
+Benchmark suite of the request building, name lookup and wait paths of the modules.
+
+Every case is timed over several rounds and its median time per call is compared with
+`baseline.json`. A case slower than its baseline by more than the threshold is reported as
+a regression and the run exits with status 1.
+
+    python benchmarks/bench_suite.py                    # compare with the stored baselines
+    python benchmarks/bench_suite.py -k lookup          # only the cases matching "lookup"
+    python benchmarks/bench_suite.py --save             # store the current timings as baselines
+    python benchmarks/bench_suite.py --threshold 1.25   # fail on a 25% slowdown
+
+Baselines are machine dependent, re-save them when moving to another machine.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from mock import patch
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from ansible.modules.cloud.spotinst import spotinst_aws_elastigroup, spotinst_aws_elastigroup_schedule_analyzer, \
+    spotinst_aws_managed_instance, spotinst_event_subscription, spotinst_mrscaler, spotinst_ocean_cloud
+from test.spot_api_server import SpotApiServer, redirect_requests
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 1.5
+ROUNDS = 7
+MIN_ROUND_TIME = 0.05
+
+LIST_SIZE = 200
+LOOKUP_SIZE = 10000
+
+CASES = []
+
+
+class MockModule:
+
+    def __init__(self, input_dict):
+        self.params = input_dict
+
+
+def benchmark(name):
+    """Register a case. The decorated function runs its setup and returns the callable to time"""
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+
+    return register
+
+
+# region Cases
+@benchmark("expand_elastigroup")
+def bench_expand_elastigroup():
+    module = MockModule(input_dict=dict(
+        name="bench-group",
+        min_size=0,
+        max_size=100,
+        target=10,
+        product="Linux/UNIX",
+        image_id="ami-123456",
+        on_demand_instance_type="c5.large",
+        spot_instance_types=["c5.large", "m5.large", "r5.large"],
+        availability_zones=[dict(name="us-west-2{0}".format(zone), subnet_ids=["subnet-{0}".format(zone)])
+                            for zone in "abcd"],
+        security_group_ids=["sg-{0}".format(index) for index in range(16)],
+        tags=[{"tag-{0}".format(index): "value-{0}".format(index)} for index in range(LIST_SIZE)],
+        block_device_mappings=[dict(device_name="/dev/xvd{0}".format(index), ebs=dict(
+            delete_on_termination=True, volume_size=100, volume_type="gp2")) for index in range(LIST_SIZE)],
+        network_interfaces=[dict(device_index=index, associate_public_ip_address=False, delete_on_termination=True)
+                            for index in range(LIST_SIZE)],
+        up_scaling_policies=[dict(policy_name="up-{0}".format(index), namespace="AWS/EC2",
+                                  metric_name="CPUUtilization", statistic="average", evaluation_periods=3,
+                                  period=300, threshold=80, cooldown=300, unit="percent", operator="gte",
+                                  action_type="adjustment", adjustment=1) for index in range(LIST_SIZE)],
+        down_scaling_policies=[dict(policy_name="down-{0}".format(index), namespace="AWS/EC2",
+                                    metric_name="CPUUtilization", statistic="average", evaluation_periods=3,
+                                    period=300, threshold=20, cooldown=300, unit="percent", operator="lte",
+                                    action_type="adjustment", adjustment=1) for index in range(LIST_SIZE)],
+        target_tracking_policies=[dict(policy_name="target-{0}".format(index), namespace="AWS/EC2",
+                                       source="cloudWatch", metric_name="CPUUtilization", statistic="average",
+                                       unit="percent", cooldown=300, target=50) for index in range(LIST_SIZE)]))
+
+    return lambda: spotinst_aws_elastigroup.expand_elastigroup(module=module, is_update=False)
+
+
+@benchmark("turn_to_model")
+def bench_turn_to_model():
+    managed_instance = dict(
+        name="bench-mi",
+        region="us-west-2",
+        persistence=dict(persist_block_devices=True, persist_root_device=True, block_devices_mode="onLaunch"),
+        strategy=dict(life_cycle="spot", revert_to_spot=dict(perform_at="always")),
+        health_check=dict(type="EC2", grace_period=120, unhealthy_duration=120),
+        compute=dict(
+            product="Linux/UNIX",
+            subnet_ids=["subnet-{0}".format(index) for index in range(16)],
+            vpc_id="vpc-123456",
+            launch_specification=dict(
+                image_id="ami-123456",
+                instance_types=dict(types=["t3.micro", "t3.small"], preferred_type="t3.micro"),
+                security_group_ids=["sg-123456"])),
+        scheduling=dict(tasks=[dict(is_enabled=True, frequency="weekly", task_type="pause",
+                                    start_time="2050-01-01T00:00:00Z") for _ in range(LIST_SIZE)]),
+        integrations=dict(
+            route53=dict(domains=[dict(hosted_zone_id="Z{0}".format(domain), record_set_type="a", record_sets=[
+                dict(name="record-{0}.example.com".format(index), use_public_ip=True) for index in range(LIST_SIZE)])
+                for domain in range(4)]),
+            load_balancers_config=dict(load_balancers=[dict(name="lb-{0}".format(index), type="TARGET_GROUP",
+                                                            arn="arn:aws:elasticloadbalancing:lb-{0}".format(index))
+                                                       for index in range(LIST_SIZE)])))
+
+    return lambda: spotinst_aws_managed_instance.turn_to_model(managed_instance, "managed_instance")
+
+
+@benchmark("expand_emr_request")
+def bench_expand_emr_request():
+    module = MockModule(input_dict=dict(
+        name="bench-emr",
+        region="us-west-2",
+        strategy=dict(new=dict(release_label="emr-5.17.0", number_of_retries=1)),
+        compute=dict(
+            availability_zones=[dict(name="us-west-2{0}".format(zone), subnet_id="subnet-{0}".format(zone))
+                                for zone in "abcd"],
+            applications=[dict(name="application-{0}".format(index), version="1.0") for index in range(LIST_SIZE)],
+            instance_groups=dict(
+                master_group=dict(instance_types=["m5.xlarge"], target=1, life_cycle="ON_DEMAND"),
+                core_group=dict(instance_types=["m5.xlarge", "m4.xlarge"], target=2, life_cycle="SPOT"),
+                task_group=dict(instance_types=["c5.{0}xlarge".format(size) for size in (2, 4, 9, 18)],
+                                capacity=dict(minimum=0, maximum=100, target=10), life_cycle="SPOT"))),
+        scaling=dict(
+            up=[dict(policy_name="up-{0}".format(index), metric_name="YARNMemoryAvailablePercentage",
+                     statistic="average", unit="percent", threshold=20, adjustment=1, namespace="AWS/ElasticMapReduce",
+                     period=300, evaluation_periods=3, cooldown=300, operator="lte") for index in range(LIST_SIZE)],
+            down=[dict(policy_name="down-{0}".format(index), metric_name="YARNMemoryAvailablePercentage",
+                       statistic="average", unit="percent", threshold=80, adjustment=1,
+                       namespace="AWS/ElasticMapReduce", period=300, evaluation_periods=3, cooldown=300,
+                       operator="gte") for index in range(LIST_SIZE)])))
+
+    return lambda: spotinst_mrscaler.expand_emr_request(module=module, is_update=False)
+
+
+@benchmark("expand_ocean_request")
+def bench_expand_ocean_request():
+    module = MockModule(input_dict=dict(
+        name="bench-ocean",
+        controller_cluster_id="bench-ocean",
+        region="us-west-2",
+        auto_scaler=dict(is_enabled=True, cooldown=180, resource_limits=dict(max_memory_gib=1500, max_vCpu=750),
+                         down=dict(evaluation_periods=3),
+                         headroom=dict(cpu_per_unit=2000, memory_per_unit=0, num_of_units=4)),
+        capacity=dict(minimum=0, maximum=100, target=10),
+        strategy=dict(utilize_reserved_instances=False, fallback_to_od=True, spot_percentage=100),
+        compute=dict(
+            instance_types=dict(whitelist=["c5.{0}xlarge".format(index) for index in range(LIST_SIZE)]),
+            subnet_ids=["subnet-{0}".format(index) for index in range(16)],
+            launch_specification=dict(
+                security_group_ids=["sg-123456"],
+                image_id="ami-123456",
+                key_pair="bench",
+                user_data="#!/bin/bash\n" + "x" * 16 * 1024,
+                tags=[dict(tag_key="tag-{0}".format(index), tag_value="value") for index in range(LIST_SIZE)]))))
+
+    return lambda: spotinst_ocean_cloud.expand_ocean_request(module=module, is_update=False)
+
+
+@benchmark("lookup_group_by_name")
+def bench_lookup_group_by_name():
+    groups = [dict(id="sig-{0:08x}".format(index), name="group-{0}".format(index)) for index in range(LOOKUP_SIZE)]
+
+    return lambda: spotinst_aws_elastigroup.find_group_with_same_name(groups=groups, name="group-missing")
+
+
+@benchmark("lookup_ocean_by_name")
+def bench_lookup_ocean_by_name():
+    clusters = [dict(id="o-{0:08x}".format(index), name="ocean-{0}".format(index)) for index in range(LOOKUP_SIZE)]
+
+    return lambda: spotinst_ocean_cloud.find_clusters_with_same_name(clusters=clusters, name="ocean-missing")
+
+
+@benchmark("lookup_emr_by_name")
+def bench_lookup_emr_by_name():
+    clusters = [dict(id="simrs-{0:08x}".format(index), name="emr-{0}".format(index)) for index in range(LOOKUP_SIZE)]
+
+    return lambda: spotinst_mrscaler.find_clusters_with_same_name(clusters=clusters, name="emr-missing")
+
+
+@benchmark("lookup_managed_instance_by_name")
+def bench_lookup_managed_instance_by_name():
+    managed_instances = [dict(id="smi-{0:08x}".format(index), config=dict(name="mi-{0}".format(index)))
+                         for index in range(LOOKUP_SIZE)]
+
+    return lambda: spotinst_aws_managed_instance.find_mis_with_same_name(managed_instances=managed_instances,
+                                                                         name="mi-missing")
+
+
+@benchmark("lookup_event_subscription")
+def bench_lookup_event_subscription():
+    subscriptions = [dict(id="sis-{0:08x}".format(index), resource_id="sig-{0:08x}".format(index),
+                          event_type="GROUP_UPDATED", protocol="web", endpoint="https://webhook.com")
+                     for index in range(LOOKUP_SIZE)]
+    desired = dict(resource_id="sig-missing", event_type="GROUP_UPDATED", protocol="web",
+                   endpoint="https://webhook.com")
+
+    def lookup():
+        subscriptions_index = spotinst_event_subscription.index_subscriptions(subscriptions)
+        return spotinst_event_subscription.find_request_type_and_id(subscription=desired, state="present",
+                                                                    subscriptions_index=subscriptions_index)
+
+    return lookup
+
+
+@benchmark("retrieve_group_instances")
+def bench_retrieve_group_instances():
+    from spotinst_sdk2 import SpotinstSession
+
+    server = SpotApiServer(fleet_size=1, latency=0.001).start()
+    group_id = server.state.list("group")[0]["id"]
+    server.state.update("group", group_id, dict(capacity=dict(maximum=100, target=100)))
+    module = MockModule(input_dict=dict(wait_for_instances=True, wait_timeout=60, target=100, state="present",
+                                        health_check_type=None))
+
+    def retrieve():
+        with redirect_requests(server.url), patch("time.sleep"):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+            return spotinst_aws_elastigroup.retrieve_group_instances(client=client, module=module, group_id=group_id)
+
+    return retrieve
+
+
+@benchmark("analyze_schedules")
+def bench_analyze_schedules():
+    from datetime import datetime, timedelta
+
+    groups = [dict(name="group-{0}".format(index), min_size=1, max_size=10, target=2,
+                   scheduled_tasks=[
+                       dict(task_type="scale", cron_expression="0 {0} * * MON-FRI".format(index % 12),
+                            scale_min_capacity=4, scale_target_capacity=6),
+                       dict(task_type="scale", cron_expression="0 20 * * MON-FRI", scale_min_capacity=1,
+                            scale_target_capacity=2),
+                       dict(task_type="scaleUp", frequency="hourly", adjustment=1)],
+                   up_scaling_policies=[dict(policy_name="scale-up", action_type="setMinTarget",
+                                             min_target_capacity=8)])
+              for index in range(LIST_SIZE)]
+    start = datetime(2020, 1, 5)
+
+    def analyze():
+        return spotinst_aws_elastigroup_schedule_analyzer.analyze_groups(groups=groups, start=start,
+                                                                         end=start + timedelta(days=7))
+
+    return analyze
+# endregion
+
+
+# region Runner
+def time_case(func):
+    # calibrate the number of calls so that a round takes at least MIN_ROUND_TIME
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= MIN_ROUND_TIME:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    for _ in range(ROUNDS - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return dict(median=statistics.median(timings), min=min(timings), calls=number)
+
+
+def load_baselines(path):
+    try:
+        with open(path, "r") as baseline_file:
+            return json.load(baseline_file)
+    except (IOError, ValueError):
+        return dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="keyword", default="", help="only run the cases whose name contains keyword")
+    parser.add_argument("--save", action="store_true", help="store the timings as the new baselines")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio over the baseline reported as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baseline)
+    results = dict()
+    regressions = []
+
+    for name, setup in CASES:
+        if args.keyword not in name:
+            continue
+
+        result = results[name] = time_case(setup())
+        baseline = baselines.get(name)
+
+        if baseline is None:
+            comparison = "no baseline"
+        else:
+            ratio = result["median"] / baseline["median"]
+            comparison = "{0:.2f}x baseline".format(ratio)
+            if ratio > args.threshold:
+                comparison += "  REGRESSION"
+                regressions.append(name)
+
+        print("{0:<34} {1:>12.3f} ms/call   {2}".format(name, result["median"] * 1000, comparison))
+
+    if args.save:
+        baselines.update(results)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print("Saved {0} baselines to {1}".format(len(results), args.baseline))
+    elif regressions:
+        print("{0} regressions over the {1}x threshold: {2}".format(
+            len(regressions), args.threshold, ", ".join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
+# endregion
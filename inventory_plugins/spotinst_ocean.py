@@ -0,0 +1,219 @@
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+name: spotinst_ocean
+plugin_type: inventory
+short_description: Spotinst Ocean nodes inventory source
+author: Spotinst (@jeffnoehren)
+description:
+  - Get the nodes of Spotinst Ocean clusters as inventory hosts.
+  - Hosts are grouped by cluster, by launch specification and by instance type.
+  - Launch specifications and nodes of all the clusters are fetched in parallel.
+  - Uses a YAML configuration file that ends with C(spotinst_ocean.yml) or C(spotinst_ocean.yaml).
+requirements:
+  - python >= 2.7
+  - spotinst_sdk >= 1.0.44
+extends_documentation_fragment:
+  - constructed
+  - inventory_cache
+options:
+  plugin:
+    description: Token that ensures this is a source file for the plugin.
+    required: true
+    choices: ['spotinst_ocean']
+  token:
+    description:
+      - Spotinst API Token. By default this is retrieved from the credentials path
+    env:
+      - name: SPOTINST_TOKEN
+  account_id:
+    description:
+      - Spotinst account id. By default this is retrieved from the credentials path
+    env:
+      - name: SPOTINST_ACCOUNT_ID
+  credentials_path:
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+    default: "~/.spotinst/credentials"
+  cluster_ids:
+    description:
+      - Only add the nodes of these Ocean clusters. By default the nodes of all the clusters are added
+    type: list
+    default: []
+  hostname:
+    description:
+      - Node attribute used as the inventory hostname
+    choices: ['instance_id', 'private_ip', 'public_ip', 'node_name']
+    default: instance_id
+  max_workers:
+    description:
+      - Maximum number of concurrent API requests
+    type: int
+    default: 10
+"""
+EXAMPLES = """
+# spotinst_ocean.yml
+plugin: spotinst_ocean
+cluster_ids:
+  - o-d861f48d
+hostname: private_ip
+cache: true
+cache_timeout: 300
+keyed_groups:
+  - key: life_cycle
+    prefix: life_cycle
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+try:
+    import spotinst_sdk as spotinst
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    HAS_SPOTINST_SDK = False
+
+OCEAN_BASE_URL = "https://api.spotinst.io/ocean/aws/k8s"
+
+DEFAULT_LAUNCH_SPEC = "default"
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'spotinst_ocean'
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('spotinst_ocean.yml', 'spotinst_ocean.yaml'))
+
+        return False
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+
+        if not HAS_SPOTINST_SDK:
+            raise AnsibleError("the Spotinst SDK library is required. (pip install spotinst_sdk)")
+
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+
+        clusters = None
+        if use_cache:
+            try:
+                clusters = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+
+        if clusters is None:
+            clusters = self._fetch_clusters()
+
+        if update_cache:
+            self._cache[cache_key] = clusters
+
+        self._populate(clusters)
+
+    def _get_client(self):
+        creds_file_loaded_vars = dict()
+        credentials_path = os.path.expanduser(self.get_option('credentials_path'))
+
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find('=')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+
+        token = self.get_option('token') or creds_file_loaded_vars.get("token")
+        account = self.get_option('account_id') or creds_file_loaded_vars.get("account")
+
+        if account is not None:
+            return spotinst.SpotinstClient(auth_token=token, account_id=account, print_output=False)
+
+        return spotinst.SpotinstClient(auth_token=token, print_output=False)
+
+    def _fetch_clusters(self):
+        client = self._get_client()
+        cluster_ids = self.get_option('cluster_ids')
+
+        try:
+            clusters = client.get_all_ocean_cluster()
+
+            if cluster_ids:
+                clusters = [cluster for cluster in clusters if cluster['id'] in cluster_ids]
+
+            with ThreadPoolExecutor(max_workers=self.get_option('max_workers')) as executor:
+                launch_spec_futures = [executor.submit(self._get_items, client, OCEAN_BASE_URL + "/launchSpec",
+                                                       dict(oceanId=cluster['id']))
+                                       for cluster in clusters]
+                node_futures = [executor.submit(self._get_items, client,
+                                                OCEAN_BASE_URL + "/cluster/" + cluster['id'] + "/nodes")
+                                for cluster in clusters]
+
+                for cluster, launch_spec_future, node_future in zip(clusters, launch_spec_futures, node_futures):
+                    cluster['launch_specs'] = launch_spec_future.result()
+                    cluster['nodes'] = node_future.result()
+        except spotinst.SpotinstClientException as exc:
+            raise AnsibleError("Error while attempting to get Ocean clusters: " + str(exc))
+
+        return clusters
+
+    @staticmethod
+    def _get_items(client, url, query_params=None):
+        response = client.send_get(url=url, entity_name="ocean", query_params=query_params)
+        formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+        return formatted_response["response"]["items"]
+
+    def _populate(self, clusters):
+        hostname = self.get_option('hostname')
+        strict = self.get_option('strict')
+
+        for cluster in clusters:
+            cluster_group = self.inventory.add_group(self._to_group_name('ocean', cluster['id']))
+            launch_spec_names = dict((launch_spec['id'], launch_spec.get('name'))
+                                     for launch_spec in cluster.get('launch_specs', []))
+
+            for node in cluster.get('nodes', []):
+                host = node.get(hostname) or node.get('instance_id')
+                if host is None:
+                    continue
+
+                launch_spec_id = node.get('launch_spec_id')
+                launch_spec = launch_spec_names.get(launch_spec_id) or launch_spec_id or DEFAULT_LAUNCH_SPEC
+
+                self.inventory.add_host(host, group=cluster_group)
+                self.inventory.add_child(self.inventory.add_group(self._to_group_name('launch_spec', launch_spec)),
+                                         host)
+
+                if node.get('instance_type') is not None:
+                    self.inventory.add_child(
+                        self.inventory.add_group(self._to_group_name('instance_type', node['instance_type'])), host)
+
+                for key, value in node.items():
+                    self.inventory.set_variable(host, key, value)
+                self.inventory.set_variable(host, 'ocean_id', cluster['id'])
+                self.inventory.set_variable(host, 'ocean_name', cluster.get('name'))
+
+                self._set_composite_vars(self.get_option('compose'), node, host, strict=strict)
+                self._add_host_to_composed_groups(self.get_option('groups'), node, host, strict=strict)
+                self._add_host_to_keyed_groups(self.get_option('keyed_groups'), node, host, strict=strict)
+
+    @staticmethod
+    def _to_group_name(prefix, value):
+        return re.sub(r'[^A-Za-z0-9_]', '_', "{0}_{1}".format(prefix, value))
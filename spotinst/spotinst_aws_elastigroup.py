@@ -525,7 +525,8 @@ options:
         frequency (String),
         grace_period (Integer),
         task_type (String, required),
-        is_enabled (Boolean)
+        is_enabled (Boolean),
+        start_time (String, ISO 8601 date to start the frequency based task at)
 
   security_group_ids:
     type: list
@@ -538,7 +539,7 @@ options:
     type: str
     description:
       - The Base64-encoded shutdown script that executes prior to instance termination.
-        Encode before setting.
+        Encode before setting. On update it is only sent when its content differs from the one of the group.
 
   signals:
     type: list
@@ -644,6 +645,7 @@ options:
         target (String),
         maximum (String),
         minimum (String),
+        source (String),
         shouldResumeStateful (Bool, relevant only for scale up policy)
 
   down_scaling_policies:
@@ -668,7 +670,8 @@ options:
         max_target_capacity (String),
         target (String),
         maximum (String),
-        minimum (String)
+        minimum (String),
+        source (String)
 
   target_tracking_policies:
     type: list
@@ -698,6 +701,7 @@ options:
     type: str
     description:
       - Base64-encoded MIME user data. Encode before setting the value.
+        On update it is only sent when its content differs from the one of the group.
 
   utilize_reserved_instances:
     type: bool
@@ -1001,6 +1005,9 @@ group_id:
 HAS_SPOTINST_SDK = False
 __metaclass__ = type
 
+import base64
+import binascii
+import hashlib
 import os
 import time
 from ansible.module_utils.basic import AnsibleModule
@@ -1016,245 +1023,381 @@ try:
 except ImportError:
     pass
 
-eni_fields = ('description',
-              'device_index',
-              'secondary_private_ip_address_count',
-              'associate_public_ip_address',
-              'delete_on_termination',
-              'groups',
-              'network_interface_id',
-              'private_ip_address',
-              'subnet_id',
-              'associate_ipv6_address')
-
-private_ip_fields = ('private_ip_address',
-                     'primary')
-
-capacity_fields = (dict(ansible_field_name='min_size',
-                        spotinst_field_name='minimum'),
-                   dict(ansible_field_name='max_size',
-                        spotinst_field_name='maximum'),
-                   'target',
-                   'unit')
-
-lspec_fields = ('user_data',
-                'key_pair',
-                'tenancy',
-                'shutdown_script',
-                'monitoring',
-                'ebs_optimized',
-                'image_id',
-                'health_check_type',
-                'health_check_grace_period',
-                'health_check_unhealthy_duration_before_replacement',
-                'security_group_ids')
-
-iam_fields = (dict(ansible_field_name='iam_role_name',
-                   spotinst_field_name='name'),
-              dict(ansible_field_name='iam_role_arn',
-                   spotinst_field_name='arn'))
-
-scheduled_task_fields = ('adjustment',
-                         'adjustment_percentage',
-                         'batch_size_percentage',
-                         'cron_expression',
-                         'frequency',
-                         'grace_period',
-                         'task_type',
-                         'is_enabled',
-                         'scale_target_capacity',
-                         'scale_min_capacity',
-                         'scale_max_capacity')
-
-scaling_policy_fields = ('policy_name',
-                         'namespace',
-                         'metric_name',
-                         'dimensions',
-                         'statistic',
-                         'evaluation_periods',
-                         'period',
-                         'threshold',
-                         'cooldown',
-                         'unit',
-                         'operator',
-                         'shouldResumeStateful')
-
-tracking_policy_fields = ('policy_name',
-                          'namespace',
-                          'source',
-                          'metric_name',
-                          'statistic',
-                          'unit',
-                          'cooldown',
-                          'target',
-                          'threshold')
-
-action_fields = (dict(ansible_field_name='action_type',
-                      spotinst_field_name='type'),
-                 'adjustment',
-                 'min_target_capacity',
-                 'max_target_capacity',
-                 'target',
-                 'minimum',
-                 'maximum')
-
-signal_fields = ('name',
-                 'timeout')
-
-multai_lb_fields = ('balancer_id',
-                    'project_id',
-                    'target_set_id',
-                    'az_awareness',
-                    'auto_weight')
-
-persistence_fields = ('should_persist_root_device',
-                      'should_persist_block_devices',
-                      'should_persist_private_ip',
-                      'block_devices_mode')
-
-revert_to_spot_fields = ('perform_at',
-                         'time_windows')
-
-elastic_beanstalk_platform_update_fields = ('perform_at',
-                                            'time_window',
-                                            'update_level')
-
-elastic_beanstalk_managed_actions_fields = ('platform_update')
-
-strategy_fields = ('risk',
-                   'utilize_reserved_instances',
-                   'fallback_to_od',
-                   'on_demand_count',
-                   'availability_vs_cost',
-                   'draining_timeout',
-                   'spin_up_time',
-                   'lifetime_period',
-                   'revert_to_spot')
-
-ebs_fields = ('delete_on_termination',
-              'encrypted',
-              'iops',
-              'snapshot_id',
-              'volume_type',
-              'volume_size')
-
-bdm_fields = ('device_name',
-              'virtual_name',
-              'no_device')
-
-
-kubernetes_fields = ('api_server',
-                     'token',
-                     'integration_mode',
-                     'cluster_identifier')
-
-kubernetes_auto_scale_fields = ('is_enabled', 'is_auto_config', 'cooldown')
-
-kubernetes_headroom_fields = (
-    'cpu_per_unit',
-    'memory_per_unit',
-    'num_of_units')
 
-kubernetes_labels_fields = ('key', 'value')
+class FieldMap(object):
+    """
+    A field table compiled at import: the (ansible field name, spotinst field name) pairs of its fields
+    and the SDK model they are set on. Malformed tables raise a ValueError.
+    """
+
+    __slots__ = ('class_name', 'model', 'pairs')
+
+    def __init__(self, class_name, *fields):
+        pairs = []
+
+        for field in fields:
+            if isinstance(field, str):
+                pair = (field, field)
+            elif isinstance(field, dict) and sorted(field) == ['ansible_field_name', 'spotinst_field_name']:
+                pair = (field['ansible_field_name'], field['spotinst_field_name'])
+            else:
+                raise ValueError("Invalid field {0!r} in the fields of {1}".format(field, class_name))
+
+            if not all(isinstance(name, str) and name for name in pair):
+                raise ValueError("Invalid field {0!r} in the fields of {1}".format(field, class_name))
+
+            pairs.append(pair)
+
+        ansible_field_names = [ansible_field_name for ansible_field_name, _ in pairs]
+        if len(set(ansible_field_names)) != len(ansible_field_names):
+            raise ValueError("Duplicate fields in the fields of {0}".format(class_name))
+
+        self.class_name = class_name
+        self.pairs = tuple(pairs)
+        self.model = None
+
+        if HAS_SPOTINST_SDK:
+            self.model = getattr(spotinst.models.elastigroup.aws, class_name, None)
+
+            if self.model is None:
+                raise ValueError("The SDK has no {0} model".format(class_name))
+
+    @property
+    def ansible_field_names(self):
+        return tuple(ansible_field_name for ansible_field_name, _ in self.pairs)
+
+
+eni_fields = FieldMap('NetworkInterface',
+                      'description',
+                      'device_index',
+                      'secondary_private_ip_address_count',
+                      'associate_public_ip_address',
+                      'delete_on_termination',
+                      'groups',
+                      'network_interface_id',
+                      'private_ip_address',
+                      'subnet_id',
+                      'associate_ipv6_address')
+
+private_ip_fields = FieldMap('PrivateIpAddress', 'private_ip_address', 'primary')
+
+capacity_fields = FieldMap('Capacity',
+                           dict(ansible_field_name='min_size',
+                                spotinst_field_name='minimum'),
+                           dict(ansible_field_name='max_size',
+                                spotinst_field_name='maximum'),
+                           'target',
+                           'unit')
+
+lspec_fields = FieldMap('LaunchSpecification',
+                        'user_data',
+                        'key_pair',
+                        'tenancy',
+                        'shutdown_script',
+                        'monitoring',
+                        'ebs_optimized',
+                        'image_id',
+                        'health_check_type',
+                        'health_check_grace_period',
+                        'health_check_unhealthy_duration_before_replacement',
+                        'security_group_ids')
+
+iam_fields = FieldMap('IamRole',
+                      dict(ansible_field_name='iam_role_name',
+                           spotinst_field_name='name'),
+                      dict(ansible_field_name='iam_role_arn',
+                           spotinst_field_name='arn'))
+
+scheduled_task_fields = FieldMap('ScheduledTask',
+                                 'adjustment',
+                                 'adjustment_percentage',
+                                 'batch_size_percentage',
+                                 'cron_expression',
+                                 'frequency',
+                                 'grace_period',
+                                 'task_type',
+                                 'is_enabled',
+                                 'scale_target_capacity',
+                                 'scale_min_capacity',
+                                 'scale_max_capacity',
+                                 'start_time')
+
+scaling_policy_fields = FieldMap('ScalingPolicy',
+                                 'policy_name',
+                                 'namespace',
+                                 'metric_name',
+                                 'dimensions',
+                                 'statistic',
+                                 'evaluation_periods',
+                                 'period',
+                                 'threshold',
+                                 'cooldown',
+                                 'unit',
+                                 'operator',
+                                 'source',
+                                 'shouldResumeStateful')
+
+tracking_policy_fields = FieldMap('TargetTrackingPolicy',
+                                  'policy_name',
+                                  'namespace',
+                                  'source',
+                                  'metric_name',
+                                  'statistic',
+                                  'unit',
+                                  'cooldown',
+                                  'target',
+                                  'threshold')
+
+action_fields = FieldMap('ScalingPolicyAction',
+                         dict(ansible_field_name='action_type',
+                              spotinst_field_name='type'),
+                         'adjustment',
+                         'min_target_capacity',
+                         'max_target_capacity',
+                         'target',
+                         'minimum',
+                         'maximum')
+
+signal_fields = FieldMap('Signal', 'name', 'timeout')
+
+multai_lb_fields = FieldMap('MultaiLoadBalancer',
+                            'balancer_id',
+                            'project_id',
+                            'target_set_id',
+                            'az_awareness',
+                            'auto_weight')
+
+persistence_fields = FieldMap('Persistence',
+                              'should_persist_root_device',
+                              'should_persist_block_devices',
+                              'should_persist_private_ip',
+                              'block_devices_mode')
+
+revert_to_spot_fields = FieldMap('RevertToSpot', 'perform_at', 'time_windows')
+
+elastic_beanstalk_platform_update_fields = FieldMap('PlatformUpdate', 'perform_at', 'time_window', 'update_level')
+
+elastic_beanstalk_managed_actions_fields = FieldMap('ManagedActions')
+
+strategy_fields = FieldMap('Strategy',
+                           'risk',
+                           'utilize_reserved_instances',
+                           'fallback_to_od',
+                           'on_demand_count',
+                           'availability_vs_cost',
+                           'draining_timeout',
+                           'spin_up_time',
+                           'lifetime_period',
+                           'revert_to_spot')
+
+ebs_fields = FieldMap('EBS',
+                      'delete_on_termination',
+                      'encrypted',
+                      'iops',
+                      'snapshot_id',
+                      'volume_type',
+                      'volume_size')
+
+bdm_fields = FieldMap('BlockDeviceMapping', 'device_name', 'virtual_name', 'no_device')
+
+
+kubernetes_fields = FieldMap('KubernetesConfiguration',
+                             'api_server',
+                             'token',
+                             'integration_mode',
+                             'cluster_identifier')
+
+kubernetes_auto_scale_fields = FieldMap('KubernetesAutoScalerConfiguration', 'is_enabled', 'is_auto_config', 'cooldown')
+
+kubernetes_headroom_fields = FieldMap('KubernetesAutoScalerHeadroomConfiguration',
+                                      'cpu_per_unit',
+                                      'memory_per_unit',
+                                      'num_of_units')
+
+kubernetes_labels_fields = FieldMap('KubernetesAutoScalerLabelsConfiguration', 'key', 'value')
+
+kubernetes_down_fields = FieldMap('KubernetesAutoScalerDownConfiguration', 'evaluation_periods')
 
-kubernetes_down_fields = ('evaluation_periods')
+nomad_fields = FieldMap('NomadConfiguration', 'master_host', 'master_port', 'acl_token')
 
-nomad_fields = ('master_host', 'master_port', 'acl_token')
+nomad_auto_scale_fields = FieldMap('NomadAutoScalerConfiguration', 'is_enabled', 'is_auto_config', 'cooldown')
 
-nomad_auto_scale_fields = ('is_enabled', 'is_auto_config', 'cooldown')
+nomad_headroom_fields = FieldMap('NomadAutoScalerHeadroomConfiguration',
+                                 'cpu_per_unit',
+                                 'memory_per_unit',
+                                 'num_of_units')
 
-nomad_headroom_fields = ('cpu_per_unit', 'memory_per_unit', 'num_of_units')
+nomad_constraints_fields = FieldMap('NomadAutoScalerConstraintsConfiguration', 'key', 'value')
 
-nomad_constraints_fields = ('key', 'value')
+nomad_down_fields = FieldMap('NomadAutoScalerDownConfiguration', 'evaluation_periods')
 
-nomad_down_fields = ('evaluation_periods')
+docker_swarm_fields = FieldMap('DockerSwarmConfiguration', 'master_host', 'master_port')
 
-docker_swarm_fields = ('master_host', 'master_port')
+docker_swarm_auto_scale_fields = FieldMap('DockerSwarmAutoScalerConfiguration', 'is_enabled', 'cooldown')
 
-docker_swarm_auto_scale_fields = ('is_enabled', 'cooldown')
+docker_swarm_headroom_fields = FieldMap('DockerSwarmAutoScalerHeadroomConfiguration',
+                                        'cpu_per_unit',
+                                        'memory_per_unit',
+                                        'num_of_units')
 
-docker_swarm_headroom_fields = (
-    'cpu_per_unit',
-    'memory_per_unit',
-    'num_of_units')
+docker_swarm_down_fields = FieldMap('DockerSwarmAutoScalerDownConfiguration', 'evaluation_periods')
 
-docker_swarm_down_fields = ('evaluation_periods')
+route53_domain_fields = FieldMap('Route53DomainsConfiguration', 'hosted_zone_id')
 
-route53_domain_fields = ('hosted_zone_id',)
+route53_record_set_fields = FieldMap('Route53RecordSetsConfiguration', 'name', 'use_public_ip')
 
-route53_record_set_fields = ('name', 'use_public_ip')
+mlb_runtime_fields = FieldMap('MlbRuntimeConfiguration', 'deployment_id')
 
-mlb_runtime_fields = ('deployment_id',)
+mlb_load_balancers_fields = FieldMap('LoadBalancer',
+                                     'type',
+                                     'target_set_id',
+                                     'balancer_id',
+                                     'auto_weight',
+                                     'az_awareness')
 
-mlb_load_balancers_fields = (
-    'type',
-    'target_set_id',
-    'balancer_id',
-    'auto_weight',
-    'az_awareness')
+elastic_beanstalk_fields = FieldMap('ElasticBeanstalk', 'environment_id')
 
-elastic_beanstalk_fields = ('environment_id',)
+elastic_beanstalk_deployment_fields = FieldMap('DeploymentPreferences',
+                                               'automatic_roll',
+                                               'batch_size_percentage',
+                                               'grace_period')
 
-elastic_beanstalk_deployment_fields = ('automatic_roll',
-                                       'batch_size_percentage',
-                                       'grace_period')
+elastic_beanstalk_strategy_fields = FieldMap('BeanstalkDeploymentStrategy', 'action', 'should_drain_instances')
 
-elastic_beanstalk_strategy_fields = ('action', 'should_drain_instances')
+stateful_deallocation_fields = FieldMap('StatefulDeallocation',
+                                        dict(ansible_field_name='stateful_deallocation_should_delete_images',
+                                             spotinst_field_name='should_delete_images'),
+                                        dict(ansible_field_name='stateful_deallocation_should_delete_snapshots',
+                                             spotinst_field_name='should_delete_snapshots'),
+                                        dict(ansible_field_name='stateful_deallocation_should_delete_network_interfaces',
+                                             spotinst_field_name='should_delete_network_interfaces'),
+                                        dict(ansible_field_name='stateful_deallocation_should_delete_volumes',
+                                             spotinst_field_name='should_delete_volumes'))
 
-stateful_deallocation_fields = (
-    dict(
-        ansible_field_name='stateful_deallocation_should_delete_images',
-        spotinst_field_name='should_delete_images'),
-    dict(
-        ansible_field_name='stateful_deallocation_should_delete_snapshots',
-        spotinst_field_name='should_delete_snapshots'),
-    dict(
-        ansible_field_name='stateful_deallocation_should_delete_network_interfaces',
-        spotinst_field_name='should_delete_network_interfaces'),
-    dict(
-        ansible_field_name='stateful_deallocation_should_delete_volumes',
-        spotinst_field_name='should_delete_volumes'))
+code_deploy_fields = FieldMap('CodeDeployConfiguration', 'clean_up_on_failure', 'terminate_instance_on_failure')
 
-code_deploy_fields = ('clean_up_on_failure', 'terminate_instance_on_failure')
+code_deploy_deployment_fields = FieldMap('CodeDeployDeploymentGroupsConfiguration',
+                                         'application_name',
+                                         'deployment_group_name')
 
-code_deploy_deployment_fields = ('application_name', 'deployment_group_name')
+right_scale_fields = FieldMap('RightScaleConfiguration', 'account_id', 'refresh_token')
 
-right_scale_fields = ('account_id',
-                      'refresh_token')
+rancher_fields = FieldMap('Rancher',
+                          'access_key',
+                          'secret_key',
+                          'master_host',
+                          'version')
 
-rancher_fields = ('access_key',
-                  'secret_key',
-                  'master_host',
-                  'version')
+chef_fields = FieldMap('ChefConfiguration',
+                       'chef_server',
+                       'organization',
+                       'user',
+                       'pem_key',
+                       'chef_version')
 
-chef_fields = ('chef_server',
-               'organization',
-               'user',
-               'pem_key',
-               'chef_version')
+az_fields = FieldMap('AvailabilityZone',
+                     'name',
+                     'subnet_id',
+                     'subnet_ids',
+                     'placement_group_name')
 
-az_fields = ('name',
-             'subnet_id',
-             'subnet_ids',
-             'placement_group_name')
+opsworks_fields = FieldMap('OpsWorksConfiguration', 'layer_id')
 
-opsworks_fields = ('layer_id',)
+scaling_strategy_fields = FieldMap('ScalingStrategy', 'terminate_at_end_of_billing_hour')
 
-scaling_strategy_fields = ('terminate_at_end_of_billing_hour',)
+mesosphere_fields = FieldMap('Mesosphere', 'api_server')
 
-mesosphere_fields = ('api_server',)
+ecs_fields = FieldMap('EcsConfiguration', 'cluster_name')
 
-ecs_fields = ('cluster_name',)
+ecs_auto_scale_fields = FieldMap('EcsAutoScaleConfiguration', 'is_enabled', 'is_auto_config', 'cooldown')
 
-ecs_auto_scale_fields = ('is_enabled', 'is_auto_config', 'cooldown')
+ecs_headroom_fields = FieldMap('EcsAutoScalerHeadroomConfiguration', 'cpu_per_unit', 'memory_per_unit', 'num_of_units')
 
-ecs_headroom_fields = ('cpu_per_unit', 'memory_per_unit', 'num_of_units')
+ecs_attributes_fields = FieldMap('EcsAutoScalerAttributeConfiguration', 'key', 'value')
 
-ecs_attributes_fields = ('key', 'value')
+ecs_down_fields = FieldMap('EcsAutoScalerDownConfiguration', 'evaluation_periods')
 
-ecs_down_fields = ('evaluation_periods')
+multai_fields = FieldMap('Multai',
+                         dict(ansible_field_name='multai_token',
+                              spotinst_field_name='token'))
+
+ebs_volume_pool_fields = ('device_name', 'volume_ids')
+
+credit_specification_fields = ('cpu_credits',)
+
+roll_config_fields = ('batch_size_percentage', 'grace_period', 'health_check_type')
 
-multai_fields = ('multai_token')
+dimension_fields = ('name', 'value')
+
+# base64 encoded launch specification fields that are left out of updates when the group already has them
+script_fields = ('user_data', 'shutdown_script')
+
+
+def object_schema(fields, **nested):
+    """Schema of an object param: the keys it accepts and the schemas of the nested objects among them"""
+    if isinstance(fields, FieldMap):
+        fields = fields.ansible_field_names
+
+    return dict(type='dict', keys=frozenset(tuple(fields) + tuple(nested)), nested=nested)
+
+
+def list_schema(fields, **nested):
+    return dict(object_schema(fields, **nested), type='list')
+
+
+# schemas of the nested params, that main() declares as plain dicts and lists
+nested_param_schemas = dict(
+    availability_zones=list_schema(az_fields),
+    block_device_mappings=list_schema(bdm_fields, ebs=object_schema(ebs_fields)),
+    chef=object_schema(chef_fields),
+    code_deploy=object_schema(code_deploy_fields, deployment_groups=list_schema(code_deploy_deployment_fields)),
+    credit_specification=object_schema(credit_specification_fields),
+    docker_swarm=object_schema(docker_swarm_fields, auto_scale=object_schema(
+        docker_swarm_auto_scale_fields,
+        headroom=object_schema(docker_swarm_headroom_fields),
+        down=object_schema(docker_swarm_down_fields))),
+    down_scaling_policies=list_schema(scaling_policy_fields.ansible_field_names + action_fields.ansible_field_names,
+                                      dimensions=list_schema(dimension_fields)),
+    ebs_volume_pool=list_schema(ebs_volume_pool_fields),
+    ecs=object_schema(ecs_fields, auto_scale=object_schema(
+        ecs_auto_scale_fields,
+        headroom=object_schema(ecs_headroom_fields),
+        attributes=list_schema(ecs_attributes_fields),
+        down=object_schema(ecs_down_fields))),
+    elastic_beanstalk=object_schema(
+        elastic_beanstalk_fields,
+        deployment_preferences=object_schema(elastic_beanstalk_deployment_fields,
+                                             strategy=object_schema(elastic_beanstalk_strategy_fields)),
+        managed_actions=object_schema(elastic_beanstalk_managed_actions_fields,
+                                      platform_update=object_schema(elastic_beanstalk_platform_update_fields))),
+    kubernetes=object_schema(kubernetes_fields, auto_scale=object_schema(
+        kubernetes_auto_scale_fields,
+        headroom=object_schema(kubernetes_headroom_fields),
+        labels=list_schema(kubernetes_labels_fields),
+        down=object_schema(kubernetes_down_fields))),
+    mesosphere=object_schema(mesosphere_fields),
+    mlb_load_balancers=list_schema(mlb_load_balancers_fields),
+    mlb_runtime=object_schema(mlb_runtime_fields),
+    multai_load_balancers=list_schema(multai_lb_fields),
+    network_interfaces=list_schema(eni_fields, private_ip_addresses=list_schema(private_ip_fields)),
+    nomad=object_schema(nomad_fields, auto_scale=object_schema(
+        nomad_auto_scale_fields,
+        headroom=object_schema(nomad_headroom_fields),
+        constraints=list_schema(nomad_constraints_fields),
+        down=object_schema(nomad_down_fields))),
+    opsworks=object_schema(opsworks_fields),
+    persistence=object_schema(persistence_fields),
+    rancher=object_schema(rancher_fields),
+    revert_to_spot=object_schema(revert_to_spot_fields),
+    right_scale=object_schema(right_scale_fields),
+    roll_config=object_schema(roll_config_fields),
+    route53=object_schema((), domains=list_schema(route53_domain_fields,
+                                                  record_sets=list_schema(route53_record_set_fields))),
+    scheduled_tasks=list_schema(scheduled_task_fields),
+    signals=list_schema(signal_fields),
+    target_tracking_policies=list_schema(tracking_policy_fields),
+    up_scaling_policies=list_schema(scaling_policy_fields.ansible_field_names + action_fields.ansible_field_names,
+                                    dimensions=list_schema(dimension_fields)))
 
 
 def handle_elastigroup(client, module):
@@ -1268,6 +1411,8 @@ def handle_elastigroup(client, module):
     uniqueness_by = module.params.get('uniqueness_by')
     external_group_id = module.params.get('id')
 
+    groups = None
+
     if uniqueness_by == 'id':
         if external_group_id is None:
             should_create = True
@@ -1295,6 +1440,7 @@ def handle_elastigroup(client, module):
         auto_apply_tags = module.params.get('auto_apply_tags')
 
         if state == 'present':
+            omit_unchanged_scripts(client=client, module=module, eg=eg, groups=groups, group_id=group_id)
             group = client.update_elastigroup(group_update=eg, group_id=group_id, auto_apply_tags=auto_apply_tags)
             message = 'Updated group successfully.'
 
@@ -1317,7 +1463,7 @@ def handle_elastigroup(client, module):
             try:
                 stfl_dealloc_request = expand_fields(
                     stateful_deallocation_fields,
-                    module.params, 'StatefulDeallocation')
+                    module.params)
                 if stfl_dealloc_request. \
                         should_delete_network_interfaces is True or \
                         stfl_dealloc_request.should_delete_images is True or \
@@ -1342,6 +1488,16 @@ def handle_elastigroup(client, module):
     return group_id, message, has_changed
 
 
+def get_fulfilled_instances(client, group_id, health_check):
+    """The healthy instances of the group with health_check, otherwise the active ones with a private ip"""
+    if health_check:
+        return [instance for instance in client.get_instance_healthiness(group_id=group_id)
+                if instance.get('health_status') == 'HEALTHY']
+
+    return [instance for instance in client.get_elastigroup_active_instances(group_id=group_id)
+            if instance.get('private_ip') is not None]
+
+
 def retrieve_group_instances(client, module, group_id):
     wait_timeout = module.params.get('wait_timeout')
     wait_for_instances = module.params.get('wait_for_instances')
@@ -1357,30 +1513,12 @@ def retrieve_group_instances(client, module, group_id):
     instances = list()
 
     if state == 'present' and group_id is not None and wait_for_instances is True:
+        while True:
+            instances = get_fulfilled_instances(client=client, group_id=group_id,
+                                                health_check=health_check_type is not None)
 
-        is_amount_fulfilled = False
-        while is_amount_fulfilled is False and wait_timeout > time.time():
-            instances = list()
-            amount_of_fulfilled_instances = 0
-
-            if health_check_type is not None:
-                healthy_instances = client.get_instance_healthiness(group_id=group_id)
-
-                for healthy_instance in healthy_instances:
-                    if(healthy_instance.get('healthStatus') == 'HEALTHY'):
-                        amount_of_fulfilled_instances += 1
-                        instances.append(healthy_instance)
-
-            else:
-                active_instances = client.get_elastigroup_active_instances(group_id=group_id)
-
-                for active_instance in active_instances:
-                    if active_instance.get('private_ip') is not None:
-                        amount_of_fulfilled_instances += 1
-                        instances.append(active_instance)
-
-            if amount_of_fulfilled_instances >= target:
-                is_amount_fulfilled = True
+            if len(instances) >= target or wait_timeout <= time.time():
+                break
 
             time.sleep(10)
 
@@ -1395,6 +1533,82 @@ def find_group_with_same_name(groups, name):
     return True, None
 
 
+def get_script_hash(encoded_script):
+    """Hash of the content of a base64 encoded script, line breaks and spaces of the encoding don't change it"""
+    compact_script = "".join(encoded_script.split())
+
+    try:
+        content = base64.b64decode(compact_script)
+    except (binascii.Error, TypeError, ValueError):
+        content = compact_script.encode('utf-8')
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def omit_unchanged_scripts(client, module, eg, groups, group_id):
+    scripts = [field for field in script_fields if module.params.get(field) is not None]
+
+    if not scripts:
+        return
+
+    live_group = None
+    for group in groups or []:
+        if group.get('id') == group_id:
+            live_group = group
+            break
+
+    if live_group is None:
+        try:
+            live_group = client.get_elastigroup(group_id=group_id)
+        except SpotinstClientException:
+            return
+
+    live_launch_spec = (live_group.get('compute') or dict()).get('launch_specification') or dict()
+    eg_launch_spec = eg.compute.launch_specification
+
+    for field in scripts:
+        live_script = live_launch_spec.get(field)
+
+        if live_script is not None and get_script_hash(live_script) == get_script_hash(module.params.get(field)):
+            delattr(eg_launch_spec, field)
+
+
+def validate_nested_params(params):
+    """Errors of the nested params: keys that no expand function reads and values of the wrong type"""
+    errors = []
+
+    for param in sorted(nested_param_schemas):
+        if params.get(param) is not None:
+            validate_nested_value(params.get(param), nested_param_schemas[param], param, errors)
+
+    return errors
+
+
+def validate_nested_value(value, schema, path, errors):
+    if schema['type'] == 'list':
+        if not isinstance(value, list):
+            errors.append(path + " must be a list")
+            return
+
+        items = [("{0}[{1}]".format(path, index), item) for index, item in enumerate(value)]
+    else:
+        items = [(path, value)]
+
+    for item_path, item in items:
+        if not isinstance(item, dict):
+            errors.append(item_path + " must be an object")
+            continue
+
+        unsupported_keys = sorted(key for key in item if key not in schema['keys'])
+        if unsupported_keys:
+            errors.append("{0} has unsupported keys {1}, supported keys are {2}".format(
+                item_path, ", ".join(unsupported_keys), ", ".join(sorted(schema['keys']))))
+
+        for key, nested_schema in schema['nested'].items():
+            if item.get(key) is not None:
+                validate_nested_value(item.get(key), nested_schema, item_path + "." + key, errors)
+
+
 def expand_elastigroup(module, is_update):
     do_not_update = module.params.get('do_not_update') or []
     name = module.params.get('name')
@@ -1452,9 +1666,9 @@ def expand_compute(eg, module, is_update, do_not_update):
     if on_demand_instance_type is not None or spot_instance_types is not None or preferred_spot_instance_types is not None:
         eg_instance_types = spotinst.models.elastigroup.aws.InstanceTypes()
 
-        if on_demand_instance_type is not None:
-            eg_instance_types.spot = spot_instance_types
         if spot_instance_types is not None:
+            eg_instance_types.spot = spot_instance_types
+        if on_demand_instance_type is not None:
             eg_instance_types.ondemand = on_demand_instance_type
         if preferred_spot_instance_types is not None:
             eg_instance_types.preferred_spot = preferred_spot_instance_types
@@ -1464,7 +1678,7 @@ def expand_compute(eg, module, is_update, do_not_update):
 
     expand_ebs_volume_pool(eg_compute, ebs_volume_pool)
 
-    eg_compute.availability_zones = expand_list(availability_zones_list, az_fields, 'AvailabilityZone')
+    eg_compute.availability_zones = expand_list(availability_zones_list, az_fields)
 
     expand_launch_spec(eg_compute, module, is_update, do_not_update)
 
@@ -1491,10 +1705,10 @@ def expand_ebs_volume_pool(eg_compute, ebs_volumes_list):
 
 
 def expand_launch_spec(eg_compute, module, is_update, do_not_update):
-    eg_launch_spec = expand_fields(lspec_fields, module.params, 'LaunchSpecification')
+    eg_launch_spec = expand_fields(lspec_fields, module.params)
 
     if module.params.get('iam_role_arn') is not None or module.params.get('iam_role_name') is not None:
-        eg_launch_spec.iam_role = expand_fields(iam_fields, module.params, 'IamRole')
+        eg_launch_spec.iam_role = expand_fields(iam_fields, module.params)
 
     tags = module.params.get('tags')
     load_balancers = module.params.get('load_balancers')
@@ -1554,7 +1768,7 @@ def expand_integrations(eg, module):
     eg_integrations = spotinst.models.elastigroup.aws.ThirdPartyIntegrations()
 
     if mesosphere is not None:
-        eg_integrations.mesosphere = expand_fields(mesosphere_fields, mesosphere, 'Mesosphere')
+        eg_integrations.mesosphere = expand_fields(mesosphere_fields, mesosphere)
         integration_exists = True
 
     if ecs is not None:
@@ -1579,7 +1793,7 @@ def expand_integrations(eg, module):
 
     if mlb_runtime is not None:
         eg_integrations.mlb_runtime = expand_fields(
-            mlb_runtime_fields, mlb_runtime, 'MlbRuntimeConfiguration')
+            mlb_runtime_fields, mlb_runtime)
         integration_exists = True
 
     if elastic_beanstalk:
@@ -1591,19 +1805,19 @@ def expand_integrations(eg, module):
         integration_exists = True
 
     if right_scale is not None:
-        eg_integrations.right_scale = expand_fields(right_scale_fields, right_scale, 'RightScaleConfiguration')
+        eg_integrations.right_scale = expand_fields(right_scale_fields, right_scale)
         integration_exists = True
 
     if opsworks is not None:
-        eg_integrations.opsworks = expand_fields(opsworks_fields, opsworks, 'OpsWorksConfiguration')
+        eg_integrations.opsworks = expand_fields(opsworks_fields, opsworks)
         integration_exists = True
 
     if rancher is not None:
-        eg_integrations.rancher = expand_fields(rancher_fields, rancher, 'Rancher')
+        eg_integrations.rancher = expand_fields(rancher_fields, rancher)
         integration_exists = True
 
     if chef is not None:
-        eg_integrations.chef = expand_fields(chef_fields, chef, 'ChefConfiguration')
+        eg_integrations.chef = expand_fields(chef_fields, chef)
         integration_exists = True
 
     if integration_exists:
@@ -1611,84 +1825,75 @@ def expand_integrations(eg, module):
 
 
 def expand_ecs(eg_integrations, ecs_config):
-    ecs = expand_fields(ecs_fields, ecs_config, 'EcsConfiguration')
+    ecs = expand_fields(ecs_fields, ecs_config)
     ecs_auto_scale_config = ecs_config.get('auto_scale', None)
 
     if ecs_auto_scale_config:
         ecs.auto_scale = expand_fields(
             ecs_auto_scale_fields,
-            ecs_auto_scale_config,
-            'EcsAutoScaleConfiguration')
+            ecs_auto_scale_config)
 
         ecs_headroom_config = ecs_auto_scale_config.get('headroom', None)
         if ecs_headroom_config:
             ecs.auto_scale.headroom = expand_fields(
                 ecs_headroom_fields,
-                ecs_headroom_config,
-                'EcsAutoScalerHeadroomConfiguration')
+                ecs_headroom_config)
 
         ecs_attributes_config = ecs_auto_scale_config.get('attributes', None)
         if ecs_attributes_config:
             ecs.auto_scale.attributes = expand_list(
                 ecs_attributes_config,
-                ecs_attributes_fields,
-                'EcsAutoScalerAttributeConfiguration')
+                ecs_attributes_fields)
 
         ecs_down_config = ecs_auto_scale_config.get('down', None)
         if ecs_down_config:
             ecs.auto_scale.down = expand_fields(
-                ecs_down_fields, ecs_down_config,
-                'EcsAutoScalerDownConfiguration')
+                ecs_down_fields, ecs_down_config)
 
     eg_integrations.ecs = ecs
 
 
 def expand_nomad(eg_integrations, nomad_config):
-    nomad = expand_fields(nomad_fields, nomad_config, 'NomadConfiguration')
+    nomad = expand_fields(nomad_fields, nomad_config)
     nomad_auto_scale_config = nomad_config.get('auto_scale', None)
 
     if nomad_auto_scale_config:
         nomad.auto_scale = expand_fields(
             nomad_auto_scale_fields,
-            nomad_auto_scale_config,
-            'NomadAutoScalerConfiguration')
+            nomad_auto_scale_config)
 
         nomad_headroom_config = nomad_auto_scale_config.get('headroom', None)
         if nomad_headroom_config:
             nomad.auto_scale.headroom = expand_fields(
                 nomad_headroom_fields,
-                nomad_headroom_config,
-                'NomadAutoScalerHeadroomConfiguration')
+                nomad_headroom_config)
 
         nomad_constraints_config = nomad_auto_scale_config.get(
             'constraints', None)
         if nomad_constraints_config:
             nomad.auto_scale.constraints = expand_list(
                 nomad_constraints_config,
-                nomad_constraints_fields,
-                'NomadAutoScalerConstraintsConfiguration')
+                nomad_constraints_fields)
 
         nomad_down_config = nomad_auto_scale_config.get('down', None)
         if nomad_down_config:
             nomad.auto_scale.down = expand_fields(
                 nomad_down_fields,
-                nomad_down_config,
-                'NomadAutoScalerDownConfiguration')
+                nomad_down_config)
 
     eg_integrations.nomad = nomad
 
 
 def expand_code_deploy(eg_integrations, code_deploy_config):
     code_deploy = expand_fields(
-        code_deploy_fields, code_deploy_config, 'CodeDeployConfiguration')
+        code_deploy_fields, code_deploy_config)
 
     code_deploy_deployment_config = code_deploy_config.get(
         'deployment_groups', None)
 
     if code_deploy_deployment_config:
         code_deploy.deployment_groups = expand_list(
-            code_deploy_deployment_config, code_deploy_deployment_fields,
-            'CodeDeployDeploymentGroupsConfiguration')
+            code_deploy_deployment_config, code_deploy_deployment_fields)
 
     eg_integrations.code_deploy = code_deploy
 
@@ -1696,32 +1901,28 @@ def expand_code_deploy(eg_integrations, code_deploy_config):
 def expand_docker_swarm(eg_integrations, docker_swarm_config):
     docker_swarm = expand_fields(
         docker_swarm_fields,
-        docker_swarm_config,
-        'DockerSwarmConfiguration')
+        docker_swarm_config)
     docker_swarm_auto_scale_config = docker_swarm_config.get(
         'auto_scale', None)
 
     if docker_swarm_auto_scale_config:
         docker_swarm.auto_scale = expand_fields(
             docker_swarm_auto_scale_fields,
-            docker_swarm_auto_scale_config,
-            'DockerSwarmAutoScalerConfiguration')
+            docker_swarm_auto_scale_config)
 
         docker_swarm_headroom_config = docker_swarm_auto_scale_config.get(
             'headroom', None)
         if docker_swarm_headroom_config:
             docker_swarm.auto_scale.headroom = expand_fields(
                 docker_swarm_headroom_fields,
-                docker_swarm_headroom_config,
-                'DockerSwarmAutoScalerHeadroomConfiguration')
+                docker_swarm_headroom_config)
 
         docker_swarm_down_config = docker_swarm_auto_scale_config.get(
             'down', None)
         if docker_swarm_down_config:
             docker_swarm.auto_scale.down = expand_fields(
                 docker_swarm_down_fields,
-                docker_swarm_down_config,
-                'DockerSwarmAutoScalerDownConfiguration')
+                docker_swarm_down_config)
 
     eg_integrations.docker_swarm = docker_swarm
 
@@ -1733,23 +1934,21 @@ def expand_route53(eg_integrations, route53_config):
     if domains_configuration:
         route53.domains = expand_list(
             domains_configuration,
-            route53_domain_fields,
-            'Route53DomainsConfiguration')
+            route53_domain_fields)
 
         for i in range(len(route53.domains)):
             expanded_domain = route53.domains[i]
             raw_domain = domains_configuration[i]
             expanded_domain.record_sets = expand_list(
                 raw_domain['record_sets'],
-                route53_record_set_fields,
-                'Route53RecordSetsConfiguration')
+                route53_record_set_fields)
 
     eg_integrations.route53 = route53
 
 
 def expand_elastic_beanstalk(eg_integrations, elastic_beanstalk_config):
     elastic_beanstalk = expand_fields(
-        elastic_beanstalk_fields, elastic_beanstalk_config, 'ElasticBeanstalk')
+        elastic_beanstalk_fields, elastic_beanstalk_config)
 
     elastic_beanstalk_deployment = elastic_beanstalk_config.get(
         'deployment_preferences', None)
@@ -1759,23 +1958,19 @@ def expand_elastic_beanstalk(eg_integrations, elastic_beanstalk_config):
 
     if elastic_beanstalk_deployment:
         elastic_beanstalk.deployment_preferences = expand_fields(
-            elastic_beanstalk_deployment_fields, elastic_beanstalk_deployment,
-            'DeploymentPreferences')
+            elastic_beanstalk_deployment_fields, elastic_beanstalk_deployment)
         if elastic_beanstalk.deployment_preferences and elastic_beanstalk_deployment.get('strategy'):
             elastic_beanstalk.deployment_preferences.strategy = \
                 expand_fields(elastic_beanstalk_strategy_fields,
-                              elastic_beanstalk_deployment['strategy'],
-                              'BeanstalkDeploymentStrategy')
+                              elastic_beanstalk_deployment['strategy'])
 
     if elastic_beanstalk_managed_actions:
         elastic_beanstalk.managed_actions = expand_fields(
-            elastic_beanstalk_managed_actions_fields, elastic_beanstalk_managed_actions,
-            'ManagedActions')
+            elastic_beanstalk_managed_actions_fields, elastic_beanstalk_managed_actions)
 
         if elastic_beanstalk.managed_actions:
             elastic_beanstalk.managed_actions.platform_update = expand_fields(
-                elastic_beanstalk_platform_update_fields, elastic_beanstalk_managed_actions['platform_update'],
-                'PlatformUpdate')
+                elastic_beanstalk_platform_update_fields, elastic_beanstalk_managed_actions['platform_update'])
 
     eg_integrations.elastic_beanstalk = elastic_beanstalk
 
@@ -1783,44 +1978,39 @@ def expand_elastic_beanstalk(eg_integrations, elastic_beanstalk_config):
 def expand_kubernetes(eg_integrations, kubernetes_config):
     kubernetes = expand_fields(
         kubernetes_fields,
-        kubernetes_config,
-        'KubernetesConfiguration')
+        kubernetes_config)
     kubernetes_auto_scale_config = kubernetes_config.get('auto_scale', None)
 
     if kubernetes_auto_scale_config:
         kubernetes.auto_scale = expand_fields(
             kubernetes_auto_scale_fields,
-            kubernetes_auto_scale_config,
-            'KubernetesAutoScalerConfiguration')
+            kubernetes_auto_scale_config)
 
         kubernetes_headroom_config = kubernetes_auto_scale_config.get(
-            'auto_scale', None)
+            'headroom', None)
         if kubernetes_headroom_config:
             kubernetes.auto_scale.headroom = expand_fields(
                 kubernetes_headroom_fields,
-                kubernetes_headroom_config,
-                'KubernetesAutoScalerHeadroomConfiguration')
+                kubernetes_headroom_config)
 
         kubernetes_labels_config = kubernetes_auto_scale_config.get(
             'labels', None)
         if kubernetes_labels_config:
             kubernetes.auto_scale.labels = expand_list(
                 kubernetes_labels_config,
-                kubernetes_labels_fields,
-                'KubernetesAutoScalerLabelsConfiguration')
+                kubernetes_labels_fields)
 
         kubernetes_down_config = kubernetes_auto_scale_config.get('down', None)
         if kubernetes_down_config:
             kubernetes.auto_scale.down = expand_fields(
                 kubernetes_down_fields,
-                kubernetes_down_config,
-                'KubernetesAutoScalerDownConfiguration')
+                kubernetes_down_config)
 
     eg_integrations.kubernetes = kubernetes
 
 
 def expand_capacity(eg, module, is_update, do_not_update):
-    eg_capacity = expand_fields(capacity_fields, module.params, 'Capacity')
+    eg_capacity = expand_fields(capacity_fields, module.params)
 
     if is_update is True:
         delattr(eg_capacity, 'unit')
@@ -1836,24 +2026,24 @@ def expand_strategy(eg, module):
     signals = module.params.get('signals')
     revert_to_spot = module.params.get('revert_to_spot')
 
-    eg_strategy = expand_fields(strategy_fields, module.params, 'Strategy')
+    eg_strategy = expand_fields(strategy_fields, module.params)
 
     terminate_at_end_of_billing_hour = module.params.get('terminate_at_end_of_billing_hour')
 
     if terminate_at_end_of_billing_hour is not None:
-        eg_strategy.eg_scaling_strategy = expand_fields(scaling_strategy_fields, module.params, 'ScalingStrategy')
+        eg_strategy.eg_scaling_strategy = expand_fields(scaling_strategy_fields, module.params)
 
     if persistence is not None:
-        eg_strategy.persistence = expand_fields(persistence_fields, persistence, 'Persistence')
+        eg_strategy.persistence = expand_fields(persistence_fields, persistence)
 
     if signals is not None:
-        eg_signals = expand_list(signals, signal_fields, 'Signal')
+        eg_signals = expand_list(signals, signal_fields)
 
         if len(eg_signals) > 0:
             eg_strategy.signals = eg_signals
 
     if revert_to_spot is not None:
-        eg_strategy.revert_to_spot = expand_fields(revert_to_spot_fields, revert_to_spot, "RevertToSpot")
+        eg_strategy.revert_to_spot = expand_fields(revert_to_spot_fields, revert_to_spot)
 
     eg.strategy = eg_strategy
 
@@ -1861,10 +2051,10 @@ def expand_strategy(eg, module):
 def expand_multai(eg, module):
     multai_load_balancers = module.params.get('multai_load_balancers')
 
-    eg_multai = expand_fields(multai_fields, module.params, 'Multai')
+    eg_multai = expand_fields(multai_fields, module.params)
 
     if multai_load_balancers is not None:
-        eg_multai_load_balancers = expand_list(multai_load_balancers, multai_lb_fields, 'MultaiLoadBalancer')
+        eg_multai_load_balancers = expand_list(multai_load_balancers, multai_lb_fields)
 
         if len(eg_multai_load_balancers) > 0:
             eg_multai.balancers = eg_multai_load_balancers
@@ -1877,7 +2067,7 @@ def expand_scheduled_tasks(eg, module):
     if scheduled_tasks is not None:
         eg_scheduling = spotinst.models.elastigroup.aws.Scheduling()
 
-        eg_tasks = expand_list(scheduled_tasks, scheduled_task_fields, 'ScheduledTask')
+        eg_tasks = expand_list(scheduled_tasks, scheduled_task_fields)
 
         if len(eg_tasks) > 0:
             eg_scheduling.tasks = eg_tasks
@@ -1908,8 +2098,7 @@ def expand_load_balancers(eg_launchspec, load_balancers, target_group_arns, mlb_
         if mlb_load_balancers:
             mlbs = expand_list(
                 mlb_load_balancers,
-                mlb_load_balancers_fields,
-                'LoadBalancer')
+                mlb_load_balancers_fields)
 
             for mlb in mlbs:
                 mlb.type = "MULTAI_TARGET_SET"
@@ -1944,10 +2133,10 @@ def expand_block_device_mappings(eg_launchspec, bdms):
         eg_bdms = []
 
         for bdm in bdms:
-            eg_bdm = expand_fields(bdm_fields, bdm, 'BlockDeviceMapping')
+            eg_bdm = expand_fields(bdm_fields, bdm)
 
             if bdm.get('ebs') is not None:
-                eg_bdm.ebs = expand_fields(ebs_fields, bdm.get('ebs'), 'EBS')
+                eg_bdm.ebs = expand_fields(ebs_fields, bdm.get('ebs'))
 
             eg_bdms.append(eg_bdm)
 
@@ -1960,9 +2149,9 @@ def expand_network_interfaces(eg_launchspec, enis):
         eg_enis = []
 
         for eni in enis:
-            eg_eni = expand_fields(eni_fields, eni, 'NetworkInterface')
+            eg_eni = expand_fields(eni_fields, eni)
 
-            eg_pias = expand_list(eni.get('private_ip_addresses'), private_ip_fields, 'PrivateIpAddress')
+            eg_pias = expand_list(eni.get('private_ip_addresses'), private_ip_fields)
 
             if eg_pias is not None:
                 eg_eni.private_ip_addresses = eg_pias
@@ -1999,31 +2188,26 @@ def expand_scaling(eg, module):
         eg.scaling = eg_scaling
 
 
-def expand_list(items, fields, class_name):
+def expand_list(items, fields):
     if items is not None:
         new_objects_list = []
         for item in items:
-            new_obj = expand_fields(fields, item, class_name)
+            new_obj = expand_fields(fields, item)
             new_objects_list.append(new_obj)
 
         return new_objects_list
 
 
-def expand_fields(fields, item, class_name):
-    class_ = getattr(spotinst.models.elastigroup.aws, class_name)
-    new_obj = class_()
+def expand_fields(fields, item):
+    new_obj = fields.model()
 
     # Handle primitive fields
     if item is not None:
-        for field in fields:
-            if isinstance(field, dict):
-                ansible_field_name = field['ansible_field_name']
-                spotinst_field_name = field['spotinst_field_name']
-            else:
-                ansible_field_name = field
-                spotinst_field_name = field
-            if item.get(ansible_field_name) is not None:
-                setattr(new_obj, spotinst_field_name, item.get(ansible_field_name))
+        for ansible_field_name, spotinst_field_name in fields.pairs:
+            value = item.get(ansible_field_name)
+
+            if value is not None:
+                setattr(new_obj, spotinst_field_name, value)
 
     return new_obj
 
@@ -2032,8 +2216,8 @@ def expand_scaling_policies(scaling_policies):
     eg_scaling_policies = []
 
     for policy in scaling_policies:
-        eg_policy = expand_fields(scaling_policy_fields, policy, 'ScalingPolicy')
-        eg_policy.action = expand_fields(action_fields, policy, 'ScalingPolicyAction')
+        eg_policy = expand_fields(scaling_policy_fields, policy)
+        eg_policy.action = expand_fields(action_fields, policy)
         eg_scaling_policies.append(eg_policy)
 
     return eg_scaling_policies
@@ -2043,7 +2227,7 @@ def expand_target_tracking_policies(tracking_policies):
     eg_tracking_policies = []
 
     for policy in tracking_policies:
-        eg_policy = expand_fields(tracking_policy_fields, policy, 'TargetTrackingPolicy')
+        eg_policy = expand_fields(tracking_policy_fields, policy)
         eg_tracking_policies.append(eg_policy)
 
     return eg_tracking_policies
@@ -2170,6 +2354,10 @@ def main():
 
     module = AnsibleModule(argument_spec=fields)
 
+    errors = validate_nested_params(module.params)
+    if errors:
+        module.fail_json(msg="Invalid params: " + "; ".join(errors))
+
     if not HAS_SPOTINST_SDK:
         module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
 
@@ -0,0 +1,507 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_blue_green
+version_added: 2.8
+short_description: Deploy a new image to a Spotinst AWS Elastigroup with a blue/green swap
+author: Spotinst (@jeffnoehren)
+description:
+  - Clones the live configuration of an Elastigroup (blue) into a new group (green) with a new image, waits for
+    the green group to have its target instances, moves the load balancers and target groups of the blue group
+    to the green one and then scales down or deletes the blue group.
+    The blue group is detached from the load balancers only once the green group is attached, and with
+    health_check once its instances are healthy, so the load balancers always have instances behind them.
+    Every phase (clone, wait, swap and retire) is timed.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk2 >= 2.0.0
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  id:
+    type: str
+    description:
+      - Id of the blue group, required if name is not set
+
+  name:
+    type: str
+    description:
+      - Name of the blue group, required if id is not set. The task fails when several groups have the name
+
+  green_name:
+    type: str
+    description:
+      - Name of the green group, required unless blue_action is delete. The blue group keeps its name when it is
+        scaled down or kept, so every deployment needs a new name, like one with a version.
+        With blue_action delete the name of the blue group is freed, and by default the green group gets the name of
+        the blue group with a -green suffix, or without it when the blue group has one, so that consecutive
+        deployments alternate between two names
+
+  image_id:
+    type: str
+    description:
+      - The image of the green group
+    required: true
+
+  load_balancers:
+    type: list
+    description:
+      - Names of the classic load balancers to move to the green group. By default, with target_group_arns
+        unset as well, all the load balancers of the blue group
+
+  target_group_arns:
+    type: list
+    description:
+      - ARNs of the target groups to move to the green group
+
+  health_check:
+    type: bool
+    default: false
+    description:
+      - Wait for the health check of the green group to report its instances healthy once it is attached to the
+        load balancers, before the blue group is detached
+
+  wait_timeout:
+    type: int
+    default: 900
+    description:
+      - How long to wait, in seconds, for the instances of the green group
+
+  blue_action:
+    type: str
+    choices:
+      - scale_down
+      - delete
+      - keep
+    default: scale_down
+    description:
+      - What to do with the blue group once it is detached from the load balancers. scale_down sets its minimum
+        and target capacity to 0
+"""
+EXAMPLES = """
+#In this basic example, we deploy a new image with a blue/green swap
+
+- hosts: localhost
+  tasks:
+    - name: blue/green deployment
+      spotinst_aws_elastigroup_blue_green:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        name: web-v41
+        green_name: web-v42
+        image_id: ami-0a1b2c3d
+        target_group_arns:
+          - arn:aws:elasticloadbalancing:us-west-2:123456789012:targetgroup/web/73e2d6bc24d8a067
+        health_check: true
+        wait_timeout: 600
+      register: result
+    - debug: var=result.phases
+"""
+RETURN = """
+---
+blue_group_id:
+    description: Id of the blue group
+    returned: success
+    type: str
+    sample: "sig-992a78db"
+green_group_id:
+    description: Id of the green group
+    returned: success
+    type: str
+    sample: "sig-12345"
+green_name:
+    description: Name of the green group
+    returned: success
+    type: str
+    sample: "web-green"
+phases:
+    type: list
+    returned: always
+    description: The phases done and the seconds they took
+    sample: [{"name": "clone", "seconds": 1.2}, {"name": "wait", "seconds": 184.0},
+             {"name": "swap", "seconds": 35.1}, {"name": "retire", "seconds": 0.8}]
+instances:
+    type: list
+    returned: success
+    description: The instances of the green group
+    sample: [{"instance_id": "i-0a1b2c3d", "private_ip": "10.0.0.14"}]
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk2 as spotinst
+    from spotinst_sdk2.client import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+GREEN_SUFFIX = '-green'
+
+POLL_INTERVAL = 2
+MAX_POLL_INTERVAL = 15
+
+LOAD_BALANCER_FIELDS = ('type', 'arn', 'name', 'target_set_id', 'balancer_id', 'auto_weight', 'az_awareness')
+
+# read-only fields of a live group, and the load balancers the green group only gets at the swap
+CLONE_EXCLUDED_PATHS = ('id', 'created_at', 'updated_at', 'compute.launch_specification.load_balancers_config')
+
+
+# region Config Functions
+def get_green_name(blue_name, green_name):
+    """The green_name, by default the other name of the two that deployments deleting the blue group alternate"""
+    if green_name:
+        return green_name
+
+    if blue_name.endswith(GREEN_SUFFIX):
+        return blue_name[:-len(GREEN_SUFFIX)]
+
+    return blue_name + GREEN_SUFFIX
+
+
+def remove_path(config, dotted_path):
+    path = dotted_path.split('.')
+    for part in path[:-1]:
+        config = config.get(part)
+        if not isinstance(config, dict):
+            return
+
+    config.pop(path[-1], None)
+
+
+def get_clone_config(blue, green_name, image_id):
+    """The configuration of the green group, the live configuration of the blue one with its name and image"""
+    config = copy.deepcopy(blue)
+
+    for dotted_path in CLONE_EXCLUDED_PATHS:
+        remove_path(config, dotted_path)
+
+    config['name'] = green_name
+    config.setdefault('compute', dict()).setdefault('launch_specification', dict())['image_id'] = image_id
+
+    return config
+
+
+def get_load_balancers_config(blue, load_balancers, target_group_arns):
+    """The load balancers to move, like expand_load_balancers of spotinst_aws_elastigroup builds them"""
+    if load_balancers is None and target_group_arns is None:
+        launch_specification = (blue.get('compute') or dict()).get('launch_specification') or dict()
+        return launch_specification.get('load_balancers_config')
+
+    eg_load_balancers = [dict(name=elb_name, type='CLASSIC') for elb_name in load_balancers or []]
+    eg_load_balancers.extend(dict(arn=target_arn, type='TARGET_GROUP') for target_arn in target_group_arns or [])
+
+    return dict(load_balancers=eg_load_balancers) if eg_load_balancers else None
+
+
+def get_remaining_load_balancers_config(blue, load_balancers_config):
+    """The load balancers of the blue group that are not moved to the green one"""
+    launch_specification = (blue.get('compute') or dict()).get('launch_specification') or dict()
+    blue_load_balancers = (launch_specification.get('load_balancers_config') or dict()).get('load_balancers') or []
+    moved_keys = set((load_balancer.get('type'), load_balancer.get('name'), load_balancer.get('arn'))
+                     for load_balancer in load_balancers_config.get('load_balancers') or [])
+
+    remaining = [load_balancer for load_balancer in blue_load_balancers
+                 if (load_balancer.get('type'), load_balancer.get('name'), load_balancer.get('arn')) not in moved_keys]
+
+    return dict(load_balancers=remaining) if remaining else None
+# endregion
+
+
+# region Group Functions
+def create_group(client, config):
+    # the clone is the live configuration as it is, the models of the SDK don't have all its fields
+    return client.create_elastigroup(group=config)
+
+
+def get_load_balancers_compute(load_balancers_config):
+    """The Compute setting the load balancers of load_balancers_config, removing them all when it is None"""
+    aws = spotinst.models.elastigroup.aws
+    eg_load_balancers_config = None
+
+    if load_balancers_config is not None:
+        eg_load_balancers_config = aws.LoadBalancersConfig(load_balancers=[
+            aws.LoadBalancer(**dict((field, load_balancer[field]) for field in LOAD_BALANCER_FIELDS
+                                    if field in load_balancer))
+            for load_balancer in load_balancers_config.get('load_balancers') or []])
+
+    return aws.Compute(launch_specification=aws.LaunchSpecification(load_balancers_config=eg_load_balancers_config))
+
+
+def update_group(client, group_id, changes):
+    client.update_elastigroup(group_update=spotinst.models.elastigroup.aws.Elastigroup(**changes), group_id=group_id)
+
+
+def get_fulfilled_instances(client, group_id, health_check):
+    """The healthy instances of the group with health_check, otherwise the active ones with a private ip"""
+    if health_check:
+        return [instance for instance in client.get_instance_healthiness(group_id=group_id)
+                if instance.get('health_status') == 'HEALTHY']
+
+    return [instance for instance in client.get_elastigroup_active_instances(group_id=group_id)
+            if instance.get('private_ip') is not None]
+
+
+def wait_for_groups(executor, groups, poll, deadline, max_interval):
+    """
+    Run poll on the groups together, with an interval that doubles up to max_interval, until it returns True for
+    every group or deadline passes. The error of a failed poll is kept on its group until a poll succeeds.
+    Returns the groups still pending at the deadline.
+    """
+    interval = POLL_INTERVAL
+
+    while True:
+        futures = [executor.submit(poll, group) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                is_done = future.result()
+            except SpotinstClientException as exc:
+                group['error'] = str(exc)
+                is_done = False
+            else:
+                group.pop('error', None)
+
+            if not is_done:
+                pending.append(group)
+
+        groups = pending
+        if not groups or time.time() + interval > deadline:
+            return groups
+
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def wait_for_instances(client, group_id, target, health_check, deadline):
+    """The instances of the group once target of them are up, None when deadline passes first"""
+    group = dict(id=group_id)
+
+    def poll(polled_group):
+        polled_group['instances'] = get_fulfilled_instances(client, polled_group['id'], health_check)
+        return len(polled_group['instances']) >= target
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if wait_for_groups(executor=executor, groups=[group], poll=poll, deadline=deadline,
+                           max_interval=MAX_POLL_INTERVAL):
+            return None
+
+    return group['instances']
+
+
+def get_blue_group(client, group_id, name, green_name):
+    """
+    The blue group and whether a group named like the green one exists, fetched in parallel. Raises ValueError
+    when several groups have the name of the blue group.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        listing_future = executor.submit(client.get_elastigroups)
+        group_future = executor.submit(client.get_elastigroup, group_id) if group_id else None
+
+        groups = listing_future.result()
+        if group_future is not None:
+            blue = group_future.result()
+        else:
+            blue_groups = [group for group in groups if group.get('name') == name]
+            if len(blue_groups) > 1:
+                raise ValueError("Several groups have the name {0} ({1}), use id to select one".format(
+                    name, ", ".join(group.get('id') for group in blue_groups)))
+
+            blue = blue_groups[0] if blue_groups else None
+
+    if blue is not None and green_name is None:
+        green_name = get_green_name(blue.get('name'), None)
+
+    return blue, green_name, any(group.get('name') == green_name for group in groups)
+# endregion
+
+
+# region Util Functions
+def handle_blue_green(client, module):
+    phases = []
+    result = dict(phases=phases)
+
+    def start_phase(name):
+        phases.append(dict(name=name, started_at=time.time()))
+
+    def end_phase():
+        phase = phases[-1]
+        phase['seconds'] = round(time.time() - phase.pop('started_at'), 1)
+
+    def fail(msg):
+        if phases and 'started_at' in phases[-1]:
+            end_phase()
+        module.fail_json(msg=msg, **result)
+
+    if module.params.get('green_name') is None and module.params.get('blue_action') != 'delete':
+        fail("green_name is required unless blue_action is delete, the blue group keeps its name")
+
+    try:
+        start_phase('clone')
+        blue, green_name, is_green_taken = get_blue_group(client=client, group_id=module.params.get('id'),
+                                                          name=module.params.get('name'),
+                                                          green_name=module.params.get('green_name'))
+        if blue is None:
+            fail("Group {0} does not exist".format(module.params.get('id') or module.params.get('name')))
+        if is_green_taken:
+            fail("Group {0} already exists, delete it or set another green_name".format(green_name))
+
+        result.update(blue_group_id=blue['id'], green_name=green_name)
+        load_balancers_config = get_load_balancers_config(blue=blue,
+                                                          load_balancers=module.params.get('load_balancers'),
+                                                          target_group_arns=module.params.get('target_group_arns'))
+        target = (blue.get('capacity') or dict()).get('target') or 0
+
+        if module.check_mode:
+            end_phase()
+            return result
+
+        green = create_group(client, get_clone_config(blue, green_name, module.params.get('image_id')))
+        result['green_group_id'] = green['id']
+        end_phase()
+
+        start_phase('wait')
+        deadline = time.time() + module.params.get('wait_timeout')
+        instances = wait_for_instances(client=client, group_id=green['id'], target=target, health_check=False,
+                                       deadline=deadline)
+        if instances is None:
+            fail("Timed out waiting for the instances of group {0}".format(green_name))
+        end_phase()
+
+        start_phase('swap')
+        if load_balancers_config:
+            update_group(client, green['id'], dict(compute=get_load_balancers_compute(load_balancers_config)))
+
+            if module.params.get('health_check'):
+                instances = wait_for_instances(client=client, group_id=green['id'], target=target,
+                                               health_check=True, deadline=deadline)
+                if instances is None:
+                    fail("Timed out waiting for the instances of group {0} to be healthy, both groups are "
+                         "attached to the load balancers".format(green_name))
+        end_phase()
+
+        start_phase('retire')
+        blue_action = module.params.get('blue_action')
+        if blue_action == 'delete':
+            client.delete_elastigroup(group_id=blue['id'])
+        else:
+            changes = dict()
+            if load_balancers_config:
+                changes['compute'] = get_load_balancers_compute(
+                    get_remaining_load_balancers_config(blue, load_balancers_config))
+            if blue_action == 'scale_down':
+                changes['capacity'] = spotinst.models.elastigroup.aws.Capacity(minimum=0, target=0)
+            if changes:
+                update_group(client, blue['id'], changes)
+        end_phase()
+    except SpotinstClientException as exc:
+        fail("Error while attempting the blue/green deployment: " + str(exc))
+    except ValueError as exc:
+        fail(str(exc))
+
+    result['instances'] = instances
+
+    return result
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find(':')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    if account is not None:
+        session = spotinst.SpotinstSession(auth_token=token, account_id=account)
+    else:
+        session = spotinst.SpotinstSession(auth_token=token)
+
+    client = session.client("elastigroup_aws")
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        id=dict(type='str'),
+        name=dict(type='str'),
+        green_name=dict(type='str'),
+        image_id=dict(type='str', required=True),
+        load_balancers=dict(type='list', elements='str'),
+        target_group_arns=dict(type='list', elements='str'),
+        health_check=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=900),
+        blue_action=dict(type='str', default='scale_down', choices=['scale_down', 'delete', 'keep']))
+
+    module = AnsibleModule(argument_spec=fields, required_one_of=[['id', 'name']], supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
+
+    client = get_client(module=module)
+
+    result = handle_blue_green(client=client, module=module)
+
+    module.exit_json(changed=not module.check_mode, **result)
+
+
+if __name__ == '__main__':
+    main()
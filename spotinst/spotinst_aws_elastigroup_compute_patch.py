@@ -0,0 +1,377 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_compute_patch
+version_added: 2.8
+short_description: Add or remove spot instance types and availability zones of many Spotinst AWS Elastigroups
+author: Spotinst (@jeffnoehren)
+description:
+  - Applies a change of spot instance types and availability zones to the Elastigroups matching a selector.
+    The groups are read with one listing and only the changed compute fields of the groups that change are sent,
+    in parallel. In check mode the changes of every group are returned without being sent.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk2 >= 2.0.0
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  group_ids:
+    type: list
+    description:
+      - Ids of the groups to change
+
+  name_patterns:
+    type: list
+    description:
+      - Names of the groups to change, shell-style wildcards like web-* are supported
+
+  add_spot_instance_types:
+    type: list
+    description:
+      - Spot instance types to add to the groups
+
+  remove_spot_instance_types:
+    type: list
+    description:
+      - Spot instance types to remove from the groups, and from their preferred spot instance types
+
+  add_availability_zones:
+    type: list
+    description:
+      - Availability zones to add to the groups, like the availability_zones of spotinst_aws_elastigroup, with a
+        name and a subnet_id or subnet_ids. The subnets of a zone the group already has are added to it
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we add an instance type and a subnet to all the web groups, check mode shows the changes
+
+- hosts: localhost
+  tasks:
+    - name: patch elastigroups
+      spotinst_aws_elastigroup_compute_patch:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        name_patterns:
+          - web-*
+        add_spot_instance_types:
+          - c6i.large
+        remove_spot_instance_types:
+          - c4.large
+        add_availability_zones:
+          - name: us-west-2c
+            subnet_id: subnet-5e6f7a8b
+      check_mode: true
+      register: result
+    - debug: var=result.summary
+"""
+RETURN = """
+---
+groups:
+    type: list
+    returned: success
+    description:
+      - Every selected group with its status (patched, unchanged or failed) and what was added and removed
+    sample: [{"id": "sig-992a78db", "name": "web-1", "status": "patched", "added_spot_instance_types": ["c6i.large"],
+              "removed_spot_instance_types": ["c4.large"], "added_subnet_ids": {"us-west-2c": ["subnet-5e6f7a8b"]}}]
+summary:
+    type: dict
+    returned: success
+    description: Number of groups by status
+    sample: {"patched": 298, "unchanged": 2, "failed": 0}
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import copy
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk2 as spotinst
+    from spotinst_sdk2.client import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+AVAILABILITY_ZONE_FIELDS = ('name', 'subnet_id', 'subnet_ids', 'placement_group_name')
+
+
+# region Patch Functions
+def select_groups(groups, group_ids, name_patterns):
+    return [group for group in groups
+            if group.get('id') in group_ids or
+            any(fnmatch.fnmatchcase(group.get('name') or '', pattern) for pattern in name_patterns)]
+
+
+def get_zone_subnet_ids(zone):
+    if zone.get('subnet_ids'):
+        return list(zone['subnet_ids'])
+
+    return [zone['subnet_id']] if zone.get('subnet_id') else []
+
+
+def patch_instance_types(instance_types, add_spot_instance_types, remove_spot_instance_types, report):
+    """The changed instance types of a group, None when they don't change"""
+    spot = instance_types.get('spot') or []
+    new_spot = [instance_type for instance_type in spot if instance_type not in remove_spot_instance_types]
+    new_spot.extend(instance_type for instance_type in add_spot_instance_types if instance_type not in new_spot)
+
+    if new_spot == spot:
+        return None
+
+    if not new_spot:
+        raise ValueError("the group would have no spot instance types")
+
+    report['added_spot_instance_types'] = [instance_type for instance_type in new_spot if instance_type not in spot]
+    report['removed_spot_instance_types'] = [instance_type for instance_type in spot if instance_type not in new_spot]
+    changes = dict(spot=new_spot)
+
+    preferred_spot = instance_types.get('preferred_spot') or []
+    new_preferred_spot = [instance_type for instance_type in preferred_spot if instance_type in new_spot]
+    if new_preferred_spot != preferred_spot:
+        changes['preferred_spot'] = new_preferred_spot or None
+
+    return changes
+
+
+def patch_availability_zones(zones, add_availability_zones, report):
+    """The availability zones of a group with the added ones, None when they don't change"""
+    new_zones = copy.deepcopy(zones)
+    zones_by_name = dict((zone.get('name'), zone) for zone in new_zones)
+    added_subnet_ids = dict()
+
+    for add_zone in add_availability_zones:
+        subnet_ids = get_zone_subnet_ids(add_zone)
+        zone = zones_by_name.get(add_zone['name'])
+
+        if zone is None:
+            zone = dict(name=add_zone['name'], subnet_ids=[])
+            if add_zone.get('placement_group_name'):
+                zone['placement_group_name'] = add_zone['placement_group_name']
+            zones_by_name[zone['name']] = zone
+            new_zones.append(zone)
+        else:
+            # a zone given with a single subnet_id gets the list of subnets
+            zone['subnet_ids'] = get_zone_subnet_ids(zone)
+            zone.pop('subnet_id', None)
+
+        for subnet_id in subnet_ids:
+            if subnet_id not in zone['subnet_ids']:
+                zone['subnet_ids'].append(subnet_id)
+                added_subnet_ids.setdefault(zone['name'], []).append(subnet_id)
+
+    if not added_subnet_ids and len(new_zones) == len(zones):
+        return None
+
+    report['added_subnet_ids'] = added_subnet_ids
+
+    return new_zones
+
+
+def get_compute_changes(group, add_spot_instance_types, remove_spot_instance_types, add_availability_zones):
+    """The compute fields of a group to send and the report of its changes"""
+    compute = group.get('compute') or dict()
+    report = dict(id=group.get('id'), name=group.get('name'))
+    changes = dict()
+
+    try:
+        instance_types = patch_instance_types(compute.get('instance_types') or dict(), add_spot_instance_types,
+                                              remove_spot_instance_types, report)
+        if instance_types is not None:
+            changes['instance_types'] = instance_types
+
+        availability_zones = patch_availability_zones(compute.get('availability_zones') or [],
+                                                      add_availability_zones, report)
+        if availability_zones is not None:
+            changes['availability_zones'] = availability_zones
+    except ValueError as exc:
+        report.update(status='failed', error=str(exc))
+        return None, report
+
+    report['status'] = 'patched' if changes else 'unchanged'
+
+    return changes or None, report
+
+
+def update_compute(client, group_id, changes):
+    compute = dict()
+
+    if 'instance_types' in changes:
+        compute['instance_types'] = spotinst.models.elastigroup.aws.InstanceTypes(**changes['instance_types'])
+
+    if 'availability_zones' in changes:
+        compute['availability_zones'] = [
+            spotinst.models.elastigroup.aws.AvailabilityZone(
+                **dict((field, zone[field]) for field in AVAILABILITY_ZONE_FIELDS if field in zone))
+            for zone in changes['availability_zones']]
+
+    group_update = spotinst.models.elastigroup.aws.Elastigroup(
+        compute=spotinst.models.elastigroup.aws.Compute(**compute))
+
+    client.update_elastigroup(group_update=group_update, group_id=group_id)
+
+
+def patch_groups(client, groups, add_spot_instance_types, remove_spot_instance_types, add_availability_zones,
+                 max_workers, check_mode):
+    reports = []
+    patches = []
+
+    for group in groups:
+        changes, report = get_compute_changes(group, add_spot_instance_types, remove_spot_instance_types,
+                                              add_availability_zones)
+        reports.append(report)
+        if changes is not None:
+            patches.append((report, changes))
+
+    if not check_mode and patches:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(update_compute, client, report['id'], changes) for report, changes in patches]
+
+            for (report, _), future in zip(patches, futures):
+                try:
+                    future.result()
+                except SpotinstClientException as exc:
+                    report.update(status='failed', error=str(exc))
+
+    summary = dict(patched=0, unchanged=0, failed=0)
+    for report in reports:
+        summary[report['status']] += 1
+
+    return reports, summary
+# endregion
+
+
+# region Util Functions
+def validate_availability_zones(availability_zones):
+    errors = []
+
+    for index, zone in enumerate(availability_zones):
+        if not zone.get('name'):
+            errors.append("add_availability_zones[{0}] must have a name".format(index))
+        if not get_zone_subnet_ids(zone):
+            errors.append("add_availability_zones[{0}] must have a subnet_id or subnet_ids".format(index))
+
+    return errors
+
+
+def handle_patch(client, module):
+    try:
+        groups = select_groups(groups=client.get_elastigroups(), group_ids=module.params.get('group_ids') or [],
+                               name_patterns=module.params.get('name_patterns') or [])
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to list the groups: " + str(exc))
+
+    return patch_groups(client=client, groups=groups,
+                        add_spot_instance_types=module.params.get('add_spot_instance_types') or [],
+                        remove_spot_instance_types=module.params.get('remove_spot_instance_types') or [],
+                        add_availability_zones=module.params.get('add_availability_zones') or [],
+                        max_workers=module.params.get('max_workers') or 1,
+                        check_mode=module.check_mode)
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find(':')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    if account is not None:
+        session = spotinst.SpotinstSession(auth_token=token, account_id=account)
+    else:
+        session = spotinst.SpotinstSession(auth_token=token)
+
+    client = session.client("elastigroup_aws")
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        group_ids=dict(type='list', elements='str'),
+        name_patterns=dict(type='list', elements='str'),
+        add_spot_instance_types=dict(type='list', elements='str'),
+        remove_spot_instance_types=dict(type='list', elements='str'),
+        add_availability_zones=dict(type='list', elements='dict'),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields,
+                           required_one_of=[['group_ids', 'name_patterns'],
+                                            ['add_spot_instance_types', 'remove_spot_instance_types',
+                                             'add_availability_zones']],
+                           supports_check_mode=True)
+
+    errors = validate_availability_zones(module.params.get('add_availability_zones') or [])
+    if errors:
+        module.fail_json(msg="Invalid params: " + "; ".join(errors))
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
+
+    client = get_client(module=module)
+
+    groups, summary = handle_patch(client=client, module=module)
+
+    module.exit_json(changed=summary['patched'] > 0, groups=groups, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
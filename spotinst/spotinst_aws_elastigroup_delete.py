@@ -0,0 +1,416 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_delete
+version_added: 2.8
+short_description: Delete many Spotinst AWS Elastigroups and wait for them to be gone
+author: Spotinst (@jeffnoehren)
+description:
+  - Deletes a batch of Elastigroups concurrently, optionally with the deallocation of the volumes, snapshots,
+    images and network interfaces of their stateful instances, and waits until every group is gone. The groups
+    are polled together, with an interval that doubles up to a minute.
+    Reports for every group how long it took to disappear and the stateful instances it still had when the wait
+    timed out.
+  - The module only waits for the groups to disappear. Spotinst releases the stateful resources of a group once
+    it is deleted and the API does not report that release, so a deleted group may still have resources being
+    deallocated.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk2 >= 2.0.0
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  group_ids:
+    type: list
+    description:
+      - Ids of the groups to delete
+
+  names:
+    type: list
+    description:
+      - Names of the groups to delete, looked up with one listing of the groups. The task fails when several
+        groups have one of the names
+
+  stateful_deallocation_should_delete_network_interfaces:
+    type: bool
+    description:
+      - Enable deletion of network interfaces on stateful group deletion
+
+  stateful_deallocation_should_delete_snapshots:
+    type: bool
+    description:
+      - Enable deletion of snapshots on stateful group deletion
+
+  stateful_deallocation_should_delete_images:
+    type: bool
+    description:
+      - Enable deletion of images on stateful group deletion
+
+  stateful_deallocation_should_delete_volumes:
+    type: bool
+    description:
+      - Enable deletion of volumes on stateful group deletion
+
+  wait:
+    type: bool
+    default: true
+    description:
+      - Wait until the groups are gone
+
+  wait_timeout:
+    type: int
+    default: 1800
+    description:
+      - How long to wait, in seconds, for all the groups
+
+  fail_on_timeout:
+    type: bool
+    default: false
+    description:
+      - Fail the task when a group could not be deleted or is still there when the wait times out
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we tear down the stateful groups of an environment and deallocate all their resources
+
+- hosts: localhost
+  tasks:
+    - name: delete elastigroups
+      spotinst_aws_elastigroup_delete:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        names:
+          - review-42-web
+          - review-42-db
+        group_ids:
+          - sig-992a78db
+        stateful_deallocation_should_delete_volumes: true
+        stateful_deallocation_should_delete_snapshots: true
+        stateful_deallocation_should_delete_images: true
+        stateful_deallocation_should_delete_network_interfaces: true
+        wait_timeout: 3600
+        fail_on_timeout: true
+      register: result
+    - debug: var=result.groups
+"""
+RETURN = """
+---
+groups:
+    type: list
+    returned: success
+    description:
+      - Every group with its status (deleted, requested, timed_out, missing or failed), the seconds it took to be
+        gone and the stateful instances it still had when the wait timed out. A group is requested when the
+        module does not wait for it
+    sample: [{"id": "sig-992a78db", "name": "review-42-db", "status": "timed_out", "seconds": 1800.2,
+              "stateful_instances": [{"id": "ssi-8d3f0a1c", "instance_id": "i-0e9f4a1b", "state": "DEALLOCATING"}]}]
+summary:
+    type: dict
+    returned: success
+    description: Number of groups by status
+    sample: {"deleted": 49, "requested": 0, "timed_out": 1, "missing": 0, "failed": 0}
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk2 as spotinst
+    from spotinst_sdk2.client import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 60
+
+STATEFUL_DEALLOCATION_PARAMS = ('stateful_deallocation_should_delete_images',
+                                'stateful_deallocation_should_delete_snapshots',
+                                'stateful_deallocation_should_delete_network_interfaces',
+                                'stateful_deallocation_should_delete_volumes')
+
+
+# region Delete Functions
+def get_stateful_deallocation(params):
+    """The StatefulDeallocation of the params, None when nothing is deleted with the groups"""
+    values = dict((param[len('stateful_deallocation_'):], params.get(param))
+                  for param in STATEFUL_DEALLOCATION_PARAMS)
+
+    if not any(value is True for value in values.values()):
+        return None
+
+    return spotinst.models.elastigroup.aws.StatefulDeallocation(**values)
+
+
+def is_missing_group_error(exc):
+    return "GROUP_DOESNT_EXIST" in getattr(exc, 'message', str(exc))
+
+
+def delete_group(client, group_id, stateful_deallocation):
+    """Request the deletion of a group, False when it doesn't exist"""
+    try:
+        if stateful_deallocation is None:
+            client.delete_elastigroup(group_id=group_id)
+        else:
+            client.delete_elastigroup_with_deallocation(group_id=group_id,
+                                                        stateful_deallocation=stateful_deallocation)
+    except SpotinstClientException as exc:
+        if is_missing_group_error(exc):
+            return False
+        raise
+
+    return True
+
+
+def get_remaining_stateful_instances(client, group_id):
+    """
+    The stateful instances of a group, None when the group is gone. Nothing tells whether the resources of the
+    stateful instances are deallocated after that, only that the group was deleted.
+    """
+    try:
+        stateful_instances = client.get_stateful_instances(group_id=group_id)
+    except SpotinstClientException as exc:
+        if is_missing_group_error(exc):
+            return None
+        raise
+
+    return [dict(id=stateful_instance.get('id'), instance_id=stateful_instance.get('instance_id'),
+                 state=stateful_instance.get('state')) for stateful_instance in stateful_instances]
+
+
+def wait_for_groups(executor, groups, poll, deadline, max_interval):
+    """
+    Run poll on the groups together, with an interval that doubles up to max_interval, until it returns True for
+    every group or deadline passes. The error of a failed poll is kept on its group until a poll succeeds.
+    Returns the groups still pending at the deadline.
+    """
+    interval = POLL_INTERVAL
+
+    while True:
+        futures = [executor.submit(poll, group) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                is_done = future.result()
+            except SpotinstClientException as exc:
+                group['error'] = str(exc)
+                is_done = False
+            else:
+                group.pop('error', None)
+
+            if not is_done:
+                pending.append(group)
+
+        groups = pending
+        if not groups or time.time() + interval > deadline:
+            return groups
+
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def delete_groups(client, groups, stateful_deallocation, wait, wait_timeout, max_workers):
+    """
+    Delete the groups concurrently and, with wait, poll those still there together until they are gone or
+    wait_timeout passes. Every group gets a status, the seconds it took and its remaining stateful instances.
+    """
+    started_at = time.time()
+
+    def poll(group):
+        stateful_instances = get_remaining_stateful_instances(client, group['id'])
+        if stateful_instances is not None:
+            group['stateful_instances'] = stateful_instances
+            return False
+
+        group.pop('stateful_instances', None)
+        group.update(status='deleted', seconds=round(time.time() - started_at, 1))
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(delete_group, client, group['id'], stateful_deallocation) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                group['status'] = 'requested' if future.result() else 'missing'
+            except SpotinstClientException as exc:
+                group.update(status='failed', error=str(exc))
+            else:
+                if wait and group['status'] == 'requested':
+                    pending.append(group)
+
+        if pending:
+            for group in wait_for_groups(executor=executor, groups=pending, poll=poll,
+                                         deadline=started_at + wait_timeout, max_interval=MAX_POLL_INTERVAL):
+                group.update(status='timed_out', seconds=round(time.time() - started_at, 1))
+
+    return groups
+# endregion
+
+
+# region Util Functions
+def get_groups(client, group_ids, names):
+    """
+    The groups to delete, names are looked up with one listing. Raises ValueError when several groups have one
+    of the names, as deleting any of them could delete the wrong one.
+    """
+    groups = [dict(id=group_id, name=None) for group_id in group_ids]
+
+    if names:
+        ids_by_name = dict()
+        for group in client.get_elastigroups():
+            ids_by_name.setdefault(group.get('name'), []).append(group.get('id'))
+
+        ambiguous_names = ["{0} ({1})".format(name, ", ".join(ids_by_name[name])) for name in names
+                           if len(ids_by_name.get(name, [])) > 1]
+        if ambiguous_names:
+            raise ValueError("Several groups have the names " + "; ".join(ambiguous_names))
+
+        groups.extend(dict(id=(ids_by_name.get(name) or [None])[0], name=name) for name in names)
+
+    return groups
+
+
+def handle_deletion(client, module):
+    try:
+        groups = get_groups(client=client, group_ids=module.params.get('group_ids') or [],
+                            names=module.params.get('names') or [])
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to list the groups: " + str(exc))
+    except ValueError as exc:
+        module.fail_json(msg=str(exc) + ", use group_ids to delete them")
+
+    existing_groups = []
+    for group in groups:
+        if group['id'] is None:
+            group['status'] = 'missing'
+        elif module.check_mode:
+            group['status'] = 'deleted'
+        else:
+            existing_groups.append(group)
+
+    if existing_groups:
+        delete_groups(client=client, groups=existing_groups,
+                      stateful_deallocation=get_stateful_deallocation(module.params),
+                      wait=module.params.get('wait'), wait_timeout=module.params.get('wait_timeout'),
+                      max_workers=module.params.get('max_workers') or 1)
+
+    summary = dict(deleted=0, requested=0, timed_out=0, missing=0, failed=0)
+    for group in groups:
+        summary[group['status']] += 1
+
+    if module.params.get('fail_on_timeout') and (summary['timed_out'] or summary['failed']):
+        module.fail_json(msg="{0} groups timed out and {1} failed".format(summary['timed_out'], summary['failed']),
+                         groups=groups, summary=summary)
+
+    return groups, summary
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find(':')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    if account is not None:
+        session = spotinst.SpotinstSession(auth_token=token, account_id=account)
+    else:
+        session = spotinst.SpotinstSession(auth_token=token)
+
+    client = session.client("elastigroup_aws")
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        group_ids=dict(type='list', elements='str'),
+        names=dict(type='list', elements='str'),
+        stateful_deallocation_should_delete_images=dict(type='bool'),
+        stateful_deallocation_should_delete_network_interfaces=dict(type='bool'),
+        stateful_deallocation_should_delete_snapshots=dict(type='bool'),
+        stateful_deallocation_should_delete_volumes=dict(type='bool'),
+        wait=dict(type='bool', default=True),
+        wait_timeout=dict(type='int', default=1800),
+        fail_on_timeout=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields, required_one_of=[['group_ids', 'names']],
+                           supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
+
+    client = get_client(module=module)
+
+    groups, summary = handle_deletion(client=client, module=module)
+
+    has_changed = summary['deleted'] + summary['requested'] + summary['timed_out'] > 0
+
+    module.exit_json(changed=has_changed, groups=groups, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_detach
+version_added: 2.8
+short_description: Detach or replace specific instances of a Spotinst AWS Elastigroup
+author: Spotinst (@jeffnoehren)
+description:
+  - Detaches the given instances of an Elastigroup, or those with a given health status, in batches.
+    With action replace the target capacity is kept, so the group launches a replacement for every detached
+    instance, and the next batch starts once as many instances as it detached, that were not in the group before
+    it, are up and the instances of the batch had draining_timeout seconds to drain. With action detach the target
+    capacity is decremented.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk2 >= 2.0.0
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  id:
+    type: str
+    description:
+      - Id of the group, required if name is not set
+
+  name:
+    type: str
+    description:
+      - Name of the group, required if id is not set. The task fails when several groups have the name
+
+  instance_ids:
+    type: list
+    description:
+      - Ids of the instances to detach
+
+  health_statuses:
+    type: list
+    description:
+      - Detach the instances whose health status (HEALTHY, UNHEALTHY, INSUFFICIENT_DATA or UNKNOWN) is one of these
+
+  action:
+    type: str
+    choices:
+      - replace
+      - detach
+    default: replace
+    description:
+      - replace keeps the target capacity so that the detached instances are replaced, detach decrements it
+
+  should_terminate_instances:
+    type: bool
+    default: true
+    description:
+      - Terminate the detached instances
+
+  draining_timeout:
+    type: int
+    description:
+      - Seconds the detached instances are given to drain. By default the draining_timeout of the group
+
+  batch_size:
+    type: int
+    default: 1
+    description:
+      - Number of instances detached at once
+
+  health_check:
+    type: bool
+    default: false
+    description:
+      - Count the replacements once the health check of the group reports them healthy instead of once they have
+        a private ip
+
+  wait_timeout:
+    type: int
+    default: 900
+    description:
+      - How long to wait, in seconds, for the replacements of a batch
+"""
+EXAMPLES = """
+#In this basic example, we replace the unhealthy instances of a group two at a time
+
+- hosts: localhost
+  tasks:
+    - name: replace unhealthy instances
+      spotinst_aws_elastigroup_detach:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        name: ansible_test_group
+        health_statuses:
+          - UNHEALTHY
+        action: replace
+        batch_size: 2
+        health_check: true
+      register: result
+    - debug: var=result.batches
+
+#In this example, we detach two instances and decrement the target capacity, keeping them running
+
+- hosts: localhost
+  tasks:
+    - name: detach instances
+      spotinst_aws_elastigroup_detach:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        id: sig-992a78db
+        instance_ids:
+          - i-0e9f4a1b
+          - i-07c3d2e8
+        action: detach
+        should_terminate_instances: false
+        draining_timeout: 120
+"""
+RETURN = """
+---
+group_id:
+    description: Id of the group
+    returned: success
+    type: str
+    sample: "sig-992a78db"
+batches:
+    type: list
+    returned: success
+    description: The instances detached by every batch and the seconds it took, with its replacements
+    sample: [{"instance_ids": ["i-0e9f4a1b", "i-07c3d2e8"], "seconds": 182.5}]
+instances:
+    type: list
+    returned: success
+    description: The instances of the group that are up after the last batch
+    sample: [{"instance_id": "i-0a1b2c3d", "private_ip": "10.0.0.14"}]
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk2 as spotinst
+    from spotinst_sdk2.client import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+POLL_INTERVAL = 10
+MAX_POLL_INTERVAL = 30
+
+
+# region Instance Functions
+def get_fulfilled_instances(client, group_id, health_check):
+    """The healthy instances of the group with health_check, otherwise the active ones with a private ip"""
+    if health_check:
+        return [instance for instance in client.get_instance_healthiness(group_id=group_id)
+                if instance.get('health_status') == 'HEALTHY']
+
+    return [instance for instance in client.get_elastigroup_active_instances(group_id=group_id)
+            if instance.get('private_ip') is not None]
+
+
+def select_instances(client, group_id, instance_ids, health_statuses):
+    """The ids of the instances to detach, in the order of the group, and the given ids not in the group"""
+    active_ids = [instance.get('instance_id')
+                  for instance in client.get_elastigroup_active_instances(group_id=group_id)]
+    selected_ids = set(instance_ids)
+
+    if health_statuses:
+        selected_ids.update(instance.get('instance_id')
+                            for instance in client.get_instance_healthiness(group_id=group_id)
+                            if instance.get('health_status') in health_statuses)
+
+    return [instance_id for instance_id in active_ids if instance_id in selected_ids], \
+        sorted(set(instance_ids) - set(active_ids))
+
+
+def get_batches(instance_ids, batch_size):
+    return [instance_ids[index:index + batch_size] for index in range(0, len(instance_ids), batch_size)]
+
+
+def detach_batch(client, group_id, instance_ids, action, should_terminate_instances, draining_timeout):
+    detach_configuration = spotinst.models.elastigroup.aws.DetachConfiguration(
+        instances_to_detach=instance_ids,
+        should_terminate_instances=should_terminate_instances,
+        draining_timeout=draining_timeout,
+        should_decrement_target_capacity=action == 'detach')
+
+    client.detach_elastigroup_instances(group_id=group_id, detach_configuration=detach_configuration)
+
+
+def wait_for_groups(executor, groups, poll, deadline, max_interval):
+    """
+    Run poll on the groups together, with an interval that doubles up to max_interval, until it returns True for
+    every group or deadline passes. The error of a failed poll is kept on its group until a poll succeeds.
+    Returns the groups still pending at the deadline.
+    """
+    interval = POLL_INTERVAL
+
+    while True:
+        futures = [executor.submit(poll, group) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                is_done = future.result()
+            except SpotinstClientException as exc:
+                group['error'] = str(exc)
+                is_done = False
+            else:
+                group.pop('error', None)
+
+            if not is_done:
+                pending.append(group)
+
+        groups = pending
+        if not groups or time.time() + interval > deadline:
+            return groups
+
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def wait_for_replacements(client, group_id, previous_ids, detached_ids, count, health_check, deadline):
+    """
+    The instances up, without the detached ones, once count of them were not in the group before the batch.
+    None and the error of the last poll when deadline passes first.
+    """
+    group = dict(id=group_id)
+
+    def poll(polled_group):
+        polled_group['instances'] = [
+            instance for instance in get_fulfilled_instances(client, polled_group['id'], health_check)
+            if instance.get('instance_id') not in detached_ids]
+        return len([instance for instance in polled_group['instances']
+                    if instance.get('instance_id') not in previous_ids]) >= count
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if wait_for_groups(executor=executor, groups=[group], poll=poll, deadline=deadline,
+                           max_interval=MAX_POLL_INTERVAL):
+            return None, group.get('error')
+
+    return group['instances'], None
+
+
+def detach_instances(client, group_id, batches, action, should_terminate_instances, draining_timeout, health_check,
+                     wait_timeout):
+    """
+    Detach the batches one after the other. With replace, the next batch waits for the replacements of the
+    previous one, the instances that were not in the group before it, and for its draining_timeout, so that no
+    more than batch_size instances are out at once.
+    Returns the batches done with their seconds and the instances up, or the error that stopped them.
+    """
+    detached_ids = set()
+    done_batches = []
+    instances = []
+
+    for batch in batches:
+        started_at = time.time()
+
+        previous_ids = set()
+
+        try:
+            if action == 'replace':
+                previous_ids.update(instance.get('instance_id')
+                                    for instance in client.get_elastigroup_active_instances(group_id=group_id))
+            detach_batch(client=client, group_id=group_id, instance_ids=batch, action=action,
+                         should_terminate_instances=should_terminate_instances, draining_timeout=draining_timeout)
+        except SpotinstClientException as exc:
+            return done_batches, instances, "Error while attempting to detach {0}: {1}".format(
+                ", ".join(batch), exc)
+
+        detached_ids.update(batch)
+        done_batches.append(dict(instance_ids=batch))
+
+        if action == 'replace':
+            instances, error = wait_for_replacements(client=client, group_id=group_id, previous_ids=previous_ids,
+                                                     detached_ids=detached_ids, count=len(batch),
+                                                     health_check=health_check, deadline=started_at + wait_timeout)
+            if instances is None:
+                return done_batches, [], "Timed out waiting for the replacements of {0}{1}".format(
+                    ", ".join(batch), ": " + error if error else "")
+
+        if batch is not batches[-1]:
+            drained_at = started_at + (draining_timeout or 0)
+            if drained_at > time.time():
+                time.sleep(drained_at - time.time())
+
+        done_batches[-1]['seconds'] = round(time.time() - started_at, 1)
+
+    return done_batches, instances, None
+# endregion
+
+
+# region Util Functions
+def get_group(client, module):
+    group_id = module.params.get('id')
+
+    if group_id is None:
+        name = module.params.get('name')
+        group_ids = [group.get('id') for group in client.get_elastigroups() if group.get('name') == name]
+
+        if not group_ids:
+            module.fail_json(msg="Group {0} does not exist".format(name))
+        if len(group_ids) > 1:
+            module.fail_json(msg="Several groups have the name {0} ({1}), use id to select one".format(
+                name, ", ".join(group_ids)))
+
+        group_id = group_ids[0]
+
+    return client.get_elastigroup(group_id=group_id)
+
+
+def handle_detach(client, module):
+    try:
+        group = get_group(client=client, module=module)
+        instance_ids, unknown_ids = select_instances(client=client, group_id=group['id'],
+                                                     instance_ids=module.params.get('instance_ids') or [],
+                                                     health_statuses=module.params.get('health_statuses') or [])
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to get the group instances: " + str(exc))
+
+    if unknown_ids:
+        module.fail_json(msg="Instances {0} are not active in group {1}".format(", ".join(unknown_ids), group['id']))
+
+    draining_timeout = module.params.get('draining_timeout')
+    if draining_timeout is None:
+        draining_timeout = (group.get('strategy') or dict()).get('draining_timeout')
+
+    batches = get_batches(instance_ids, module.params.get('batch_size'))
+
+    if module.check_mode or not batches:
+        return group['id'], [dict(instance_ids=batch) for batch in batches], []
+
+    batches, instances, error = detach_instances(
+        client=client, group_id=group['id'], batches=batches, action=module.params.get('action'),
+        should_terminate_instances=module.params.get('should_terminate_instances'),
+        draining_timeout=draining_timeout, health_check=module.params.get('health_check'),
+        wait_timeout=module.params.get('wait_timeout'))
+
+    if error is not None:
+        module.fail_json(msg=error, changed=bool(batches), group_id=group['id'], batches=batches)
+
+    return group['id'], batches, instances
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find(':')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    if account is not None:
+        session = spotinst.SpotinstSession(auth_token=token, account_id=account)
+    else:
+        session = spotinst.SpotinstSession(auth_token=token)
+
+    client = session.client("elastigroup_aws")
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        id=dict(type='str'),
+        name=dict(type='str'),
+        instance_ids=dict(type='list', elements='str'),
+        health_statuses=dict(type='list', elements='str'),
+        action=dict(type='str', default='replace', choices=['replace', 'detach']),
+        should_terminate_instances=dict(type='bool', default=True),
+        draining_timeout=dict(type='int'),
+        batch_size=dict(type='int', default=1),
+        health_check=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=900))
+
+    module = AnsibleModule(argument_spec=fields,
+                           required_one_of=[['id', 'name'], ['instance_ids', 'health_statuses']],
+                           supports_check_mode=True)
+
+    if module.params.get('batch_size') < 1:
+        module.fail_json(msg="batch_size must be at least 1")
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
+
+    client = get_client(module=module)
+
+    group_id, batches, instances = handle_detach(client=client, module=module)
+
+    module.exit_json(changed=bool(batches), group_id=group_id, batches=batches, instances=instances)
+
+
+if __name__ == '__main__':
+    main()
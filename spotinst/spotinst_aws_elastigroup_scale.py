@@ -0,0 +1,369 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_scale
+version_added: 2.8
+short_description: Change the capacity of many Spotinst AWS Elastigroups
+author: Spotinst (@jeffnoehren)
+description:
+  - Updates only the capacity (minimum, maximum and target) of a list of Elastigroups, in parallel, without the
+    rest of their definition. Optionally waits for every group to have target instances, polling only the groups
+    that are not there yet.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk2 >= 2.0.0
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  groups:
+    type: list
+    description:
+      - The groups to scale. Every item has the id or the name of the group and any of min_size, max_size and
+        target. Names are looked up with one listing of the groups, the task fails when several groups have one
+        of the names
+    required: true
+
+  wait_for_instances:
+    type: bool
+    default: false
+    description:
+      - Wait for every group to have target instances
+
+  health_check:
+    type: bool
+    default: false
+    description:
+      - Count the instances reported healthy by the health check of the groups instead of the instances with a
+        private ip. Only works if wait_for_instances is True.
+
+  wait_timeout:
+    type: int
+    default: 300
+    description:
+      - How long to wait, in seconds, for all the groups. Only works if wait_for_instances is True.
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we scale out the web tier for a burst and wait for the instances
+
+- hosts: localhost
+  tasks:
+    - name: scale elastigroups
+      spotinst_aws_elastigroup_scale:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        groups:
+          - name: web-us-west-2a
+            max_size: 40
+            target: 30
+          - id: sig-992a78db
+            target: 12
+        wait_for_instances: true
+        wait_timeout: 600
+      register: result
+    - debug: var=result.groups
+"""
+RETURN = """
+---
+groups:
+    type: list
+    returned: success
+    description:
+      - Every group with its status (scaled, fulfilled, timed_out, missing or failed), the capacity sent, and,
+        with wait_for_instances, its instances and the seconds it took to have them
+    sample: [{"id": "sig-992a78db", "name": "web", "status": "fulfilled", "capacity": {"target": 12},
+              "seconds": 95.3, "instances": [{"instance_id": "i-0e9f4a1b", "private_ip": "10.0.0.12"}]}]
+summary:
+    type: dict
+    returned: success
+    description: Number of groups by status
+    sample: {"scaled": 0, "fulfilled": 2, "timed_out": 0, "missing": 0, "failed": 0}
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk2 as spotinst
+    from spotinst_sdk2.client import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 30
+
+# group param and the capacity field it sets
+CAPACITY_PARAMS = (('min_size', 'minimum'), ('max_size', 'maximum'), ('target', 'target'))
+
+
+# region Scale Functions
+def get_capacity(group):
+    """The capacity fields set by a group item"""
+    return dict((field, group.get(param)) for param, field in CAPACITY_PARAMS if group.get(param) is not None)
+
+
+def validate_groups(groups):
+    errors = []
+
+    for index, group in enumerate(groups):
+        capacity = get_capacity(group)
+
+        if group.get('id') is None and group.get('name') is None:
+            errors.append("groups[{0}] must have an id or a name".format(index))
+        if not capacity:
+            errors.append("groups[{0}] must have a min_size, max_size or target".format(index))
+        elif any(low is not None and high is not None and low > high for low, high in (
+                (capacity.get('minimum'), capacity.get('target')), (capacity.get('target'), capacity.get('maximum')),
+                (capacity.get('minimum'), capacity.get('maximum')))):
+            errors.append("groups[{0}] must have min_size <= target <= max_size".format(index))
+
+    return errors
+
+
+def update_capacity(client, group_id, capacity):
+    group_update = spotinst.models.elastigroup.aws.Elastigroup(
+        capacity=spotinst.models.elastigroup.aws.Capacity(**capacity))
+
+    client.update_elastigroup(group_update=group_update, group_id=group_id)
+
+
+def get_fulfilled_instances(client, group_id, health_check):
+    """The healthy instances of the group with health_check, otherwise the active ones with a private ip"""
+    if health_check:
+        return [instance for instance in client.get_instance_healthiness(group_id=group_id)
+                if instance.get('health_status') == 'HEALTHY']
+
+    return [instance for instance in client.get_elastigroup_active_instances(group_id=group_id)
+            if instance.get('private_ip') is not None]
+
+
+def wait_for_groups(executor, groups, poll, deadline, max_interval):
+    """
+    Run poll on the groups together, with an interval that doubles up to max_interval, until it returns True for
+    every group or deadline passes. The error of a failed poll is kept on its group until a poll succeeds.
+    Returns the groups still pending at the deadline.
+    """
+    interval = POLL_INTERVAL
+
+    while True:
+        futures = [executor.submit(poll, group) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                is_done = future.result()
+            except SpotinstClientException as exc:
+                group['error'] = str(exc)
+                is_done = False
+            else:
+                group.pop('error', None)
+
+            if not is_done:
+                pending.append(group)
+
+        groups = pending
+        if not groups or time.time() + interval > deadline:
+            return groups
+
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def scale_groups(client, groups, wait_for_instances, health_check, wait_timeout, max_workers):
+    """
+    Update the capacity of the groups in parallel and, with wait_for_instances, poll the groups with a target
+    together until each has its target instances or wait_timeout passes. Fulfilled groups are not polled again.
+    """
+    started_at = time.time()
+
+    def poll(group):
+        group['instances'] = get_fulfilled_instances(client, group['id'], health_check)
+        if len(group['instances']) < group['capacity']['target']:
+            return False
+
+        group.update(status='fulfilled', seconds=round(time.time() - started_at, 1))
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(update_capacity, client, group['id'], group['capacity']) for group in groups]
+
+        pending = []
+        for group, future in zip(groups, futures):
+            try:
+                future.result()
+            except SpotinstClientException as exc:
+                group.update(status='failed', error=str(exc))
+                continue
+
+            group['status'] = 'scaled'
+            if wait_for_instances and group['capacity'].get('target') is not None:
+                pending.append(group)
+
+        if pending:
+            for group in wait_for_groups(executor=executor, groups=pending, poll=poll,
+                                         deadline=started_at + wait_timeout, max_interval=MAX_POLL_INTERVAL):
+                group.update(status='timed_out', seconds=round(time.time() - started_at, 1))
+
+    return groups
+# endregion
+
+
+# region Util Functions
+def get_groups(client, group_items):
+    """
+    The groups to scale with their capacity, names are looked up with one listing. Raises ValueError when several
+    groups have one of the names.
+    """
+    ids_by_name = dict()
+    names = [item.get('name') for item in group_items if item.get('id') is None]
+
+    if names:
+        for group in client.get_elastigroups():
+            ids_by_name.setdefault(group.get('name'), []).append(group.get('id'))
+
+        ambiguous_names = ["{0} ({1})".format(name, ", ".join(ids_by_name[name])) for name in names
+                           if len(ids_by_name.get(name, [])) > 1]
+        if ambiguous_names:
+            raise ValueError("Several groups have the names " + "; ".join(ambiguous_names))
+
+    return [dict(id=item.get('id') or (ids_by_name.get(item.get('name')) or [None])[0], name=item.get('name'),
+                 capacity=get_capacity(item)) for item in group_items]
+
+
+def handle_scale(client, module):
+    try:
+        groups = get_groups(client=client, group_items=module.params.get('groups'))
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to list the groups: " + str(exc))
+    except ValueError as exc:
+        module.fail_json(msg=str(exc) + ", use their ids to scale them")
+
+    existing_groups = []
+    for group in groups:
+        if group['id'] is None:
+            group['status'] = 'missing'
+        elif module.check_mode:
+            group['status'] = 'scaled'
+        else:
+            existing_groups.append(group)
+
+    if existing_groups:
+        scale_groups(client=client, groups=existing_groups,
+                     wait_for_instances=module.params.get('wait_for_instances'),
+                     health_check=module.params.get('health_check'),
+                     wait_timeout=module.params.get('wait_timeout'),
+                     max_workers=module.params.get('max_workers') or 1)
+
+    summary = dict(scaled=0, fulfilled=0, timed_out=0, missing=0, failed=0)
+    for group in groups:
+        summary[group['status']] += 1
+
+    return groups, summary
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find(':')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    if account is not None:
+        session = spotinst.SpotinstSession(auth_token=token, account_id=account)
+    else:
+        session = spotinst.SpotinstSession(auth_token=token)
+
+    client = session.client("elastigroup_aws")
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        groups=dict(type='list', elements='dict', required=True),
+        wait_for_instances=dict(type='bool', default=False),
+        health_check=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=300),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    errors = validate_groups(module.params.get('groups'))
+    if errors:
+        module.fail_json(msg="Invalid groups: " + "; ".join(errors))
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk2)")
+
+    client = get_client(module=module)
+
+    groups, summary = handle_scale(client=client, module=module)
+
+    has_changed = summary['missing'] + summary['failed'] < len(groups)
+
+    module.exit_json(changed=has_changed, groups=groups, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_aws_elastigroup_schedule_analyzer
+version_added: 2.8
+short_description: Find the scheduled tasks of Elastigroups that conflict with each other or with the scaling policies
+author: Spotinst (@jeffnoehren)
+description:
+  - Expands the scheduled tasks of a batch of Elastigroups, given with the params of spotinst_aws_elastigroup,
+    over a horizon and replays the changes they make to the minimum, maximum and target capacity of every group.
+    Reports the conflicts
+    - overlap, capacity changing tasks of a group that fire at the same time
+    - invalid_capacity, a task leaves the group with a minimum above its maximum or a target outside of them
+    - clamped, a scale up or down task is cut by the minimum or maximum of the group
+    - policies_blocked, the tasks pin the capacity (minimum equal to maximum) of a group that has scaling policies
+    - policy_out_of_bounds, a scaling policy sets capacities outside of the minimum and maximum set by the tasks
+    Cron expressions are expanded once for all the groups that share them.
+    No API call is made, so it can run on every change of the group definitions.
+requirements:
+  - python >= 2.7
+options:
+
+  groups:
+    type: list
+    description:
+      - The groups, each with the params of spotinst_aws_elastigroup, at least name, min_size, max_size, target
+        and scheduled_tasks, and the up_scaling_policies, down_scaling_policies and target_tracking_policies
+    required: true
+
+  horizon_days:
+    type: int
+    default: 7
+    description:
+      - Number of days the scheduled tasks are expanded over
+
+  start:
+    type: str
+    description:
+      - Start of the horizon, in UTC (YYYY-MM-DDTHH:MM:SSZ). By default the current time
+
+  fail_on_conflict:
+    type: bool
+    default: false
+    description:
+      - Fail the task when there are conflicts
+"""
+EXAMPLES = """
+#In this basic example, we check the scheduled tasks of our groups on every change
+
+- hosts: localhost
+  vars_files:
+    - elastigroups.yml
+  tasks:
+    - name: analyze scheduled tasks
+      spotinst_aws_elastigroup_schedule_analyzer:
+        groups: "{{ elastigroups }}"
+        horizon_days: 14
+        fail_on_conflict: true
+      register: result
+    - debug: var=result.summary
+"""
+RETURN = """
+---
+conflicts:
+    type: list
+    returned: success
+    description:
+      - The conflicts by group, with the indexes of the tasks or the name of the policy involved.
+        A repeating conflict is reported once, with the time it first happens and its number of occurrences
+    sample: [{"group": "ansible_test_group", "kind": "overlap", "time": "2020-01-06T08:00:00Z", "tasks": [0, 2],
+              "occurrences": 5, "message": "2 scheduled tasks change the capacity at the same time"}]
+summary:
+    type: dict
+    returned: success
+    description: Number of groups, tasks, firings and conflicts by kind
+    sample: {"groups": 120, "tasks": 860, "firings": 11220, "conflicts": {"overlap": 3, "clamped": 1}}
+"""
+__metaclass__ = type
+
+import calendar
+import time
+from datetime import datetime, timedelta
+from ansible.module_utils.basic import AnsibleModule
+
+CRON_MONTH_NAMES = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+CRON_DAY_NAMES = ('SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT')
+# minute, hour, day of month, month and day of week, with their range and the names they can be given by
+CRON_FIELDS = (('minute', 0, 59, ()), ('hour', 0, 23, ()), ('day of month', 1, 31, ()),
+               ('month', 1, 12, CRON_MONTH_NAMES), ('day of week', 0, 7, CRON_DAY_NAMES))
+
+FREQUENCIES = dict(hourly=timedelta(hours=1), daily=timedelta(days=1), weekly=timedelta(days=7))
+
+# scheduled task types that change the capacity, the others (roll, backup_ami) are ignored
+CAPACITY_TASK_TYPES = ('scale', 'statefulUpdateCapacity', 'scaleUp', 'percentageScaleUp', 'scaleDown',
+                       'percentageScaleDown')
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+# region Cron Functions
+# the cron parsing of spotinst_mrscaler, repeated as the modules are shipped on their own.
+# A test checks that both copies stay the same, change them together
+def parse_cron_value(value, minimum, names):
+    value = value.upper()
+
+    if value in names:
+        return names.index(value) + minimum
+
+    return int(value)
+
+
+def parse_cron_field(field, name, minimum, maximum, names):
+    """The values of a cron field, e.g. 1-5, */15 or MON,WED"""
+    values = set()
+
+    for part in field.split(','):
+        range_part, _, step = part.partition('/')
+
+        if range_part in ('*', '?'):
+            first, last = minimum, maximum
+        elif '-' in range_part:
+            first, last = [parse_cron_value(value, minimum, names) for value in range_part.split('-', 1)]
+        else:
+            first = parse_cron_value(range_part, minimum, names)
+            last = maximum if step else first
+
+        step = int(step) if step else 1
+
+        if not minimum <= first <= last <= maximum or step < 1:
+            raise ValueError("invalid {0} field {1}".format(name, field))
+
+        values.update(range(first, last + 1, step))
+
+    return values
+
+
+def parse_cron_expression(cron_expression):
+    fields = cron_expression.split()
+
+    if len(fields) != len(CRON_FIELDS):
+        raise ValueError("cron expression {0} must have {1} fields".format(cron_expression, len(CRON_FIELDS)))
+
+    try:
+        minutes, hours, days, months, weekdays = [
+            parse_cron_field(field, name, minimum, maximum, names)
+            for field, (name, minimum, maximum, names) in zip(fields, CRON_FIELDS)]
+    except ValueError as exc:
+        raise ValueError("cron expression {0}: {1}".format(cron_expression, exc))
+
+    # 7 is sunday as well
+    if 7 in weekdays:
+        weekdays = (weekdays - {7}) | {0}
+
+    return dict(minutes=sorted(minutes), hours=sorted(hours), days=days, months=months, weekdays=weekdays,
+                any_day=fields[2] in ('*', '?'), any_weekday=fields[4] in ('*', '?'))
+
+
+def is_cron_day(cron, day):
+    if day.month not in cron['months']:
+        return False
+
+    is_day = day.day in cron['days']
+    is_weekday = (day.weekday() + 1) % 7 in cron['weekdays']
+
+    # like cron, a restricted day of month and day of week match either
+    if cron['any_day'] and cron['any_weekday']:
+        return True
+    if cron['any_day']:
+        return is_weekday
+    if cron['any_weekday']:
+        return is_day
+
+    return is_day or is_weekday
+
+
+def get_cron_firings(cron_expression, start, end):
+    """The times after start and up to end at which the cron expression fires"""
+    cron = parse_cron_expression(cron_expression)
+    firings = []
+    day = datetime(start.year, start.month, start.day)
+
+    while day <= end:
+        if is_cron_day(cron, day):
+            for hour in cron['hours']:
+                for minute in cron['minutes']:
+                    firing = day.replace(hour=hour, minute=minute)
+
+                    if start < firing <= end:
+                        firings.append(firing)
+
+        day += timedelta(days=1)
+
+    return firings
+
+
+def get_frequency_firings(frequency, start_time, start, end):
+    interval = FREQUENCIES.get(frequency)
+    if interval is None:
+        raise ValueError("unsupported frequency {0}".format(frequency))
+
+    firing = parse_time(start_time) if start_time else start
+    if firing <= start:
+        # the first firing after start
+        firing += interval * ((start - firing) // interval + 1)
+
+    firings = []
+    while firing <= end:
+        firings.append(firing)
+        firing += interval
+
+    return firings
+
+
+def parse_time(value):
+    for time_format in (TIME_FORMAT, '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ'):
+        try:
+            return datetime.strptime(value, time_format)
+        except ValueError:
+            pass
+
+    raise ValueError("invalid time " + value)
+# endregion
+
+
+# region Analysis Functions
+def get_task_firings(task, start, end, firings_cache):
+    """Firing times of a task, expanded once for every schedule shared by several tasks"""
+    if task.get('cron_expression'):
+        key = ('cron', task['cron_expression'])
+    elif task.get('frequency'):
+        key = ('frequency', task['frequency'], task.get('start_time'))
+    else:
+        raise ValueError("every scheduled task must have a cron_expression or a frequency")
+
+    if key not in firings_cache:
+        if key[0] == 'cron':
+            firings_cache[key] = get_cron_firings(task['cron_expression'], start, end)
+        else:
+            firings_cache[key] = get_frequency_firings(task['frequency'], task.get('start_time'), start, end)
+
+    return firings_cache[key]
+
+
+def apply_task(task, capacity):
+    """The (minimum, maximum, target) capacity after the task and whether a scale up or down was cut"""
+    minimum, maximum, target = capacity
+    task_type = task.get('task_type')
+
+    if task_type in ('scale', 'statefulUpdateCapacity'):
+        for field, index in (('scale_min_capacity', 0), ('scale_max_capacity', 1), ('scale_target_capacity', 2)):
+            if task.get(field) is not None:
+                capacity = capacity[:index] + (int(task.get(field)),) + capacity[index + 1:]
+
+        return capacity, False
+
+    if task_type in ('percentageScaleUp', 'percentageScaleDown'):
+        adjustment = int(round(target * float(task.get('adjustment_percentage') or 0) / 100))
+    else:
+        adjustment = int(task.get('adjustment') or 0)
+
+    new_target = target + adjustment if task_type.endswith('Up') else target - adjustment
+    clamped_target = min(max(new_target, minimum), maximum)
+
+    return (minimum, maximum, clamped_target), clamped_target != new_target
+
+
+def get_policy_conflicts(policies, capacity):
+    """Scaling policies that set capacities outside of the minimum and maximum"""
+    minimum, maximum, _ = capacity
+    conflicts = []
+
+    for policy in policies:
+        action_type = policy.get('action_type')
+        values = []
+
+        if action_type == 'setMinTarget':
+            values = [policy.get('min_target_capacity')]
+        elif action_type == 'setMaxTarget':
+            values = [policy.get('max_target_capacity')]
+        elif action_type == 'updateCapacity':
+            values = [policy.get('minimum'), policy.get('maximum'), policy.get('target')]
+
+        if any(value is not None and not minimum <= int(value) <= maximum for value in values):
+            conflicts.append(policy)
+
+    return conflicts
+
+
+def analyze_group(group, start, end, firings_cache):
+    """
+    Conflicts of the scheduled tasks of a group and its number of tasks and firings.
+    A conflict that repeats, like a daily overlap, is reported once with the time it first happens and
+    its number of occurrences.
+    """
+    name = group.get('name')
+    tasks = [task for task in group.get('scheduled_tasks') or []
+             if task.get('is_enabled') is not False and task.get('task_type') in CAPACITY_TASK_TYPES]
+    policies = (group.get('up_scaling_policies') or []) + (group.get('down_scaling_policies') or [])
+    has_policies = bool(policies or group.get('target_tracking_policies'))
+
+    tasks_by_firing = dict()
+    for index, task in enumerate(tasks):
+        for firing in get_task_firings(task, start, end, firings_cache):
+            tasks_by_firing.setdefault(firing, []).append(index)
+
+    configured_capacity = (int(group.get('min_size') or 0), int(group.get('max_size') or 0),
+                           int(group.get('target') or 0))
+    capacity = configured_capacity
+    # conflicts by what makes them the same conflict, in the order they first happen
+    conflicts = dict()
+    policy_conflicts_by_window = dict()
+
+    def add_conflict(key, firing, message, **kwargs):
+        if key in conflicts:
+            conflicts[key]['occurrences'] += 1
+        else:
+            conflicts[key] = dict(group=name, kind=key[0], time=firing.strftime(TIME_FORMAT), occurrences=1,
+                                  message=message, **kwargs)
+
+    for firing in sorted(tasks_by_firing):
+        indexes = tasks_by_firing[firing]
+
+        if len(indexes) > 1:
+            add_conflict(('overlap', tuple(indexes)), firing,
+                         "{0} scheduled tasks change the capacity at the same time".format(len(indexes)),
+                         tasks=indexes)
+
+        for index in indexes:
+            capacity, is_clamped = apply_task(tasks[index], capacity)
+            if is_clamped:
+                add_conflict(('clamped', index), firing, "the scale of the task is cut by the minimum or maximum",
+                             tasks=[index])
+
+        minimum, maximum, target = capacity
+        if minimum > maximum or not minimum <= target <= maximum:
+            add_conflict(('invalid_capacity', capacity), firing,
+                         "minimum {0}, maximum {1} and target {2} are invalid".format(minimum, maximum, target),
+                         tasks=indexes)
+            continue
+
+        if capacity == configured_capacity:
+            continue
+
+        window = (minimum, maximum)
+        if minimum == maximum and has_policies:
+            add_conflict(('policies_blocked', window), firing,
+                         "the capacity is pinned to {0} while the group has scaling policies".format(minimum),
+                         tasks=indexes)
+
+        if window not in policy_conflicts_by_window:
+            policy_conflicts_by_window[window] = get_policy_conflicts(policies, capacity)
+
+        for policy in policy_conflicts_by_window[window]:
+            add_conflict(('policy_out_of_bounds', policy.get('policy_name'), window), firing,
+                         "the policy sets capacities outside of minimum {0} and maximum {1}".format(minimum, maximum),
+                         tasks=indexes, policy=policy.get('policy_name'))
+
+    return list(conflicts.values()), len(tasks), sum(len(indexes) for indexes in tasks_by_firing.values())
+
+
+def analyze_groups(groups, start, end):
+    firings_cache = dict()
+    conflicts = []
+    summary = dict(groups=len(groups), tasks=0, firings=0, conflicts=dict())
+
+    for group in groups:
+        group_conflicts, task_count, firing_count = analyze_group(group, start, end, firings_cache)
+
+        conflicts.extend(group_conflicts)
+        summary['tasks'] += task_count
+        summary['firings'] += firing_count
+
+        for conflict in group_conflicts:
+            summary['conflicts'][conflict['kind']] = summary['conflicts'].get(conflict['kind'], 0) + 1
+
+    return conflicts, summary
+# endregion
+
+
+def handle_analysis(module):
+    try:
+        if module.params.get('start'):
+            start = parse_time(module.params.get('start'))
+        else:
+            start = datetime.utcfromtimestamp(calendar.timegm(time.gmtime())).replace(second=0)
+
+        end = start + timedelta(days=module.params.get('horizon_days'))
+
+        conflicts, summary = analyze_groups(groups=module.params.get('groups'), start=start, end=end)
+    except (TypeError, ValueError) as exc:
+        module.fail_json(msg="Error while attempting to analyze the scheduled tasks: " + str(exc))
+
+    if module.params.get('fail_on_conflict') and conflicts:
+        module.fail_json(msg="Found {0} conflicts".format(len(conflicts)), conflicts=conflicts, summary=summary)
+
+    return conflicts, summary
+
+
+def main():
+    fields = dict(
+        groups=dict(type='list', elements='dict', required=True),
+        horizon_days=dict(type='int', default=7),
+        start=dict(type='str'),
+        fail_on_conflict=dict(type='bool', default=False))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    conflicts, summary = handle_analysis(module=module)
+
+    module.exit_json(changed=False, conflicts=conflicts, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
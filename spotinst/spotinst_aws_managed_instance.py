@@ -18,6 +18,7 @@ description: >
     Full documentation available at [our docs site](https://docs.spot.io/)
 requirements:
     - python >= 3.6
+    - ansible-core >= 2.11
     - spotinst_sdk2 >= 2.0.0
 options:
     token:
@@ -524,7 +525,6 @@ __metaclass__ = type
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import env_fallback
-import copy
 
 try:
     import spotinst_sdk2 as spotinst
@@ -551,25 +551,21 @@ LIST_MEMBER_CLS_NAME_BY_ATTR_NAME = {
 
 
 class SpotAnsibleModule(AnsibleModule):
+    """
+    AnsibleModule that also keeps the user input as it was given, in `custom_params`.
 
-    def __init__(self, argument_spec, bypass_checks=False, no_log=False, mutually_exclusive=None,
-                 required_together=None, required_one_of=None, add_file_common_args=False, supports_check_mode=False,
-                 required_if=None, required_by=None):
-        """
-        Common code for quickly building an ansible module in Python
-        (although you can write modules with anything that can return JSON).
+    Argument spec validation fills every unset sub-option with None, which would then be sent
+    to the API. `custom_params` holds the params before validation, without those None values.
+    """
 
-        See :ref:`developing_modules_general` for a general introduction
-        and :ref:`developing_program_flow_modules` for more detailed explanation.
-        """
+    def _load_params(self):
+        super()._load_params()
 
-        self.argument_spec = argument_spec
-
-        self._load_params()
-        self._set_internal_properties()
-        self.custom_params = self.params
-        super().__init__(argument_spec, bypass_checks, no_log, mutually_exclusive, required_together, required_one_of,
-                         add_file_common_args, supports_check_mode, required_if, required_by)
+        # Validation only rebinds the top-level keys of `self.params` (the validated values are
+        # deep-copied), so a shallow copy is enough to keep the raw nested input intact.
+        self.custom_params = {
+            key: value for key, value in self.params.items() if not key.startswith("_ansible_")
+        }
 
 
 def to_snake_case(camel_str):
@@ -627,7 +623,7 @@ def get_client(module):
     return client
 
 
-def turn_to_model(content, field_name: str, curr_path=None):
+def turn_to_model(content, field_name, curr_path=None):
     if content is None:
         return None
     elif is_primitive(content):
@@ -642,16 +638,21 @@ def turn_to_model(content, field_name: str, curr_path=None):
         return new_l
 
     elif isinstance(content, dict):
-        if curr_path is not None:
-            curr_path += "." + field_name
+        if not isinstance(field_name, str):
+            # an SDK model instance to populate, e.g. `DeallocationConfig()`
+            instance = field_name
+            curr_path = to_snake_case(type(instance).__name__)
         else:
-            curr_path = field_name
+            if curr_path is not None:
+                curr_path += "." + field_name
+            else:
+                curr_path = field_name
 
-        override = find_in_overrides(curr_path)
-        key_to_use = override if override else to_pascal_case(field_name)
+            override = find_in_overrides(curr_path)
+            key_to_use = override if override else to_pascal_case(field_name)
 
-        class_ = getattr(spotinst.models.managed_instance.aws, key_to_use)
-        instance = class_()
+            class_ = getattr(spotinst.models.managed_instance.aws, key_to_use)
+            instance = class_()
 
         for key, value in content.items():
             new_value = turn_to_model(value, key, curr_path)
@@ -669,25 +670,37 @@ def find_mis_with_same_name(managed_instances, name):
     return ret_val
 
 
-def clean_do_not_update_fields(
-        managed_instance_module_copy: dict, do_not_update_list: list
-):
-    ret_val = managed_instance_module_copy
+def clean_do_not_update_fields(managed_instance: dict, do_not_update_list: list):
+    """
+    Return `managed_instance` without the attributes at the given dotted paths.
+
+    The input is never modified. Only the dicts along a removed path are copied, every other
+    branch (e.g. `user_data` or long record set lists) is shared with the input.
+    """
+    ret_val = managed_instance
+
+    for dotted_path in do_not_update_list or []:
+        ret_val = _without_path(ret_val, dotted_path.split("."))
+
+    return ret_val
+
+
+def _without_path(content, path_as_list):
+    if not isinstance(content, dict):
+        return content
 
-    # avoid deleting parent dicts before children
-    do_not_update_list = sorted(do_not_update_list, key=lambda x: len(x), reverse=True)
+    first_part_of_path = path_as_list[0]
+    value = content.get(first_part_of_path)
 
-    for dotted_path in do_not_update_list:
-        curr_dict = managed_instance_module_copy
-        path_as_list = dotted_path.split(".")
-        last_part_of_path = path_as_list[-1]
+    if value is None:
+        return content
 
-        for path_part in path_as_list[:-1]:
-            new_dict = curr_dict.get(path_part)
-            curr_dict = new_dict
+    ret_val = dict(content)
 
-        if curr_dict.get(last_part_of_path) is not None:
-            del curr_dict[last_part_of_path]
+    if len(path_as_list) == 1:
+        del ret_val[first_part_of_path]
+    else:
+        ret_val[first_part_of_path] = _without_path(value, path_as_list[1:])
 
     return ret_val
 
@@ -751,15 +764,15 @@ def get_id_and_operation(client, state: str, module: SpotAnsibleModule):
 
 def handle_managed_instance(client, module):
     mi_models = spotinst.models.managed_instance.aws
-    managed_instance_module_copy = copy.deepcopy(module.custom_params.get("managed_instance"))
+    managed_instance = module.custom_params.get("managed_instance")
     state = module.custom_params.get("state")
 
     operation, mi_id = get_id_and_operation(client, state, module)
 
     if operation == "create":
-        has_changed, managed_instance_id, message = handle_create_managed_instance(client, managed_instance_module_copy)
+        has_changed, managed_instance_id, message = handle_create_managed_instance(client, managed_instance)
     elif operation == "update":
-        has_changed, managed_instance_id, message = handle_update_managed_instance(client, managed_instance_module_copy,
+        has_changed, managed_instance_id, message = handle_update_managed_instance(client, managed_instance,
                                                                                    mi_id, module)
     elif operation == "delete":
         has_changed, managed_instance_id, message = handle_delete_managed_instance(client, mi_id, mi_models, module)
@@ -793,12 +806,12 @@ def handle_delete_managed_instance(client, mi_id, mi_models, module):
     return has_changed, managed_instance_id, message
 
 
-def handle_update_managed_instance(client, managed_instance_module_copy, mi_id, module):
-    managed_instance_module_copy = clean_do_not_update_fields(
-        managed_instance_module_copy,
+def handle_update_managed_instance(client, managed_instance, mi_id, module):
+    managed_instance = clean_do_not_update_fields(
+        managed_instance,
         module.custom_params.get("do_not_update")
     )
-    ami_sdk_object = turn_to_model(managed_instance_module_copy, "managed_instance")
+    ami_sdk_object = turn_to_model(managed_instance, "managed_instance")
 
     try:
         res: dict = client.update_managed_instance(mi_id, managed_instance_update=ami_sdk_object)
@@ -826,9 +839,9 @@ def handle_update_managed_instance(client, managed_instance_module_copy, mi_id,
     return has_changed, mi_id, message
 
 
-def handle_create_managed_instance(client, managed_instance_module_copy):
+def handle_create_managed_instance(client, managed_instance):
     ami_sdk_object = turn_to_model(
-        managed_instance_module_copy, "managed_instance"
+        managed_instance, "managed_instance"
     )
     res: dict = client.create_managed_instance(managed_instance=ami_sdk_object)
     managed_instance_id = res["id"]
@@ -0,0 +1,529 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_emr_scaling_simulator
+version_added: 2.8
+short_description: Simulate the scaling policies of an EMR task group against historical metrics
+author: Spotinst (@jeffnoehren)
+description:
+  - Replays a CSV of CloudWatch style metrics against the up and down scaling policies of spotinst_mrscaler and
+    reports the capacity of the task group over time, its instance hours and the periods in which demand was
+    not answered.
+    Every policy is evaluated like a CloudWatch alarm - the metric is aggregated by period with the statistic of
+    the policy and the policy fires when the threshold is breached for evaluation_periods consecutive periods
+    and its cooldown is over. The capacity stays within the minimum and maximum of the task group.
+    The metrics are replayed as recorded, they don't react to the simulated capacity.
+    The policies are evaluated with numpy when it is installed.
+    No API call is made.
+requirements:
+  - python >= 2.7
+options:
+
+  metrics:
+    type: path
+    description:
+      - CSV file with a timestamp column (epoch seconds or ISO 8601 in UTC) and one column of values per metric
+        name, e.g. timestamp,YARNMemoryAvailablePercentage,AppsPending
+    required: true
+
+  scaling:
+    type: dict
+    description:
+      - The up and down scaling policies, as given to spotinst_mrscaler, policies with steps included.
+        The supported action types are adjustment, percentageAdjustment, setMinTarget and updateCapacity
+    required: true
+
+  capacity:
+    type: dict
+    description:
+      - The capacity of the task group, with the keys minimum, maximum and target (the capacity at the start,
+        by default the minimum). minimum and maximum are required and target must be within them
+    required: true
+
+  instance_price:
+    type: float
+    description:
+      - Hourly price of a task group instance, to report the cost of the simulated capacity
+"""
+EXAMPLES = """
+#In this basic example, we compare the capacity of a step ladder with a month of task group metrics
+
+- hosts: localhost
+  tasks:
+    - name: simulate scaling
+      spotinst_emr_scaling_simulator:
+        metrics: /var/metrics/emr-task-group-2020-01.csv
+        instance_price: 0.08
+        capacity:
+          minimum: 0
+          maximum: 20
+          target: 2
+        scaling:
+          up:
+            - metric_name: YARNMemoryAvailablePercentage
+              statistic: average
+              operator: lt
+              period: 300
+              evaluation_periods: 1
+              cooldown: 300
+              action:
+                type: adjustment
+              steps:
+                start: 40
+                stop: 10
+                step: -10
+          down:
+            - metric_name: YARNMemoryAvailablePercentage
+              statistic: average
+              operator: gt
+              threshold: 80
+              period: 300
+              evaluation_periods: 3
+              cooldown: 600
+              action:
+                type: adjustment
+                adjustment: 1
+      register: result
+    - debug: var=result.summary
+"""
+RETURN = """
+---
+summary:
+    type: dict
+    returned: success
+    description:
+      - Capacity statistics of the simulation. sla_misses is the number of periods in which a scale up policy
+        breached its threshold but no capacity was added
+    sample: {"start": "2020-01-01T00:00:00Z", "end": "2020-02-01T00:00:00Z", "min_capacity": 0,
+             "max_capacity": 14, "mean_capacity": 4.2, "instance_hours": 3124.5, "cost": 249.96,
+             "scale_ups": 120, "scale_downs": 118, "sla_misses": 37}
+capacity_changes:
+    type: list
+    returned: success
+    description: Every change of the capacity with the policy that made it
+    sample: [{"timestamp": "2020-01-01T08:05:00Z", "capacity": 3, "direction": "up",
+              "metric_name": "YARNMemoryAvailablePercentage", "threshold": 40}]
+"""
+HAS_NUMPY = False
+__metaclass__ = type
+
+import calendar
+import csv
+import math
+import time
+from datetime import datetime
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    import numpy
+
+    HAS_NUMPY = True
+
+except ImportError:
+    pass
+
+TIMESTAMP_FORMATS = ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ')
+
+OPERATORS = dict(
+    gt=lambda value, threshold: value > threshold,
+    gte=lambda value, threshold: value >= threshold,
+    lt=lambda value, threshold: value < threshold,
+    lte=lambda value, threshold: value <= threshold)
+
+STATISTICS = ('average', 'sum', 'minimum', 'maximum', 'samplecount')
+
+
+# region Metrics Functions
+def parse_timestamp(value):
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return float(calendar.timegm(datetime.strptime(value, timestamp_format).timetuple()))
+        except ValueError:
+            pass
+
+    raise ValueError("invalid timestamp " + value)
+
+
+def format_timestamp(timestamp):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+
+def read_metrics(path):
+    """Timestamps, sorted, and the values of every metric column, None where a value is missing"""
+    with open(path, "r") as metrics_file:
+        reader = csv.reader(metrics_file)
+        header = next(reader, None)
+
+        if not header or header[0].strip() != 'timestamp' or len(header) < 2:
+            raise ValueError("the metrics must have a timestamp column followed by metric columns")
+
+        metric_names = [name.strip() for name in header[1:]]
+        rows = []
+
+        for line_number, row in enumerate(reader, 2):
+            if not row:
+                continue
+
+            try:
+                rows.append((parse_timestamp(row[0].strip()),
+                             [float(value) if value.strip() else None for value in row[1:len(header)]]))
+            except ValueError as exc:
+                raise ValueError("line {0}: {1}".format(line_number, exc))
+
+    if not rows:
+        raise ValueError("the metrics have no rows")
+
+    rows.sort(key=lambda row: row[0])
+    timestamps = [timestamp for timestamp, _ in rows]
+    values = dict((name, [row_values[index] if index < len(row_values) else None for _, row_values in rows])
+                  for index, name in enumerate(metric_names))
+
+    return timestamps, values
+# endregion
+
+
+# region Policy Functions
+# the step expansion of spotinst_mrscaler, repeated as the modules are shipped on their own.
+# A test checks that both copies stay the same, change them together
+def generate_step_policies(metrics):
+    """
+    The metrics with every metric that has steps replaced by one policy per step,
+    each with the threshold and action adjustment of its step
+    """
+    policies = []
+
+    for single_metric in metrics:
+        steps = single_metric.get('steps')
+
+        if steps is None:
+            policies.append(single_metric)
+            continue
+
+        thresholds = get_step_thresholds(steps)
+        adjustments = get_step_adjustments(steps, len(thresholds))
+
+        for threshold, adjustment in zip(thresholds, adjustments):
+            policy = dict((key, value) for key, value in single_metric.items() if key != 'steps')
+            policy['threshold'] = threshold
+            policy['action'] = dict(single_metric.get('action') or dict(type='adjustment'), adjustment=adjustment)
+            policies.append(policy)
+
+    return policies
+
+
+def get_step_thresholds(steps):
+    thresholds = steps.get('thresholds')
+
+    if thresholds is not None:
+        if not thresholds:
+            raise ValueError("steps thresholds must not be empty")
+
+        return list(thresholds)
+
+    start = steps.get('start')
+    stop = steps.get('stop')
+    step = steps.get('step')
+
+    if start is None or stop is None or step is None:
+        raise ValueError("steps must have thresholds or start, stop and step")
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError("steps step must go from start towards stop")
+
+    count = int((stop - start) / step + 1e-9) + 1
+
+    # rounded, so that float steps don't add up errors
+    return [round(start + index * step, 6) for index in range(count)]
+
+
+def get_step_adjustments(steps, count):
+    adjustments = steps.get('adjustments')
+
+    if adjustments is not None:
+        if len(adjustments) != count:
+            raise ValueError("steps must have as many adjustments as thresholds")
+
+        return list(adjustments)
+
+    adjustment = steps.get('adjustment', 1)
+    adjustment_step = steps.get('adjustment_step', 0)
+
+    return [adjustment + index * adjustment_step for index in range(count)]
+
+
+def get_policies(scaling):
+    policies = []
+
+    for direction in ('up', 'down'):
+        for policy in generate_step_policies(scaling.get(direction) or []):
+            statistic = str(policy.get('statistic', 'average')).lower()
+            operator = policy.get('operator')
+
+            if statistic not in STATISTICS:
+                raise ValueError("unsupported statistic " + statistic)
+            if operator not in OPERATORS:
+                raise ValueError("unsupported operator {0}".format(operator))
+            if policy.get('metric_name') is None or policy.get('threshold') is None:
+                raise ValueError("every policy must have a metric_name and a threshold")
+
+            policies.append(dict(
+                direction=direction,
+                metric_name=policy.get('metric_name'),
+                statistic=statistic,
+                operator=operator,
+                threshold=float(policy.get('threshold')),
+                period=int(policy.get('period') or 300),
+                evaluation_periods=int(policy.get('evaluation_periods') or 1),
+                cooldown=int(policy.get('cooldown') or 300),
+                action=policy.get('action') or dict(type='adjustment', adjustment=1)))
+
+    return policies
+
+
+def aggregate(timestamps, values, start, period, statistic):
+    """Statistic of the values of every period since start, None for periods without values"""
+    buckets = dict()
+
+    for timestamp, value in zip(timestamps, values):
+        if value is not None:
+            buckets.setdefault(int((timestamp - start) // period), []).append(value)
+
+    count = int((timestamps[-1] - start) // period) + 1
+    aggregated = [None] * count
+
+    for bucket, bucket_values in buckets.items():
+        if statistic == 'average':
+            aggregated[bucket] = sum(bucket_values) / len(bucket_values)
+        elif statistic == 'sum':
+            aggregated[bucket] = sum(bucket_values)
+        elif statistic == 'minimum':
+            aggregated[bucket] = min(bucket_values)
+        elif statistic == 'maximum':
+            aggregated[bucket] = max(bucket_values)
+        else:
+            aggregated[bucket] = float(len(bucket_values))
+
+    return aggregated
+
+
+def evaluate_policy(timestamps, values, start, policy):
+    """Breaching periods and alarming periods (breaching for evaluation_periods periods in a row) of a policy"""
+    if HAS_NUMPY:
+        return evaluate_policy_numpy(timestamps, values, start, policy)
+
+    evaluation_periods = policy['evaluation_periods']
+    aggregated = aggregate(timestamps, values, start, policy['period'], policy['statistic'])
+    compare = OPERATORS[policy['operator']]
+    breaches = [value is not None and compare(value, policy['threshold']) for value in aggregated]
+
+    alarms = []
+    in_a_row = 0
+    for breach in breaches:
+        in_a_row = in_a_row + 1 if breach else 0
+        alarms.append(in_a_row >= evaluation_periods)
+
+    return breaches, alarms
+
+
+def evaluate_policy_numpy(timestamps, values, start, policy):
+    period = policy['period']
+    times = numpy.asarray(timestamps, dtype=float)
+    data = numpy.array([numpy.nan if value is None else value for value in values], dtype=float)
+
+    present = ~numpy.isnan(data)
+    buckets = ((times - start) // period).astype(numpy.int64)
+    count = int(buckets[-1]) + 1
+    buckets, data = buckets[present], data[present]
+
+    samples = numpy.bincount(buckets, minlength=count).astype(float)
+    statistic = policy['statistic']
+
+    if statistic in ('average', 'sum'):
+        aggregated = numpy.bincount(buckets, weights=data, minlength=count)
+        if statistic == 'average':
+            with numpy.errstate(invalid='ignore', divide='ignore'):
+                aggregated = aggregated / samples
+    elif statistic == 'samplecount':
+        aggregated = samples
+    else:
+        aggregated = numpy.full(count, numpy.inf if statistic == 'minimum' else -numpy.inf)
+        reduce_at = numpy.minimum.at if statistic == 'minimum' else numpy.maximum.at
+        reduce_at(aggregated, buckets, data)
+
+    aggregated[samples == 0] = numpy.nan
+
+    with numpy.errstate(invalid='ignore'):
+        breaches = OPERATORS[policy['operator']](aggregated, policy['threshold'])
+
+    # a period alarms when the evaluation_periods periods up to it all breach
+    evaluation_periods = policy['evaluation_periods']
+    breach_counts = numpy.concatenate(([0], numpy.cumsum(breaches)))
+    in_window = breach_counts[1:] - breach_counts[numpy.maximum(numpy.arange(count) + 1 - evaluation_periods, 0)]
+    alarms = (in_window >= evaluation_periods) & (numpy.arange(count) + 1 >= evaluation_periods)
+
+    return breaches.tolist(), alarms.tolist()
+# endregion
+
+
+# region Simulation Functions
+def apply_action(capacity, bounds, action, direction):
+    """The capacity and bounds after the action of a policy"""
+    action_type = action.get('type', 'adjustment')
+    minimum, maximum = bounds
+
+    if action_type == 'adjustment':
+        adjustment = int(action.get('adjustment', 1))
+        capacity = capacity + adjustment if direction == 'up' else capacity - adjustment
+    elif action_type == 'percentageAdjustment':
+        adjustment = int(math.ceil(capacity * float(action.get('adjustment', 0)) / 100))
+        capacity = capacity + adjustment if direction == 'up' else capacity - adjustment
+    elif action_type == 'setMinTarget':
+        capacity = max(capacity, int(action.get('min_target_capacity', 0)))
+    elif action_type == 'updateCapacity':
+        if action.get('minimum') is not None:
+            minimum = int(action.get('minimum'))
+        if action.get('maximum') is not None:
+            maximum = int(action.get('maximum'))
+        if action.get('target') is not None:
+            capacity = int(action.get('target'))
+    else:
+        raise ValueError("unsupported action type {0}".format(action_type))
+
+    return min(max(capacity, minimum), maximum), (minimum, maximum)
+
+
+def get_initial_capacity(capacity):
+    """The bounds and the capacity at the start, the target or else the minimum"""
+    if capacity.get('minimum') is None or capacity.get('maximum') is None:
+        raise ValueError("the capacity must have a minimum and a maximum")
+
+    minimum, maximum = int(capacity['minimum']), int(capacity['maximum'])
+    target = minimum if capacity.get('target') is None else int(capacity['target'])
+
+    if not minimum <= target <= maximum:
+        raise ValueError("the capacity must have minimum <= target <= maximum, got {0} <= {1} <= {2}".format(
+            minimum, target, maximum))
+
+    return (minimum, maximum), target
+
+
+def simulate(timestamps, values, policies, capacity):
+    """Capacity changes and summary of the replay of the metrics against the policies"""
+    start = timestamps[0]
+    end = timestamps[-1] + (timestamps[-1] - timestamps[-2] if len(timestamps) > 1 else 60)
+
+    bounds, initial_capacity = get_initial_capacity(capacity)
+    current = initial_capacity
+
+    # alarms of all the policies, at the end of their periods, up before down at the same time
+    alarms = []
+    up_breach_times = set()
+
+    for index, policy in enumerate(policies):
+        if policy['metric_name'] not in values:
+            raise ValueError("the metrics have no {0} column".format(policy['metric_name']))
+
+        breaches, policy_alarms = evaluate_policy(timestamps, values[policy['metric_name']], start, policy)
+
+        for period_index, (breach, alarm) in enumerate(zip(breaches, policy_alarms)):
+            period_end = start + (period_index + 1) * policy['period']
+            if breach and policy['direction'] == 'up':
+                up_breach_times.add(period_end)
+            if alarm:
+                alarms.append((period_end, 0 if policy['direction'] == 'up' else 1, index))
+
+    alarms.sort()
+
+    changes = []
+    cooldown_ends = dict()
+    scale_up_times = set()
+
+    for alarm_time, _, index in alarms:
+        policy = policies[index]
+
+        if alarm_time < cooldown_ends.get(index, start) or alarm_time > end:
+            continue
+
+        new_capacity, bounds = apply_action(current, bounds, policy['action'], policy['direction'])
+        if new_capacity == current:
+            continue
+
+        if new_capacity > current:
+            scale_up_times.add(alarm_time)
+
+        cooldown_ends[index] = alarm_time + policy['cooldown']
+        current = new_capacity
+        changes.append(dict(timestamp=alarm_time, capacity=current, direction=policy['direction'],
+                            metric_name=policy['metric_name'], threshold=policy['threshold']))
+
+    return changes, summarize(changes, start, end, initial_capacity, len(up_breach_times - scale_up_times))
+
+
+def summarize(changes, start, end, initial_capacity, sla_misses):
+    capacities = [initial_capacity] + [change['capacity'] for change in changes]
+    change_times = [start] + [change['timestamp'] for change in changes] + [end]
+
+    instance_seconds = sum(capacity * (change_times[index + 1] - change_times[index])
+                           for index, capacity in enumerate(capacities))
+
+    return dict(
+        start=format_timestamp(start),
+        end=format_timestamp(end),
+        min_capacity=min(capacities),
+        max_capacity=max(capacities),
+        mean_capacity=round(instance_seconds / (end - start), 3),
+        instance_hours=round(instance_seconds / 3600, 3),
+        scale_ups=len([change for change in changes if change['direction'] == 'up']),
+        scale_downs=len([change for change in changes if change['direction'] == 'down']),
+        sla_misses=sla_misses)
+# endregion
+
+
+def handle_simulation(module):
+    try:
+        timestamps, values = read_metrics(module.params.get('metrics'))
+        policies = get_policies(module.params.get('scaling'))
+        changes, summary = simulate(timestamps=timestamps, values=values, policies=policies,
+                                    capacity=module.params.get('capacity'))
+    except (IOError, TypeError, ValueError) as exc:
+        module.fail_json(msg="Error while attempting to simulate the scaling: " + str(exc))
+
+    instance_price = module.params.get('instance_price')
+    if instance_price is not None:
+        summary['cost'] = round(summary['instance_hours'] * instance_price, 2)
+
+    for change in changes:
+        change['timestamp'] = format_timestamp(change['timestamp'])
+
+    return summary, changes
+
+
+def main():
+    fields = dict(
+        metrics=dict(type='path', required=True),
+        scaling=dict(type='dict', required=True),
+        capacity=dict(type='dict', required=True, options=dict(
+            minimum=dict(type='int', required=True),
+            maximum=dict(type='int', required=True),
+            target=dict(type='int'))),
+        instance_price=dict(type='float'))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    summary, changes = handle_simulation(module=module)
+
+    module.exit_json(changed=False, summary=summary, capacity_changes=changes)
+
+
+if __name__ == '__main__':
+    main()
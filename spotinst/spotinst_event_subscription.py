@@ -76,6 +76,23 @@ options:
     description:
       - Event body to be sent to endpoint
     type: str
+
+  subscriptions:
+    description:
+      - List of subscriptions to apply in a single task, each with resource_id, protocol, endpoint, event_type,
+        event_format and state (present or absent, default present).
+        Can't be used together with id or resource_id.
+    type: list
+
+  max_workers:
+    description:
+      - Maximum number of concurrent API requests when applying subscriptions
+    type: int
+    default: 10
+
+notes:
+  - Without id, existing subscriptions are found by resource_id, event_type, protocol and endpoint, so running the
+    same task again updates or leaves the subscription as is instead of creating a duplicate.
 """
 EXAMPLES = """
 #In this basic example, we create an event subscription
@@ -95,6 +112,29 @@ EXAMPLES = """
         event_format: { "subject" : "%s", "message" : "%s" }
       register: result
     - debug: var=result
+
+#In this example, we apply the subscriptions of several groups in one task
+
+- hosts: localhost
+  tasks:
+    - name: apply event subscriptions
+      spotinst_event_subscription:
+        subscriptions:
+          - resource_id: sig-992a78db
+            protocol: web
+            endpoint: https://webhook.com
+            event_type: GROUP_UPDATED
+          - resource_id: sig-6d4a2f1b
+            protocol: web
+            endpoint: https://webhook.com
+            event_type: GROUP_UPDATED
+          - resource_id: sig-1c3b5e7d
+            protocol: web
+            endpoint: https://old-webhook.com
+            event_type: GROUP_UPDATED
+            state: absent
+      register: result
+    - debug: var=result.subscriptions
 """
 RETURN = """
 ---
@@ -103,6 +143,11 @@ result:
     sample: sis-e62dfd0f
     returned: success
     description: Created Subscription successfully
+subscriptions:
+    type: list
+    sample: [{"id": "sis-e62dfd0f", "resource_id": "sig-992a78db", "event_type": "GROUP_UPDATED", "action": "created"}]
+    returned: when subscriptions is set
+    description: The applied subscriptions with the action taken for each one (created, updated, deleted or unchanged)
 """
 
 HAS_SPOTINST_SDK = False
@@ -110,6 +155,7 @@ __metaclass__ = type
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import env_fallback
 
@@ -125,13 +171,17 @@ except ImportError:
 
 # region Request Builder Funcitons
 def expand_subscription_request(module):
+    return expand_subscription(subscription=module.params)
+
+
+def expand_subscription(subscription):
     event_subscription = spotinst.spotinst_event_subscription.Subscription()
 
-    resource_id = module.params.get('resource_id')
-    protocol = module.params.get('protocol')
-    endpoint = module.params.get('endpoint')
-    event_type = module.params.get('event_type')
-    event_format = module.params.get('event_format')
+    resource_id = subscription.get('resource_id')
+    protocol = subscription.get('protocol')
+    endpoint = subscription.get('endpoint')
+    event_type = subscription.get('event_type')
+    event_format = subscription.get('event_format')
 
     if resource_id is not None:
         event_subscription.resource_id = resource_id
@@ -166,8 +216,10 @@ def handle_subscription(client, module):
         subscription_id, message, has_changed = handle_update(client=client, module=module, subscription_id=subscription_id)
     elif request_type == "delete":
         subscription_id, message, has_changed = handle_delete(client=client, module=module, subscription_id=subscription_id)
+    elif module.params.get('state') == 'present':
+        message = 'Subscription already up to date'
     else:
-        module.fail_json(msg="Action Not Allowed")
+        message = 'Subscription does not exist'
 
     return subscription_id, message, has_changed
 
@@ -177,12 +229,13 @@ def get_request_type_and_id(client, module):
     subscription_id = module.params.get('id')
     state = module.params.get('state')
 
-    if state == 'present':
-        if subscription_id is None:
-            request_type = "create"
+    if subscription_id is None:
+        subscriptions_index = index_subscriptions(client.get_all_event_subscription())
+        request_type, subscription_id = find_request_type_and_id(
+            subscription=module.params, state=state, subscriptions_index=subscriptions_index)
 
-        else:
-            request_type = "update"
+    elif state == 'present':
+        request_type = "update"
 
     elif state == 'absent':
         request_type = "delete"
@@ -190,6 +243,89 @@ def get_request_type_and_id(client, module):
     return request_type, subscription_id
 
 
+def get_subscription_key(subscription):
+    return (subscription.get('resource_id'), subscription.get('event_type'),
+            subscription.get('protocol'), subscription.get('endpoint'))
+
+
+def index_subscriptions(subscriptions):
+    subscriptions_index = dict()
+
+    for subscription in subscriptions:
+        subscriptions_index.setdefault(get_subscription_key(subscription), subscription)
+
+    return subscriptions_index
+
+
+def find_request_type_and_id(subscription, state, subscriptions_index):
+    existing_subscription = subscriptions_index.get(get_subscription_key(subscription))
+
+    if existing_subscription is None:
+        return ("create" if state == 'present' else None), None
+
+    if state == 'absent':
+        return "delete", existing_subscription['id']
+
+    event_format = subscription.get('event_format')
+    if event_format is not None and event_format != existing_subscription.get('event_format'):
+        return "update", existing_subscription['id']
+
+    return None, existing_subscription['id']
+
+
+def handle_subscriptions(client, module):
+    max_workers = module.params.get('max_workers') or 1
+    subscriptions_index = index_subscriptions(client.get_all_event_subscription())
+    results = []
+
+    for subscription in module.params.get('subscriptions'):
+        request_type, subscription_id = find_request_type_and_id(
+            subscription=subscription, state=subscription.get('state') or 'present',
+            subscriptions_index=subscriptions_index)
+
+        result = dict(id=subscription_id,
+                      resource_id=subscription.get('resource_id'),
+                      event_type=subscription.get('event_type'),
+                      protocol=subscription.get('protocol'),
+                      endpoint=subscription.get('endpoint'),
+                      action=dict(create="created", update="updated", delete="deleted").get(request_type, "unchanged"))
+        results.append((request_type, subscription, result))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(result, executor.submit(apply_subscription, client, request_type, subscription, result['id']))
+                   for request_type, subscription, result in results if request_type is not None]
+
+        errors = []
+        for result, future in futures:
+            try:
+                result['id'] = future.result()
+            except SpotinstClientException as exc:
+                result['error'] = str(exc)
+                errors.append(result)
+
+    subscriptions = [result for _, _, result in results]
+    has_changed = len(futures) > len(errors)
+
+    if errors:
+        module.fail_json(changed=has_changed, subscriptions=subscriptions,
+                         msg="Failed applying {0} of {1} subscriptions".format(len(errors), len(subscriptions)))
+
+    return subscriptions, has_changed
+
+
+def apply_subscription(client, request_type, subscription, subscription_id):
+    if request_type == "create":
+        created_subscription = client.create_event_subscription(subscription=expand_subscription(subscription))
+        subscription_id = created_subscription['id']
+    elif request_type == "update":
+        client.update_event_subscription(subscription_id=subscription_id,
+                                         subscription=expand_subscription(subscription))
+    elif request_type == "delete":
+        client.delete_event_subscription(subscription_id=subscription_id)
+
+    return subscription_id
+
+
 def get_client(module):
     # Retrieve creds file variables
     creds_file_loaded_vars = dict()
@@ -269,15 +405,23 @@ def main():
         protocol=dict(type='str'),
         endpoint=dict(type='str'),
         event_type=dict(type='str'),
-        event_format=dict(type='dict'))
+        event_format=dict(type='dict'),
+        subscriptions=dict(type='list', elements='dict'),
+        max_workers=dict(type='int', default=10))
 
-    module = AnsibleModule(argument_spec=fields)
+    module = AnsibleModule(argument_spec=fields,
+                           mutually_exclusive=[['subscriptions', 'id'], ['subscriptions', 'resource_id']])
 
     if not HAS_SPOTINST_SDK:
         module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
 
     client = get_client(module=module)
 
+    if module.params.get('subscriptions') is not None:
+        subscriptions, has_changed = handle_subscriptions(client=client, module=module)
+        module.exit_json(changed=has_changed, subscriptions=subscriptions,
+                         message='Applied {0} subscriptions successfully'.format(len(subscriptions)))
+
     subscription_id, message, has_changed = handle_subscription(client=client, module=module)
 
     module.exit_json(changed=has_changed, subscription_id=subscription_id, message=message)
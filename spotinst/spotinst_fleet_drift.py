@@ -0,0 +1,558 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_fleet_drift
+version_added: 2.8
+short_description: Report the Spotinst Elastigroups and Ocean clusters that no longer match their definitions
+author: Spotinst (@jeffnoehren)
+description:
+  - Compares the desired definitions of Elastigroups and Ocean clusters, given with the same parameters as the
+    spotinst_aws_elastigroup and spotinst_ocean_cloud modules, with their live configuration and reports the
+    differences field by field. Only the fields set in a definition are compared. A group with params that
+    cannot be compared gets them in unmapped_params and, without other differences, is reported unknown.
+    Live resources are fetched in parallel, by id or by name with one listing per resource type.
+    Every section is compared by the hash of its normalized content, sections that are equal or that were already
+    compared for another resource are not walked again.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk >= 1.0.44
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  resources:
+    type: list
+    description:
+      - The desired definitions. Every item has a type (group or ocean), the params of the matching module and
+        optionally the id of the live resource. Without id the resource is looked up by the name in params
+    required: true
+
+  ignore_paths:
+    type: list
+    description:
+      - Dotted paths of the live configuration that are not compared, e.g. compute.launch_specification.user_data
+
+  fail_on_drift:
+    type: bool
+    default: false
+    description:
+      - Fail the task when a resource drifted, is missing or is unknown
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we check the groups and clusters of our playbooks for drift
+
+- hosts: localhost
+  tasks:
+    - name: detect drift
+      spotinst_fleet_drift:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        ignore_paths:
+          - compute.launch_specification.user_data
+        resources:
+          - type: group
+            params:
+              name: ansible_test_group
+              min_size: 0
+              max_size: 10
+              target: 2
+              spot_instance_types:
+                - c5.large
+                - m5.large
+          - type: ocean
+            id: o-d861f48d
+            params:
+              name: ansible_test_ocean
+              capacity:
+                minimum: 0
+                maximum: 100
+      register: result
+    - debug: var=result.summary
+"""
+RETURN = """
+---
+drift:
+    type: list
+    returned: success
+    description:
+      - Every resource with its status (in_sync, drifted, missing or unknown), the differing fields and the
+        params that could not be compared
+    sample: [{"type": "group", "id": "sig-992a78db", "name": "ansible_test_group", "status": "drifted",
+              "diffs": [{"path": "capacity.target", "desired": 2, "live": 4}]}]
+summary:
+    type: dict
+    returned: success
+    description: Number of resources by status
+    sample: {"in_sync": 120, "drifted": 3, "missing": 1, "unknown": 0}
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk as spotinst
+    from spotinst_sdk import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+RESOURCE_URLS = dict(
+    group="https://api.spotinst.io/aws/ec2/group",
+    ocean="https://api.spotinst.io/ocean/aws/k8s/cluster")
+
+# where spotinst_aws_elastigroup puts its flat params in the group, see expand_elastigroup
+GROUP_PARAM_PATHS = (
+    ('name', 'name'),
+    ('description', 'description'),
+    ('min_size', 'capacity.minimum'),
+    ('max_size', 'capacity.maximum'),
+    ('target', 'capacity.target'),
+    ('unit', 'capacity.unit'),
+    ('risk', 'strategy.risk'),
+    ('utilize_reserved_instances', 'strategy.utilize_reserved_instances'),
+    ('fallback_to_od', 'strategy.fallback_to_od'),
+    ('on_demand_count', 'strategy.on_demand_count'),
+    ('availability_vs_cost', 'strategy.availability_vs_cost'),
+    ('draining_timeout', 'strategy.draining_timeout'),
+    ('spin_up_time', 'strategy.spin_up_time'),
+    ('lifetime_period', 'strategy.lifetime_period'),
+    ('revert_to_spot', 'strategy.revert_to_spot'),
+    ('persistence', 'strategy.persistence'),
+    ('signals', 'strategy.signals'),
+    ('product', 'compute.product'),
+    ('elastic_ips', 'compute.elastic_ips'),
+    ('private_ips', 'compute.private_ips'),
+    ('on_demand_instance_type', 'compute.instance_types.ondemand'),
+    ('spot_instance_types', 'compute.instance_types.spot'),
+    ('preferred_spot_instance_types', 'compute.instance_types.preferred_spot'),
+    ('availability_zones', 'compute.availability_zones'),
+    ('ebs_volume_pool', 'compute.ebs_volume_pool'),
+    ('user_data', 'compute.launch_specification.user_data'),
+    ('key_pair', 'compute.launch_specification.key_pair'),
+    ('tenancy', 'compute.launch_specification.tenancy'),
+    ('shutdown_script', 'compute.launch_specification.shutdown_script'),
+    ('monitoring', 'compute.launch_specification.monitoring'),
+    ('ebs_optimized', 'compute.launch_specification.ebs_optimized'),
+    ('image_id', 'compute.launch_specification.image_id'),
+    ('health_check_type', 'compute.launch_specification.health_check_type'),
+    ('health_check_grace_period', 'compute.launch_specification.health_check_grace_period'),
+    ('health_check_unhealthy_duration_before_replacement',
+     'compute.launch_specification.health_check_unhealthy_duration_before_replacement'),
+    ('security_group_ids', 'compute.launch_specification.security_group_ids'),
+    ('iam_role_name', 'compute.launch_specification.iam_role.name'),
+    ('iam_role_arn', 'compute.launch_specification.iam_role.arn'),
+    ('block_device_mappings', 'compute.launch_specification.block_device_mappings'),
+    ('network_interfaces', 'compute.launch_specification.network_interfaces'),
+    ('credit_specification', 'compute.launch_specification.credit_specification'),
+    ('terminate_at_end_of_billing_hour', 'strategy.scaling_strategy.terminate_at_end_of_billing_hour'),
+    ('multai_token', 'multai.token'),
+    ('multai_load_balancers', 'multai.balancers'),
+    ('target_tracking_policies', 'scaling.target'),
+    ('scheduled_tasks', 'scheduling.tasks'),
+    ('chef', 'third_parties_integration.chef'),
+    ('code_deploy', 'third_parties_integration.code_deploy'),
+    ('docker_swarm', 'third_parties_integration.docker_swarm'),
+    ('ecs', 'third_parties_integration.ecs'),
+    ('elastic_beanstalk', 'third_parties_integration.elastic_beanstalk'),
+    ('kubernetes', 'third_parties_integration.kubernetes'),
+    ('mesosphere', 'third_parties_integration.mesosphere'),
+    ('mlb_runtime', 'third_parties_integration.mlb_runtime'),
+    ('nomad', 'third_parties_integration.nomad'),
+    ('opsworks', 'third_parties_integration.opsworks'),
+    ('rancher', 'third_parties_integration.rancher'),
+    ('right_scale', 'third_parties_integration.right_scale'),
+    ('route53', 'third_parties_integration.route53'))
+
+# group params that are put together in the load balancers of the group, see expand_load_balancers
+GROUP_LOAD_BALANCER_PARAMS = ('load_balancers', 'target_group_arns', 'mlb_load_balancers')
+
+# module params that are not part of the resource configuration
+GROUP_NON_CONFIG_PARAMS = ('state', 'id', 'uniqueness_by', 'do_not_update', 'roll_config', 'auto_apply_tags',
+                           'wait_for_instances', 'wait_timeout', 'stateful_deallocation_should_delete_images',
+                           'stateful_deallocation_should_delete_network_interfaces',
+                           'stateful_deallocation_should_delete_snapshots',
+                           'stateful_deallocation_should_delete_volumes', 'credentials_path', 'account_id', 'token')
+
+OCEAN_NON_CONFIG_PARAMS = ('state', 'id', 'uniqueness_by', 'roll_config', 'auto_scaler_plan',
+                           'credentials_path', 'account_id', 'token')
+
+SCALING_ACTION_PARAMS = (('action_type', 'type'), ('adjustment', 'adjustment'),
+                         ('min_target_capacity', 'min_target_capacity'),
+                         ('max_target_capacity', 'max_target_capacity'), ('target', 'target'),
+                         ('minimum', 'minimum'), ('maximum', 'maximum'))
+
+
+# region Desired Config Functions
+def set_path(config, dotted_path, value):
+    path = dotted_path.split('.')
+    for part in path[:-1]:
+        config = config.setdefault(part, dict())
+    config[path[-1]] = value
+
+
+def expand_scaling_policies(policies):
+    expanded_policies = []
+
+    for policy in policies:
+        action_params = dict(SCALING_ACTION_PARAMS)
+        expanded_policy = dict((key, value) for key, value in policy.items() if key not in action_params)
+
+        action = dict((action_params[key], value) for key, value in policy.items() if key in action_params)
+        if action:
+            expanded_policy['action'] = action
+
+        expanded_policies.append(expanded_policy)
+
+    return expanded_policies
+
+
+def expand_load_balancers(params):
+    load_balancers = [dict(name=elb_name, type='CLASSIC') for elb_name in params.get('load_balancers') or []]
+    load_balancers.extend(dict(arn=target_arn, type='TARGET_GROUP')
+                          for target_arn in params.get('target_group_arns') or [])
+    load_balancers.extend(dict(mlb, type='MULTAI_TARGET_SET') for mlb in params.get('mlb_load_balancers') or [])
+
+    return load_balancers
+
+
+def get_unmapped_params(params):
+    """The declared group params that to_group_config has no place for"""
+    known_params = set(param for param, path in GROUP_PARAM_PATHS)
+    known_params.update(GROUP_LOAD_BALANCER_PARAMS, GROUP_NON_CONFIG_PARAMS,
+                        ('tags', 'up_scaling_policies', 'down_scaling_policies'))
+
+    return sorted(param for param, value in params.items() if value is not None and param not in known_params)
+
+
+def to_group_config(params):
+    config = dict()
+
+    for param, path in GROUP_PARAM_PATHS:
+        if params.get(param) is not None:
+            set_path(config, path, params.get(param))
+
+    if params.get('tags') is not None:
+        set_path(config, 'compute.launch_specification.tags',
+                 [dict(tag_key=key, tag_value=value) for tag in params.get('tags') for key, value in tag.items()])
+
+    for param, direction in (('up_scaling_policies', 'up'), ('down_scaling_policies', 'down')):
+        if params.get(param) is not None:
+            set_path(config, 'scaling.' + direction, expand_scaling_policies(params.get(param)))
+
+    if any(params.get(param) is not None for param in GROUP_LOAD_BALANCER_PARAMS):
+        set_path(config, 'compute.launch_specification.load_balancers_config.load_balancers',
+                 expand_load_balancers(params))
+
+    return config
+
+
+def to_ocean_config(params):
+    # the params of spotinst_ocean_cloud already have the layout of the cluster
+    return dict((key, value) for key, value in params.items() if key not in OCEAN_NON_CONFIG_PARAMS)
+
+
+def remove_path(config, dotted_path):
+    path = dotted_path.split('.')
+
+    for part in path[:-1]:
+        config = config.get(part)
+        if not isinstance(config, dict):
+            return
+
+    config.pop(path[-1], None)
+# endregion
+
+
+# region Diff Functions
+def normalize_key(key):
+    # camelCase, snake_case and mixes of both, e.g. max_vCpu, compare equal
+    return key.replace('_', '').lower()
+
+
+def get_tree_hash(value, hashes):
+    """Hash of the normalized content of value, memoized by object in hashes"""
+    cached = hashes.get(id(value))
+    if cached is not None:
+        return cached[0]
+
+    if isinstance(value, dict):
+        content = sorted((normalize_key(key), get_tree_hash(item, hashes)) for key, item in value.items()
+                         if item is not None)
+    elif isinstance(value, list):
+        content = [get_tree_hash(item, hashes) for item in value]
+    else:
+        content = value
+
+    tree_hash = hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+    # keep value referenced so that its id isn't reused while the hashes are in use
+    hashes[id(value)] = (tree_hash, value)
+
+    return tree_hash
+
+
+def diff_config(desired, live, hashes, diff_cache):
+    """Differences of the desired fields from live, as (relative path, desired, live) tuples"""
+    if desired is None:
+        return []
+
+    desired_hash = get_tree_hash(desired, hashes)
+    live_hash = get_tree_hash(live, hashes)
+
+    if desired_hash == live_hash:
+        return []
+
+    cache_key = (desired_hash, live_hash)
+    if cache_key in diff_cache:
+        return diff_cache[cache_key]
+
+    if isinstance(desired, dict) and isinstance(live, dict):
+        live_by_key = dict((normalize_key(key), item) for key, item in live.items())
+        diffs = []
+
+        for key, item in desired.items():
+            for path, desired_value, live_value in diff_config(item, live_by_key.get(normalize_key(key)), hashes,
+                                                               diff_cache):
+                diffs.append((key + ('.' + path if path else ''), desired_value, live_value))
+
+    elif isinstance(desired, list) and isinstance(live, list) and len(desired) == len(live):
+        if all(not isinstance(item, (dict, list)) for item in desired + live):
+            # lists of plain values, e.g. security_group_ids, are compared regardless of order
+            is_equal = sorted(desired, key=json.dumps) == sorted(live, key=json.dumps)
+            diffs = [] if is_equal else [('', desired, live)]
+        else:
+            diffs = []
+            for index, (desired_item, live_item) in enumerate(zip(desired, live)):
+                for path, desired_value, live_value in diff_config(desired_item, live_item, hashes, diff_cache):
+                    diffs.append(("[{0}]".format(index) + ('.' + path if path else ''), desired_value, live_value))
+
+    elif not isinstance(desired, (dict, list)) and not isinstance(live, (dict, list)) and desired == live:
+        diffs = []
+
+    else:
+        diffs = [('', desired, live)]
+
+    diff_cache[cache_key] = diffs
+
+    return diffs
+
+
+def get_desired_config(resource, ignore_paths):
+    params = resource.get('params') or dict()
+
+    if resource.get('type') == 'group':
+        config = to_group_config(params)
+    else:
+        config = to_ocean_config(params)
+
+    for path in ignore_paths:
+        remove_path(config, path)
+
+    return config
+# endregion
+
+
+# region Fetch Functions
+def get_resource(client, resource_type, resource_id):
+    response = client.send_get(
+        url=RESOURCE_URLS[resource_type] + "/" + resource_id,
+        entity_name=resource_type)
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"][0]
+
+
+def get_resources(client, resource_type):
+    response = client.send_get(
+        url=RESOURCE_URLS[resource_type],
+        entity_name=resource_type)
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"]
+
+
+def fetch_live_resources(client, resources, max_workers):
+    """Live configuration of every resource, None when it doesn't exist"""
+    list_types = set(resource['type'] for resource in resources if resource.get('id') is None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        listing_futures = dict((resource_type, executor.submit(get_resources, client, resource_type))
+                               for resource_type in list_types)
+        resource_futures = dict((index, executor.submit(get_resource, client, resource['type'], resource['id']))
+                                for index, resource in enumerate(resources) if resource.get('id') is not None)
+
+        live_by_name = dict()
+        for resource_type, future in listing_futures.items():
+            for live in future.result():
+                live_by_name.setdefault((resource_type, live.get('name')), live)
+
+        live_resources = []
+        for index, resource in enumerate(resources):
+            if index in resource_futures:
+                try:
+                    live_resources.append(resource_futures[index].result())
+                except SpotinstClientException:
+                    live_resources.append(None)
+            else:
+                name = (resource.get('params') or dict()).get('name')
+                live_resources.append(live_by_name.get((resource['type'], name)))
+
+    return live_resources
+# endregion
+
+
+# region Util Functions
+def detect_drift(resources, live_resources, ignore_paths):
+    hashes = dict()
+    diff_cache = dict()
+    drift = []
+    summary = dict(in_sync=0, drifted=0, missing=0, unknown=0)
+
+    for resource, live in zip(resources, live_resources):
+        params = resource.get('params') or dict()
+        report = dict(type=resource['type'], id=resource.get('id'), name=params.get('name'))
+
+        if live is None:
+            report['status'] = 'missing'
+        else:
+            report['id'] = live.get('id')
+            diffs = diff_config(get_desired_config(resource, ignore_paths), live, hashes, diff_cache)
+            report['diffs'] = [dict(path=path, desired=desired, live=live_value) for path, desired, live_value in diffs]
+            report['status'] = 'drifted' if diffs else 'in_sync'
+
+            unmapped_params = get_unmapped_params(params) if resource['type'] == 'group' else []
+            if unmapped_params:
+                report['unmapped_params'] = unmapped_params
+                if not diffs:
+                    # the params that are not compared could hide a drift
+                    report['status'] = 'unknown'
+
+        summary[report['status']] += 1
+        drift.append(report)
+
+    return drift, summary
+
+
+def handle_drift(client, module):
+    resources = module.params.get('resources')
+    ignore_paths = module.params.get('ignore_paths') or []
+    max_workers = module.params.get('max_workers') or 1
+
+    for resource in resources:
+        if resource.get('type') not in RESOURCE_URLS:
+            module.fail_json(msg="Every item of resources must have a type of group or ocean")
+        if resource.get('id') is None and (resource.get('params') or dict()).get('name') is None:
+            module.fail_json(msg="Every item of resources must have an id or a name in its params")
+
+    try:
+        live_resources = fetch_live_resources(client=client, resources=resources, max_workers=max_workers)
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to get the live resources: " + str(exc))
+
+    drift, summary = detect_drift(resources=resources, live_resources=live_resources, ignore_paths=ignore_paths)
+
+    if module.params.get('fail_on_drift') and (summary['drifted'] or summary['missing'] or summary['unknown']):
+        module.fail_json(msg="{0} resources drifted, {1} are missing and {2} are unknown".format(
+            summary['drifted'], summary['missing'], summary['unknown']), drift=drift, summary=summary)
+
+    return drift, summary
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find('=')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    client = spotinst.SpotinstClient(auth_token=token, print_output=False)
+
+    if account is not None:
+        client = spotinst.SpotinstClient(auth_token=token, account_id=account, print_output=False)
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        resources=dict(type='list', elements='dict', required=True),
+        ignore_paths=dict(type='list', elements='str'),
+        fail_on_drift=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
+
+    client = get_client(module=module)
+
+    drift, summary = handle_drift(client=client, module=module)
+
+    module.exit_json(changed=False, drift=drift, summary=summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_fleet_export
+version_added: 2.8
+short_description: Export the configuration of all Spotinst Elastigroups, Ocean clusters, EMR scalers and Managed Instances
+author: Spotinst (@jeffnoehren)
+description:
+  - Snapshots the configuration of every resource of the given types into a newline delimited JSON file,
+    one resource per line with its type, id, updated_at, content hash and configuration.
+    The resource types are listed in parallel and the records are streamed to the file as they are serialized.
+    With incremental, the previous snapshot at dest is read first and the records of resources whose updated_at
+    did not change are copied from it as they are, without serializing or hashing them again.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk >= 1.0.44
+  - zstandard (when compression is zstd)
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  dest:
+    type: path
+    description:
+      - File the snapshot is written to
+    required: true
+
+  resource_types:
+    type: list
+    choices: ['group', 'ocean', 'emr', 'managed_instance']
+    default: ['group', 'ocean', 'emr', 'managed_instance']
+    description:
+      - Types of the resources to export
+
+  compression:
+    type: str
+    choices: ['none', 'gzip', 'zstd']
+    default: none
+    description:
+      - Compression of the snapshot file, also used to read the previous snapshot
+
+  incremental:
+    type: bool
+    default: false
+    description:
+      - Reuse the records of the previous snapshot at dest for the resources whose updated_at did not change
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we take a compressed incremental snapshot of all the resources
+
+- hosts: localhost
+  tasks:
+    - name: export fleet
+      spotinst_fleet_export:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        dest: /var/backups/spotinst/fleet.ndjson.gz
+        compression: gzip
+        incremental: True
+      register: result
+    - debug: var=result.summary
+"""
+RETURN = """
+---
+dest:
+    type: str
+    returned: success
+    description: File the snapshot was written to
+    sample: /var/backups/spotinst/fleet.ndjson.gz
+snapshot_hash:
+    type: str
+    returned: success
+    description: Hash of the content hashes of all the exported resources, equal for equal snapshots
+    sample: 9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
+summary:
+    type: dict
+    returned: success
+    description: Number of exported resources by type, and of added, changed, removed, unchanged and reused resources
+    sample: {"counts": {"group": 3000, "ocean": 12}, "added": 2, "changed": 5, "removed": 1, "unchanged": 3005,
+             "reused": 3005}
+"""
+HAS_SPOTINST_SDK = False
+HAS_ZSTD = False
+__metaclass__ = type
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk as spotinst
+    from spotinst_sdk import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+
+except ImportError:
+    pass
+
+RESOURCE_URLS = dict(
+    group="https://api.spotinst.io/aws/ec2/group",
+    ocean="https://api.spotinst.io/ocean/aws/k8s/cluster",
+    emr="https://api.spotinst.io/aws/emr/mrScaler",
+    managed_instance="https://api.spotinst.io/aws/ec2/managedInstance")
+
+RESOURCE_TYPES = ('group', 'ocean', 'emr', 'managed_instance')
+
+RECORD_HEADER_FIELDS = ('type', 'id', 'updated_at', 'hash')
+
+
+# region Fetch Functions
+def get_resources(client, resource_type):
+    response = client.send_get(
+        url=RESOURCE_URLS[resource_type],
+        entity_name=resource_type)
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"]
+
+
+def fetch_resources(client, resource_types, max_workers):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(resource_type, executor.submit(get_resources, client, resource_type))
+                   for resource_type in resource_types]
+
+        return [(resource_type, future.result()) for resource_type, future in futures]
+# endregion
+
+
+# region Snapshot Functions
+def get_content_hash(config):
+    content = json.dumps(config, sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def to_record(resource_type, resource):
+    content_hash = get_content_hash(resource)
+
+    # the header fields come first so that read_snapshot_index doesn't have to parse the config
+    line = '{{"type":{0},"id":{1},"updated_at":{2},"hash":{3},"config":{4}}}'.format(
+        json.dumps(resource_type), json.dumps(resource.get('id')), json.dumps(resource.get('updated_at')),
+        json.dumps(content_hash), json.dumps(resource, sort_keys=True, separators=(',', ':')))
+
+    return content_hash, line
+
+
+def read_record_header(line):
+    decoder = json.JSONDecoder()
+    header = dict()
+    position = 0
+
+    for field in RECORD_HEADER_FIELDS:
+        prefix = ('{' if position == 0 else ',') + '"' + field + '":'
+        if not line.startswith(prefix, position):
+            raise ValueError("unexpected snapshot record " + line[:80])
+
+        header[field], position = decoder.raw_decode(line, position + len(prefix))
+
+    return header
+
+
+def open_snapshot(path, mode, compression):
+    if compression == 'gzip':
+        return io.TextIOWrapper(gzip.open(path, mode + 'b'), encoding='utf-8')
+
+    if compression == 'zstd':
+        if 'r' in mode:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+
+        return io.TextIOWrapper(stream, encoding='utf-8')
+
+    return io.open(path, mode, encoding='utf-8')
+
+
+def read_snapshot_index(path, compression):
+    """Map (type, id) to (updated_at, hash, line) for every record of the snapshot at path"""
+    index = dict()
+
+    if not os.path.isfile(path):
+        return index
+
+    with open_snapshot(path, 'r', compression) as snapshot:
+        for line in snapshot:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+
+            # the config is kept as the raw line, only the header is parsed
+            header = read_record_header(line)
+            index[(header['type'], header['id'])] = (header['updated_at'], header['hash'], line)
+
+    return index
+
+
+def write_snapshot(snapshot, resources_by_type, previous_index):
+    summary = dict(counts=dict(), added=0, changed=0, removed=0, unchanged=0, reused=0)
+    snapshot_hash = hashlib.sha256()
+    exported_keys = set()
+
+    for resource_type, resources in resources_by_type:
+        summary['counts'][resource_type] = len(resources)
+
+        for resource in sorted(resources, key=lambda item: item.get('id') or ''):
+            key = (resource_type, resource.get('id'))
+            previous = previous_index.get(key)
+            exported_keys.add(key)
+
+            if previous is not None and previous[0] is not None and previous[0] == resource.get('updated_at'):
+                content_hash, line = previous[1], previous[2]
+                summary['reused'] += 1
+            else:
+                content_hash, line = to_record(resource_type, resource)
+
+            if previous is None:
+                summary['added'] += 1
+            elif previous[1] != content_hash:
+                summary['changed'] += 1
+            else:
+                summary['unchanged'] += 1
+
+            snapshot_hash.update(content_hash.encode('utf-8'))
+            snapshot.write(line + '\n')
+
+    summary['removed'] = len(set(previous_index) - exported_keys)
+
+    return snapshot_hash.hexdigest(), summary
+
+
+def handle_export(client, module):
+    dest = module.params.get('dest')
+    compression = module.params.get('compression')
+    resource_types = module.params.get('resource_types')
+    max_workers = module.params.get('max_workers') or 1
+
+    try:
+        resources_by_type = fetch_resources(client=client, resource_types=resource_types, max_workers=max_workers)
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to list resources: " + str(exc))
+
+    # the previous snapshot is always read to report the change set, records are only reused when incremental
+    try:
+        previous_index = read_snapshot_index(path=dest, compression=compression)
+    except (IOError, ValueError) as exc:
+        module.fail_json(msg="Error while attempting to read the previous snapshot {0}: {1}".format(dest, exc))
+
+    if not module.params.get('incremental'):
+        previous_index = dict((key, (None, value[1], None)) for key, value in previous_index.items())
+
+    dest_dir = os.path.dirname(dest) or '.'
+    if not module.check_mode and not os.path.isdir(dest_dir):
+        os.makedirs(dest_dir)
+
+    if module.check_mode:
+        snapshot_hash, summary = write_snapshot(snapshot=io.StringIO(), resources_by_type=resources_by_type,
+                                                previous_index=previous_index)
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix='.spotinst_fleet_export')
+        os.close(fd)
+
+        try:
+            with open_snapshot(tmp_path, 'w', compression) as snapshot:
+                snapshot_hash, summary = write_snapshot(snapshot=snapshot, resources_by_type=resources_by_type,
+                                                        previous_index=previous_index)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        module.atomic_move(tmp_path, dest)
+
+    has_changed = summary['added'] + summary['changed'] + summary['removed'] > 0 or not previous_index
+
+    return snapshot_hash, summary, has_changed
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find('=')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    client = spotinst.SpotinstClient(auth_token=token, print_output=False)
+
+    if account is not None:
+        client = spotinst.SpotinstClient(auth_token=token, account_id=account, print_output=False)
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        dest=dict(type='path', required=True),
+        resource_types=dict(type='list', elements='str', choices=list(RESOURCE_TYPES), default=list(RESOURCE_TYPES)),
+        compression=dict(type='str', choices=['none', 'gzip', 'zstd'], default='none'),
+        incremental=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
+
+    if module.params.get('compression') == 'zstd' and not HAS_ZSTD:
+        module.fail_json(msg="the zstandard library is required for zstd compression. (pip install zstandard)")
+
+    client = get_client(module=module)
+
+    snapshot_hash, summary, has_changed = handle_export(client=client, module=module)
+
+    module.exit_json(changed=has_changed, dest=module.params.get('dest'), snapshot_hash=snapshot_hash,
+                     summary=summary)
+
+
+if __name__ == '__main__':
+    main()
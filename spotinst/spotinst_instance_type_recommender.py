@@ -0,0 +1,356 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_instance_type_recommender
+version_added: 2.8
+short_description: Recommend spot instance types for an Elastigroup from an offline catalog
+author: Spotinst (@jeffnoehren)
+description:
+  - Ranks the instance types of a local catalog that meet the vCPU and memory requirements and are offered in
+    all the availability zones of the group, by spot price per vCPU and interruption rate.
+    The result can be given as is to the spot_instance_types, preferred_spot_instance_types and
+    on_demand_instance_type params of spotinst_aws_elastigroup.
+    No API call is made, the module only reads the catalog.
+    The candidates are scored with numpy when it is installed.
+requirements:
+  - python >= 2.7
+options:
+
+  catalog:
+    type: path
+    description:
+      - CSV file with one row per instance type and availability zone and the columns instance_type, vcpu,
+        memory (GiB), on_demand_price, availability_zone, spot_price and interruption_rate (0 to 1)
+    required: true
+
+  availability_zones:
+    type: list
+    description:
+      - Availability zones the types must be offered in, either names or the availability_zones of
+        spotinst_aws_elastigroup. By default the types are compared in all the zones they are offered in
+
+  min_vcpu:
+    type: int
+    description:
+      - Minimum number of vCPUs
+
+  max_vcpu:
+    type: int
+    description:
+      - Maximum number of vCPUs
+
+  min_memory:
+    type: float
+    description:
+      - Minimum memory in GiB
+
+  max_memory:
+    type: float
+    description:
+      - Maximum memory in GiB
+
+  exclude_instance_types:
+    type: list
+    description:
+      - Instance types not to recommend, shell-style wildcards like t2.* are supported
+
+  count:
+    type: int
+    default: 5
+    description:
+      - Number of spot instance types to recommend
+
+  preferred_count:
+    type: int
+    default: 0
+    description:
+      - Number of the recommended spot instance types to also return as preferred
+
+  price_weight:
+    type: float
+    default: 0.7
+    description:
+      - Weight of the spot price per vCPU in the score
+
+  interruption_weight:
+    type: float
+    default: 0.3
+    description:
+      - Weight of the interruption rate in the score
+"""
+EXAMPLES = """
+#In this basic example, we recommend the spot instance types of a group and create it with them
+
+- hosts: localhost
+  tasks:
+    - name: recommend instance types
+      spotinst_instance_type_recommender:
+        catalog: /etc/spotinst/us-west-2-catalog.csv
+        min_vcpu: 2
+        max_vcpu: 8
+        min_memory: 4
+        availability_zones:
+          - name: us-west-2a
+            subnet_id: subnet-2b68a15c
+          - name: us-west-2b
+            subnet_id: subnet-0d7a3e4b
+        exclude_instance_types:
+          - t2.*
+        count: 4
+        preferred_count: 2
+      register: recommendation
+    - name: create elastigroup
+      spotinst_aws_elastigroup:
+        name: ansible_test_group
+        availability_zones:
+          - name: us-west-2a
+            subnet_id: subnet-2b68a15c
+          - name: us-west-2b
+            subnet_id: subnet-0d7a3e4b
+        on_demand_instance_type: "{{ recommendation.on_demand_instance_type }}"
+        spot_instance_types: "{{ recommendation.spot_instance_types }}"
+        preferred_spot_instance_types: "{{ recommendation.preferred_spot_instance_types }}"
+        product: Linux/UNIX
+        image_id: ami-f173cc91
+        min_size: 0
+        max_size: 2
+        target: 0
+        unit: instance
+        monitoring: True
+"""
+RETURN = """
+---
+spot_instance_types:
+    type: list
+    returned: success
+    description: The recommended spot instance types, best first
+    sample: ["c5.large", "m5.large", "c5.xlarge"]
+preferred_spot_instance_types:
+    type: list
+    returned: success
+    description: The first preferred_count recommended spot instance types
+    sample: ["c5.large"]
+on_demand_instance_type:
+    type: str
+    returned: success
+    description: The recommended type with the lowest on demand price
+    sample: c5.large
+recommendations:
+    type: list
+    returned: success
+    description: The recommended types with their catalog data and score, lower scores are better
+    sample: [{"instance_type": "c5.large", "vcpu": 2, "memory": 4.0, "on_demand_price": 0.085,
+              "spot_price": 0.034, "savings": 0.6, "interruption_rate": 0.05, "score": 0.0}]
+"""
+HAS_NUMPY = False
+__metaclass__ = type
+
+import csv
+import fnmatch
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    import numpy
+
+    HAS_NUMPY = True
+
+except ImportError:
+    pass
+
+CATALOG_COLUMNS = ('instance_type', 'vcpu', 'memory', 'on_demand_price', 'availability_zone', 'spot_price',
+                   'interruption_rate')
+
+
+# region Catalog Functions
+def read_catalog(path):
+    """Rows of the catalog with their numbers converted"""
+    rows = []
+
+    with open(path, "r") as catalog:
+        reader = csv.DictReader(catalog)
+
+        missing_columns = [column for column in CATALOG_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing_columns:
+            raise ValueError("the catalog is missing the columns " + ", ".join(missing_columns))
+
+        for line_number, row in enumerate(reader, 2):
+            try:
+                rows.append(dict(
+                    instance_type=row['instance_type'].strip(),
+                    vcpu=int(row['vcpu']),
+                    memory=float(row['memory']),
+                    on_demand_price=float(row['on_demand_price']),
+                    availability_zone=row['availability_zone'].strip(),
+                    spot_price=float(row['spot_price']),
+                    interruption_rate=float(row['interruption_rate'])))
+            except (TypeError, ValueError):
+                raise ValueError("invalid catalog row at line {0}".format(line_number))
+
+    return rows
+
+
+def get_zone_names(availability_zones):
+    # names, or the availability_zones of spotinst_aws_elastigroup
+    return set(zone.get('name') if isinstance(zone, dict) else zone for zone in availability_zones)
+
+
+def is_excluded(instance_type, exclude_patterns):
+    return any(fnmatch.fnmatch(instance_type, pattern) for pattern in exclude_patterns)
+
+
+def get_candidates(rows, zone_names, min_vcpu, max_vcpu, min_memory, max_memory, exclude_patterns):
+    """
+    Types that meet the requirements, with their mean spot price and highest interruption rate over the zones.
+    With zone_names, only the types offered in all of them are candidates.
+    """
+    candidates = dict()
+
+    for row in rows:
+        if zone_names and row['availability_zone'] not in zone_names:
+            continue
+        if min_vcpu is not None and row['vcpu'] < min_vcpu or max_vcpu is not None and row['vcpu'] > max_vcpu:
+            continue
+        if min_memory is not None and row['memory'] < min_memory or \
+                max_memory is not None and row['memory'] > max_memory:
+            continue
+        if is_excluded(row['instance_type'], exclude_patterns):
+            continue
+
+        candidate = candidates.setdefault(row['instance_type'], dict(
+            instance_type=row['instance_type'], vcpu=row['vcpu'], memory=row['memory'],
+            on_demand_price=row['on_demand_price'], zones=set(), spot_prices=[], interruption_rate=0.0))
+
+        candidate['zones'].add(row['availability_zone'])
+        candidate['spot_prices'].append(row['spot_price'])
+        candidate['interruption_rate'] = max(candidate['interruption_rate'], row['interruption_rate'])
+
+    result = []
+    for instance_type in sorted(candidates):
+        candidate = candidates[instance_type]
+
+        if zone_names and candidate['zones'] != zone_names:
+            continue
+
+        spot_price = sum(candidate.pop('spot_prices')) / len(candidate['zones'])
+        del candidate['zones']
+
+        candidate['spot_price'] = round(spot_price, 6)
+        candidate['savings'] = round(1 - spot_price / candidate['on_demand_price'], 4) \
+            if candidate['on_demand_price'] else 0.0
+        result.append(candidate)
+
+    return result
+# endregion
+
+
+# region Score Functions
+def scale(values):
+    # min-max scaling to 0..1, equal values all get 0
+    low = min(values)
+    span = max(values) - low
+
+    return [(value - low) / span if span else 0.0 for value in values]
+
+
+def score_candidates(prices_per_vcpu, interruption_rates, price_weight, interruption_weight):
+    """Scores of the candidates, the weighted sum of their scaled price per vCPU and interruption rate"""
+    if not prices_per_vcpu:
+        return []
+
+    if HAS_NUMPY:
+        prices = numpy.asarray(prices_per_vcpu, dtype=float)
+        interruptions = numpy.asarray(interruption_rates, dtype=float)
+
+        price_span = numpy.ptp(prices)
+        interruption_span = numpy.ptp(interruptions)
+        scaled_prices = (prices - prices.min()) / price_span if price_span else numpy.zeros_like(prices)
+        scaled_interruptions = (interruptions - interruptions.min()) / interruption_span \
+            if interruption_span else numpy.zeros_like(interruptions)
+
+        return (price_weight * scaled_prices + interruption_weight * scaled_interruptions).tolist()
+
+    return [price_weight * price + interruption_weight * interruption
+            for price, interruption in zip(scale(prices_per_vcpu), scale(interruption_rates))]
+
+
+def rank_candidates(candidates, price_weight, interruption_weight):
+    scores = score_candidates(
+        prices_per_vcpu=[candidate['spot_price'] / candidate['vcpu'] for candidate in candidates],
+        interruption_rates=[candidate['interruption_rate'] for candidate in candidates],
+        price_weight=price_weight,
+        interruption_weight=interruption_weight)
+
+    for candidate, score in zip(candidates, scores):
+        candidate['score'] = round(score, 6)
+
+    return sorted(candidates, key=lambda candidate: (candidate['score'], candidate['instance_type']))
+# endregion
+
+
+# region Util Functions
+def handle_recommendation(module):
+    try:
+        rows = read_catalog(module.params.get('catalog'))
+    except (IOError, ValueError) as exc:
+        module.fail_json(msg="Error while attempting to read the catalog: " + str(exc))
+
+    candidates = get_candidates(
+        rows=rows,
+        zone_names=get_zone_names(module.params.get('availability_zones') or []),
+        min_vcpu=module.params.get('min_vcpu'),
+        max_vcpu=module.params.get('max_vcpu'),
+        min_memory=module.params.get('min_memory'),
+        max_memory=module.params.get('max_memory'),
+        exclude_patterns=module.params.get('exclude_instance_types') or [])
+
+    if not candidates:
+        module.fail_json(msg="No instance type of the catalog meets the requirements")
+
+    recommendations = rank_candidates(candidates=candidates,
+                                      price_weight=module.params.get('price_weight'),
+                                      interruption_weight=module.params.get('interruption_weight'))
+    recommendations = recommendations[:module.params.get('count')]
+
+    spot_instance_types = [recommendation['instance_type'] for recommendation in recommendations]
+    on_demand_instance_type = min(recommendations, key=lambda recommendation: (
+        recommendation['on_demand_price'], recommendation['instance_type']))['instance_type']
+
+    return dict(spot_instance_types=spot_instance_types,
+                preferred_spot_instance_types=spot_instance_types[:module.params.get('preferred_count')],
+                on_demand_instance_type=on_demand_instance_type,
+                recommendations=recommendations)
+# endregion
+
+
+def main():
+    fields = dict(
+        catalog=dict(type='path', required=True),
+        availability_zones=dict(type='list', elements='raw'),
+        min_vcpu=dict(type='int'),
+        max_vcpu=dict(type='int'),
+        min_memory=dict(type='float'),
+        max_memory=dict(type='float'),
+        exclude_instance_types=dict(type='list', elements='str'),
+        count=dict(type='int', default=5),
+        preferred_count=dict(type='int', default=0),
+        price_weight=dict(type='float', default=0.7),
+        interruption_weight=dict(type='float', default=0.3))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    if module.params.get('count') < 1:
+        module.fail_json(msg="count must be at least 1")
+
+    result = handle_recommendation(module=module)
+
+    module.exit_json(changed=False, **result)
+
+
+if __name__ == '__main__':
+    main()
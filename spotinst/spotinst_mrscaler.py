@@ -91,12 +91,28 @@ options:
   scheduling:
     type: dict
     description:
-      - List of Scheduled tasks to perform
+      - Scheduled tasks to perform, under the tasks key.;
+        Every task expects the keys is_enabled, instance_group_type, task_type, cron_expression,
+        target_capacity, min_capacity and max_capacity
+
+  scheduling_preview:
+    type: int
+    description:
+      - Instead of applying the cluster, expand the cron_expression of every enabled scheduled task into its next
+        scheduling_preview firing times and report them with the capacities they set, and the times at which
+        several tasks change the same instance group. Must be at least 1. No API call is made
 
   scaling:
     type: dict
     description:
-      - Lists of up and down scaling policies
+      - Lists of up and down scaling policies.;
+        Every policy expects the keys metric_name, statistic, unit, threshold, namespace, period,
+        evaluation_periods, cooldown, operator, dimensions (List of Objects with name),
+        action (Object with type, adjustment, min_target_capacity, target, minimum and maximum).;
+        A policy with steps instead of a threshold stands for one policy per step, e.g. a step ladder over
+        YARNMemoryAvailablePercentage. steps expects either thresholds (List) or start, stop and step,
+        and either adjustments (List, one per threshold) or adjustment (default 1) and adjustment_step
+        (added at every step, default 0)
 
   compute:
     type: dict
@@ -108,6 +124,19 @@ options:
     description:
       - Schema that contains cluster parameters
 
+  wait:
+    type: bool
+    default: false
+    description:
+      - After creating the cluster, wait until the master and core instance groups are running with their target
+        number of instances and the bootstrap actions have finished. The cluster state is polled with backoff.
+
+  wait_timeout:
+    type: int
+    default: 1800
+    description:
+      - Number of seconds to wait for the cluster when wait is set
+
 """
 EXAMPLES = """
 #Create an EMR Cluster
@@ -170,8 +199,50 @@ EXAMPLES = """
           additional_info: "{'test':'more information'}"
           job_flow_role: EMR_EC2_DefaultRole
           security_configuration: test
+        wait: true
+        wait_timeout: 2400
       register: result
-    - debug: var=result
+    - debug: var=result.cluster.phases
+
+#Scale the task group up in steps as the available YARN memory goes down
+
+- hosts: localhost
+  tasks:
+    - name: create emr with step scaling
+      spotinst_mrScaler:
+        name: ansible_test_group
+        region: us-west-2
+        scaling:
+          up:
+            - metric_name: YARNMemoryAvailablePercentage
+              namespace: AWS/ElasticMapReduce
+              statistic: average
+              unit: percent
+              operator: lt
+              period: 300
+              evaluation_periods: 1
+              cooldown: 300
+              action:
+                type: adjustment
+              steps:
+                start: 40
+                stop: 10
+                step: -10
+                adjustment: 1
+                adjustment_step: 1
+          down:
+            - metric_name: YARNMemoryAvailablePercentage
+              namespace: AWS/ElasticMapReduce
+              statistic: average
+              unit: percent
+              operator: gt
+              period: 300
+              evaluation_periods: 3
+              cooldown: 600
+              threshold: 80
+              action:
+                type: adjustment
+                adjustment: 1
 """
 RETURN = """
 ---
@@ -180,12 +251,32 @@ result:
     returned: success
     sample: simrs-35124875
     description: Created EMR Cluster successfully.
+scheduling_preview:
+    type: list
+    returned: when scheduling_preview is set
+    description: The next firing times of every enabled scheduled task, in UTC, with the capacities it sets
+    sample: [{"instance_group_type": "task", "task_type": "setCapacity", "cron_expression": "0 8 * * 1-5",
+              "firings": [{"time": "2020-01-06T08:00:00Z", "target_capacity": 10, "min_capacity": 5,
+                           "max_capacity": 20}]}]
+scheduling_overlaps:
+    type: list
+    returned: when scheduling_preview is set
+    description: The firing times shared by several tasks of the same instance group, with the indexes of the tasks
+    sample: [{"time": "2020-01-06T08:00:00Z", "instance_group_type": "task", "tasks": [0, 2]}]
+cluster:
+    type: dict
+    returned: when wait is set and the cluster was created
+    description:
+      - The final cluster state, the running instances of every instance group and the duration of every phase in seconds
+    sample: {"state": "WAITING", "duration": 512.3, "phases": {"provisioning": 121.0, "starting": 240.8, "bootstrapping": 150.5},
+             "instance_groups": {"MASTER": {"target": 1, "running": 1}, "CORE": {"target": 2, "running": 2}}}
 """
 HAS_SPOTINST_SDK = False
 __metaclass__ = type
 
 import os
 import time
+from datetime import datetime, timedelta
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import env_fallback
 
@@ -198,6 +289,19 @@ try:
 except ImportError:
     pass
 
+EMR_RUNNING_STATES = ('RUNNING', 'WAITING')
+EMR_FAILED_STATES = ('TERMINATING', 'TERMINATED', 'TERMINATED_WITH_ERRORS')
+EMR_POLL_MIN_DELAY = 10
+EMR_POLL_MAX_DELAY = 60
+
+CRON_MONTH_NAMES = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+CRON_DAY_NAMES = ('SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT')
+# minute, hour, day of month, month and day of week, with their range and the names they can be given by
+CRON_FIELDS = (('minute', 0, 59, ()), ('hour', 0, 23, ()), ('day of month', 1, 31, ()),
+               ('month', 1, 12, CRON_MONTH_NAMES), ('day of week', 0, 7, CRON_DAY_NAMES))
+# long enough for an expression that only fires on February 29th
+CRON_SEARCH_DAYS = 366 * 8
+
 
 # region Request Builder Funcitons
 def expand_emr_request(module, is_update):
@@ -655,7 +759,7 @@ def expand_cluster(emr, cluster, is_update, do_not_update):
 # region scheduling
 def expand_scheduling(emr, scheduling):
     emr_scheduing = spotinst.spotinst_emr.Scheduling()
-    tasks = scheduling.get('scheduling')
+    tasks = scheduling.get('tasks')
 
     if tasks is not None:
         expand_tasks(emr_scheduing=emr_scheduing, tasks=tasks)
@@ -716,7 +820,7 @@ def expand_scaling(emr, scaling):
 def expand_metrics(emr_scaling, metrics, direction):
     metric_list = []
 
-    for single_metric in metrics:
+    for single_metric in generate_step_policies(metrics):
         emr_metric = spotinst.spotinst_emr.Metric()
 
         metric_name = single_metric.get('metric_name')
@@ -733,40 +837,40 @@ def expand_metrics(emr_scaling, metrics, direction):
         operator = single_metric.get('operator')
 
         if metric_name is not None:
-            emr_metric.metric_name
+            emr_metric.metric_name = metric_name
 
         if statistic is not None:
-            emr_metric.statistic
+            emr_metric.statistic = statistic
 
         if unit is not None:
-            emr_metric.unit
+            emr_metric.unit = unit
 
         if threshold is not None:
-            emr_metric.threshold
+            emr_metric.threshold = threshold
 
         if adjustment is not None:
-            emr_metric.adjustment
+            emr_metric.adjustment = adjustment
 
         if namespace is not None:
-            emr_metric.namespace
+            emr_metric.namespace = namespace
 
         if period is not None:
-            emr_metric.period
+            emr_metric.period = period
 
         if evaluation_periods is not None:
-            emr_metric.evaluation_periods
+            emr_metric.evaluation_periods = evaluation_periods
 
         if action is not None:
             expand_action(emr_metric=emr_metric, action=action)
 
         if cooldown is not None:
-            emr_metric.cooldown
+            emr_metric.cooldown = cooldown
 
         if dimensions is not None:
             expand_dimensions(emr_metric=emr_metric, dimensions=dimensions)
 
         if operator is not None:
-            emr_metric.operator
+            emr_metric.operator = operator
 
         metric_list.append(emr_metric)
 
@@ -777,6 +881,79 @@ def expand_metrics(emr_scaling, metrics, direction):
         emr_scaling.down = metric_list
 
 
+# repeated in spotinst_emr_scaling_simulator as the modules are shipped on their own.
+# A test checks that both copies stay the same, change them together
+def generate_step_policies(metrics):
+    """
+    The metrics with every metric that has steps replaced by one policy per step,
+    each with the threshold and action adjustment of its step
+    """
+    policies = []
+
+    for single_metric in metrics:
+        steps = single_metric.get('steps')
+
+        if steps is None:
+            policies.append(single_metric)
+            continue
+
+        thresholds = get_step_thresholds(steps)
+        adjustments = get_step_adjustments(steps, len(thresholds))
+
+        for threshold, adjustment in zip(thresholds, adjustments):
+            policy = dict((key, value) for key, value in single_metric.items() if key != 'steps')
+            policy['threshold'] = threshold
+            policy['action'] = dict(single_metric.get('action') or dict(type='adjustment'), adjustment=adjustment)
+            policies.append(policy)
+
+    return policies
+
+
+def get_step_thresholds(steps):
+    thresholds = steps.get('thresholds')
+
+    if thresholds is not None:
+        if not thresholds:
+            raise ValueError("steps thresholds must not be empty")
+
+        return list(thresholds)
+
+    start = steps.get('start')
+    stop = steps.get('stop')
+    step = steps.get('step')
+
+    if start is None or stop is None or step is None:
+        raise ValueError("steps must have thresholds or start, stop and step")
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError("steps step must go from start towards stop")
+
+    count = int((stop - start) / step + 1e-9) + 1
+
+    # rounded, so that float steps don't add up errors
+    return [round(start + index * step, 6) for index in range(count)]
+
+
+def get_step_adjustments(steps, count):
+    adjustments = steps.get('adjustments')
+
+    if adjustments is not None:
+        if len(adjustments) != count:
+            raise ValueError("steps must have as many adjustments as thresholds")
+
+        return list(adjustments)
+
+    adjustment = steps.get('adjustment', 1)
+    adjustment_step = steps.get('adjustment_step', 0)
+
+    return [adjustment + index * adjustment_step for index in range(count)]
+
+
+def validate_scaling(scaling):
+    for direction in ('up', 'down'):
+        if scaling.get(direction) is not None:
+            generate_step_policies(scaling.get(direction))
+
+
 def expand_action(emr_metric, action):
     emr_action = spotinst.spotinst_emr.Action()
 
@@ -820,6 +997,136 @@ def expand_dimensions(emr_metric, dimensions):
 # endregion
 
 
+# region Scheduling Preview Functions
+def parse_cron_value(value, minimum, names):
+    value = value.upper()
+
+    if value in names:
+        return names.index(value) + minimum
+
+    return int(value)
+
+
+def parse_cron_field(field, name, minimum, maximum, names):
+    """The values of a cron field, e.g. 1-5, */15 or MON,WED"""
+    values = set()
+
+    for part in field.split(','):
+        range_part, _, step = part.partition('/')
+
+        if range_part in ('*', '?'):
+            first, last = minimum, maximum
+        elif '-' in range_part:
+            first, last = [parse_cron_value(value, minimum, names) for value in range_part.split('-', 1)]
+        else:
+            first = parse_cron_value(range_part, minimum, names)
+            last = maximum if step else first
+
+        step = int(step) if step else 1
+
+        if not minimum <= first <= last <= maximum or step < 1:
+            raise ValueError("invalid {0} field {1}".format(name, field))
+
+        values.update(range(first, last + 1, step))
+
+    return values
+
+
+def parse_cron_expression(cron_expression):
+    fields = cron_expression.split()
+
+    if len(fields) != len(CRON_FIELDS):
+        raise ValueError("cron expression {0} must have {1} fields".format(cron_expression, len(CRON_FIELDS)))
+
+    try:
+        minutes, hours, days, months, weekdays = [
+            parse_cron_field(field, name, minimum, maximum, names)
+            for field, (name, minimum, maximum, names) in zip(fields, CRON_FIELDS)]
+    except ValueError as exc:
+        raise ValueError("cron expression {0}: {1}".format(cron_expression, exc))
+
+    # 7 is sunday as well
+    if 7 in weekdays:
+        weekdays = (weekdays - {7}) | {0}
+
+    return dict(minutes=sorted(minutes), hours=sorted(hours), days=days, months=months, weekdays=weekdays,
+                any_day=fields[2] in ('*', '?'), any_weekday=fields[4] in ('*', '?'))
+
+
+def is_cron_day(cron, day):
+    if day.month not in cron['months']:
+        return False
+
+    is_day = day.day in cron['days']
+    is_weekday = (day.weekday() + 1) % 7 in cron['weekdays']
+
+    # like cron, a restricted day of month and day of week match either
+    if cron['any_day'] and cron['any_weekday']:
+        return True
+    if cron['any_day']:
+        return is_weekday
+    if cron['any_weekday']:
+        return is_day
+
+    return is_day or is_weekday
+
+
+def get_cron_firings(cron_expression, start, count):
+    """The next count times after start at which the cron expression fires"""
+    cron = parse_cron_expression(cron_expression)
+    firings = []
+    day = datetime(start.year, start.month, start.day)
+
+    for _ in range(CRON_SEARCH_DAYS):
+        if is_cron_day(cron, day):
+            for hour in cron['hours']:
+                for minute in cron['minutes']:
+                    firing = day.replace(hour=hour, minute=minute)
+
+                    if firing > start:
+                        firings.append(firing)
+                        if len(firings) == count:
+                            return firings
+
+        day += timedelta(days=1)
+
+    return firings
+
+
+def preview_scheduling(scheduling, count, start):
+    """The next firings of every enabled task and the times at which tasks of the same instance group overlap"""
+    if count < 1:
+        raise ValueError("scheduling_preview must be at least 1, got {0}".format(count))
+
+    preview = []
+    tasks_by_firing = dict()
+
+    for index, task in enumerate((scheduling or dict()).get('tasks') or []):
+        if task.get('is_enabled') is False or task.get('cron_expression') is None:
+            continue
+
+        firings = get_cron_firings(task['cron_expression'], start, count)
+
+        for firing in firings:
+            tasks_by_firing.setdefault((firing, task.get('instance_group_type')), []).append(index)
+
+        preview.append(dict(
+            instance_group_type=task.get('instance_group_type'),
+            task_type=task.get('task_type'),
+            cron_expression=task['cron_expression'],
+            firings=[dict(time=firing.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                          target_capacity=task.get('target_capacity'),
+                          min_capacity=task.get('min_capacity'),
+                          max_capacity=task.get('max_capacity')) for firing in firings]))
+
+    overlaps = [dict(time=firing.strftime('%Y-%m-%dT%H:%M:%SZ'), instance_group_type=instance_group_type, tasks=tasks)
+                for (firing, instance_group_type), tasks in sorted(tasks_by_firing.items(), key=lambda item: item[0][0])
+                if len(tasks) > 1]
+
+    return preview, overlaps
+# endregion
+
+
 # region Util Functions
 def handle_emr(client, module):
     request_type, emr_id = get_request_type_and_id(client=client, module=module)
@@ -827,9 +1134,14 @@ def handle_emr(client, module):
     group_id = None
     message = None
     has_changed = False
+    cluster = None
 
     if request_type == "create":
         group_id, message, has_changed = handle_create(client=client, module=module)
+
+        if module.params.get('wait'):
+            cluster = wait_for_emr(client=client, module=module, emr_id=group_id)
+            message = 'Created EMR Cluster Successfully and it is running.'
     elif request_type == "update":
         group_id, message, has_changed = handle_update(client=client, module=module, emr_id=emr_id)
     elif request_type == "delete":
@@ -837,7 +1149,97 @@ def handle_emr(client, module):
     else:
         module.fail_json(msg="Action Not Allowed")
 
-    return group_id, message, has_changed
+    return group_id, message, has_changed, cluster
+
+
+def get_instance_group_targets(module):
+    instance_groups = (module.params.get('compute') or dict()).get('instance_groups') or dict()
+    master_group = instance_groups.get('master_group') or dict()
+    core_group = instance_groups.get('core_group') or dict()
+
+    core_target = core_group.get('target')
+    if core_target is None:
+        core_target = (core_group.get('capacity') or dict()).get('target')
+
+    return dict(MASTER=master_group.get('target') or 1, CORE=core_target or 0)
+
+
+def get_emr_status(client, emr_id, targets):
+    try:
+        emr_cluster = client.get_emr_cluster(emr_id=emr_id)
+    except SpotinstClientException:
+        # the EMR cluster is not created until Spotinst provisioned its instances
+        return 'PROVISIONING', dict()
+
+    state = (emr_cluster.get('status') or dict()).get('state') or emr_cluster.get('state') or 'PROVISIONING'
+
+    running = dict((group_type, 0) for group_type in targets)
+    for instance in client.get_emr_instances(emr_id=emr_id):
+        group_type = (instance.get('instance_group_type') or '').upper()
+        instance_state = (instance.get('status') or instance.get('state') or '')
+
+        if isinstance(instance_state, dict):
+            instance_state = instance_state.get('state') or ''
+
+        if group_type in running and instance_state.upper() == 'RUNNING':
+            running[group_type] += 1
+
+    instance_groups = dict((group_type, dict(target=targets[group_type], running=running[group_type]))
+                           for group_type in targets)
+
+    return state, instance_groups
+
+
+def is_emr_ready(state, instance_groups):
+    return state in EMR_RUNNING_STATES and \
+        all(group['running'] >= group['target'] for group in instance_groups.values())
+
+
+def wait_for_emr(client, module, emr_id):
+    wait_timeout = module.params.get('wait_timeout') or 1800
+    targets = get_instance_group_targets(module=module)
+
+    start_time = time.time()
+    deadline = start_time + wait_timeout
+    delay = EMR_POLL_MIN_DELAY
+
+    phases = dict()
+    phase = None
+    phase_start_time = start_time
+
+    state, instance_groups = get_emr_status(client=client, emr_id=emr_id, targets=targets)
+
+    while True:
+        now = time.time()
+        is_done = is_emr_ready(state, instance_groups) or state in EMR_FAILED_STATES or now >= deadline
+
+        if phase is not None and (state != phase or is_done) and now > phase_start_time:
+            phases[phase.lower()] = round(phases.get(phase.lower(), 0) + now - phase_start_time, 1)
+
+        if is_done:
+            break
+
+        if state != phase:
+            if phase is not None:
+                # poll at a fine granularity again once the cluster moved on
+                delay = EMR_POLL_MIN_DELAY
+
+            phase = state
+            phase_start_time = now
+
+        time.sleep(min(delay, max(deadline - now, 0)))
+        delay = min(delay * 2, EMR_POLL_MAX_DELAY)
+        state, instance_groups = get_emr_status(client=client, emr_id=emr_id, targets=targets)
+
+    cluster = dict(state=state, phases=phases, instance_groups=instance_groups,
+                   duration=round(time.time() - start_time, 1))
+
+    if not is_emr_ready(state, instance_groups):
+        reason = 'ended with state ' + state if state in EMR_FAILED_STATES else 'is not running after the wait timeout'
+        module.fail_json(changed=True, group_id=emr_id, cluster=cluster,
+                         msg='Created EMR Cluster Successfully, but it ' + reason)
+
+    return cluster
 
 
 def get_request_type_and_id(client, module):
@@ -967,18 +1369,40 @@ def main():
         compute=dict(type='dict'),
         cluster=dict(type='dict'),
         scheduling=dict(type='dict'),
-        scaling=dict(type='dict'))
+        scaling=dict(type='dict'),
+        scheduling_preview=dict(type='int'),
+        wait=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=1800))
 
     module = AnsibleModule(argument_spec=fields)
 
+    if module.params.get('scheduling_preview') is not None:
+        if module.params.get('scheduling_preview') < 1:
+            module.fail_json(msg="scheduling_preview must be at least 1")
+
+        try:
+            preview, overlaps = preview_scheduling(scheduling=module.params.get('scheduling'),
+                                                   count=module.params.get('scheduling_preview'),
+                                                   start=datetime.utcnow().replace(second=0, microsecond=0))
+        except ValueError as exc:
+            module.fail_json(msg="Invalid scheduling: " + str(exc))
+
+        module.exit_json(changed=False, scheduling_preview=preview, scheduling_overlaps=overlaps)
+
     if not HAS_SPOTINST_SDK:
         module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
 
+    if module.params.get('scaling') is not None:
+        try:
+            validate_scaling(module.params.get('scaling'))
+        except (TypeError, ValueError) as exc:
+            module.fail_json(msg="Invalid scaling: " + str(exc))
+
     client = get_client(module=module)
 
-    group_id, message, has_changed = handle_emr(client=client, module=module)
+    group_id, message, has_changed, cluster = handle_emr(client=client, module=module)
 
-    module.exit_json(changed=has_changed, group_id=group_id, message=message)
+    module.exit_json(changed=has_changed, group_id=group_id, message=message, cluster=cluster)
 
 
 if __name__ == '__main__':
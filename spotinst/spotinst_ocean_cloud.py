@@ -103,6 +103,33 @@ options:
     description:
       - Schema containing info on the type of compute resources to use
     required: true
+
+  roll_config:
+    type: dict
+    description:
+      - Optional schema for rolling the cluster nodes after an update, e.g. after changing compute.launch_specification.image_id.
+        Has no effect on create or delete.
+      - batch_size_percentage (int, required) - percentage of the cluster nodes replaced in each batch
+      - respect_pdb (bool) - whether to respect the Pod Disruption Budgets of the workloads while rolling
+      - launch_spec_ids (list) - only roll the nodes of these launch specifications
+      - comment (str) - comment attached to the roll
+      - wait (bool, default false) - wait until the roll is done, polling its status with backoff
+      - wait_timeout (int, default 1800) - seconds to wait for the roll
+
+  auto_scaler_plan:
+    type: dict
+    description:
+      - Optional planning mode. When set, nothing is sent to the API and the module only returns the auto_scaler
+        (headroom and resource_limits) it recommends, based on a histogram of pod resource requests.
+        The pods are bin-packed onto each type of compute.instance_types.whitelist and the type that wastes
+        the least capacity is used for the limits.
+      - pods_file (path, required) - JSON or YAML file with a list of pods, each with cpu (millicores),
+        memory (MiB) and count. Also accepts a dict with that list under pods and an optional instance_types
+        dict of name to vcpu and memory_gib, for types whose size can't be derived from the name
+      - headroom_percentage (int, default 10) - headroom units to keep, as a percentage of the pods
+      - headroom_percentile (int, default 90) - percentile of the pod requests used for the size of a headroom unit
+      - limits_buffer_percentage (int, default 20) - extra room added to max_vCpu and max_memory_gib
+      - allocatable_percentage (int, default 90) - percentage of a node's resources that pods can use
 """
 EXAMPLES = """
 #In this basic example, we create an ocean cluster
@@ -154,6 +181,48 @@ EXAMPLES = """
                 tag_value: test
       register: result
     - debug: var=result
+
+#In this example, we update the cluster image and roll the nodes, waiting for the roll to finish
+
+- hosts: localhost
+  tasks:
+    - name: update ocean image and roll
+      spotinst_ocean_cloud:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        state: present
+        name: ansible_test_ocean
+        region: us-west-2
+        controller_cluster_id: ocean.k8s
+        compute:
+          launch_specification:
+            image_id: ami-654321
+        roll_config:
+          batch_size_percentage: 20
+          respect_pdb: True
+          wait: True
+          wait_timeout: 3600
+      register: result
+    - debug: var=result.roll.batches
+
+#In this example, we compute the recommended headroom and resource limits without changing the cluster
+
+- hosts: localhost
+  tasks:
+    - name: plan ocean auto scaler
+      spotinst_ocean_cloud:
+        name: ansible_test_ocean
+        compute:
+          instance_types:
+            whitelist:
+              - c5.2xlarge
+              - m5.2xlarge
+              - r5.xlarge
+        auto_scaler_plan:
+          pods_file: pods.yml
+          headroom_percentage: 15
+      register: result
+    - debug: var=result.auto_scaler
 """
 RETURN = """
 ---
@@ -162,11 +231,36 @@ result:
     sample: o-d861f48d
     returned: success
     description: Created Ocean Cluster successfully
+roll:
+    type: dict
+    returned: when roll_config is set and the cluster was updated
+    description:
+      - The roll that was started. When waiting for it, also holds its final status, total duration
+        and the duration of every batch in seconds
+    sample: {"id": "scr-4a9f6d2b", "status": "COMPLETED", "duration": 642.1,
+             "batches": [{"batch": 1, "duration": 310.4}, {"batch": 2, "duration": 331.7}]}
+auto_scaler:
+    type: dict
+    returned: when auto_scaler_plan is set
+    description:
+      - The auto_scaler the plan recommends, with the given auto_scaler values and the computed headroom and resource_limits
+    sample: {"headroom": {"cpu_per_unit": 500, "memory_per_unit": 1024, "num_of_units": 12},
+             "resource_limits": {"max_vCpu": 96, "max_memory_gib": 384}}
+auto_scaler_plan:
+    type: dict
+    returned: when auto_scaler_plan is set
+    description:
+      - The bin-packing result of every whitelisted instance type and the one used for the resource limits
+    sample: {"instance_type": "m5.2xlarge", "instance_types": [{"instance_type": "m5.2xlarge", "nodes": 10,
+             "vcpu": 80, "memory_gib": 320, "cpu_utilization": 0.81, "memory_utilization": 0.77}]}
 """
 HAS_SPOTINST_SDK = False
 __metaclass__ = type
 
+import json
+import math
 import os
+import re
 import time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import env_fallback
@@ -180,6 +274,19 @@ try:
 except ImportError:
     pass
 
+OCEAN_CLUSTER_URL = "https://api.spotinst.io/ocean/aws/k8s/cluster"
+
+ROLL_END_STATUSES = ('COMPLETED', 'FAILED', 'STOPPED')
+ROLL_POLL_MIN_DELAY = 5
+ROLL_POLL_MAX_DELAY = 60
+
+# vCPUs of the regular instance sizes, `<n>xlarge` sizes have 4 * n vCPUs
+INSTANCE_SIZE_VCPUS = {'medium': 1, 'large': 2, 'xlarge': 4}
+# (vCPUs, memory GiB) of the burstable (t family) sizes
+BURSTABLE_INSTANCE_SIZES = {'nano': (2, 0.5), 'micro': (2, 1), 'small': (2, 2), 'medium': (2, 4), 'large': (2, 8)}
+# memory GiB per vCPU, by the first letter of the instance family
+MEMORY_GIB_PER_VCPU = {'a': 2, 'c': 2, 'd': 8, 'g': 4, 'h': 4, 'i': 8, 'm': 4, 'p': 8, 'r': 8, 't': 4, 'x': 16, 'z': 8}
+
 
 # region Request Builder Funcitons
 def expand_ocean_request(module, is_update):
@@ -447,6 +554,223 @@ def expand_tags(ocean_launch_specs, tags):
 
     ocean_launch_specs.tags = tag_list
 # endregion
+
+
+# region Roll
+def expand_roll(roll_config):
+    roll = dict(batchSizePercentage=roll_config.get('batch_size_percentage'))
+
+    respect_pdb = roll_config.get('respect_pdb')
+    launch_spec_ids = roll_config.get('launch_spec_ids')
+    comment = roll_config.get('comment')
+
+    if respect_pdb is not None:
+        roll['respectPdb'] = respect_pdb
+    if launch_spec_ids is not None:
+        roll['launchSpecIds'] = launch_spec_ids
+    if comment is not None:
+        roll['comment'] = comment
+
+    return roll
+# endregion
+# endregion
+
+
+# region Auto Scaler Plan
+def load_pods_file(pods_file):
+    with open(pods_file, "r") as pods:
+        content = pods.read()
+
+    try:
+        import yaml
+        data = yaml.safe_load(content)
+    except ImportError:
+        data = json.loads(content)
+
+    if isinstance(data, list):
+        data = dict(pods=data)
+
+    return data.get('pods') or [], data.get('instance_types') or dict()
+
+
+def get_instance_type_resources(instance_type):
+    match = re.match(r'^([a-z]+)[0-9][a-z0-9-]*\.([0-9]*)(nano|micro|small|medium|xlarge|large)$', instance_type)
+
+    if match is None:
+        return None
+
+    family, multiplier, size = match.groups()
+
+    if family == 't' and not multiplier and size in BURSTABLE_INSTANCE_SIZES:
+        return BURSTABLE_INSTANCE_SIZES[size]
+
+    vcpu = INSTANCE_SIZE_VCPUS.get(size)
+    memory_gib_per_vcpu = MEMORY_GIB_PER_VCPU.get(family[0])
+
+    if vcpu is None or memory_gib_per_vcpu is None or (multiplier and size != 'xlarge'):
+        return None
+
+    if multiplier:
+        vcpu *= int(multiplier)
+
+    return vcpu, vcpu * memory_gib_per_vcpu
+
+
+def get_pod_shapes(pods):
+    shapes = dict()
+
+    for pod in pods:
+        shape = (int(pod.get('cpu') or 0), int(pod.get('memory') or 0))
+        shapes[shape] = shapes.get(shape, 0) + int(pod.get('count', 1))
+
+    # largest pods first (first fit decreasing)
+    return sorted(([cpu, memory, count] for (cpu, memory), count in shapes.items() if count > 0), reverse=True)
+
+
+def pack_pods(pod_shapes, node_cpu, node_memory):
+    if any(cpu > node_cpu or memory > node_memory for cpu, memory, _ in pod_shapes):
+        return None
+
+    remaining = [list(shape) for shape in pod_shapes]
+    nodes = 0
+
+    while remaining:
+        free_cpu, free_memory = node_cpu, node_memory
+        fits = []
+
+        for shape in remaining:
+            cpu, memory, count = shape
+            fit = count
+
+            if cpu:
+                fit = min(fit, free_cpu // cpu)
+            if memory:
+                fit = min(fit, free_memory // memory)
+
+            fits.append(fit)
+            free_cpu -= fit * cpu
+            free_memory -= fit * memory
+
+        # first fit is deterministic: the same node fill repeats while every packed shape still has enough pods
+        repeats = min(shape[2] // fit for shape, fit in zip(remaining, fits) if fit > 0)
+
+        for shape, fit in zip(remaining, fits):
+            shape[2] -= fit * repeats
+
+        nodes += repeats
+        remaining = [shape for shape in remaining if shape[2] > 0]
+
+    return nodes
+
+
+def get_percentile(pod_shapes, index, percentile):
+    total = sum(shape[2] for shape in pod_shapes)
+    threshold = total * percentile / 100.0
+    cumulative = 0
+
+    for shape in sorted(pod_shapes, key=lambda pod_shape: pod_shape[index]):
+        cumulative += shape[2]
+        if cumulative >= threshold:
+            return shape[index]
+
+    return 0
+
+
+def plan_auto_scaler(pods, instance_types, auto_scaler_plan, instance_type_resources=None):
+    headroom_percentage = auto_scaler_plan.get('headroom_percentage', 10)
+    headroom_percentile = auto_scaler_plan.get('headroom_percentile', 90)
+    limits_buffer_percentage = auto_scaler_plan.get('limits_buffer_percentage', 20)
+    allocatable_percentage = auto_scaler_plan.get('allocatable_percentage', 90)
+
+    pod_shapes = get_pod_shapes(pods)
+    total_pods = sum(shape[2] for shape in pod_shapes)
+
+    headroom = dict(
+        cpu_per_unit=get_percentile(pod_shapes, 0, headroom_percentile),
+        memory_per_unit=get_percentile(pod_shapes, 1, headroom_percentile),
+        num_of_units=int(math.ceil(total_pods * headroom_percentage / 100.0)))
+
+    # the headroom units have to fit in the cluster as well
+    if headroom['num_of_units'] > 0:
+        pod_shapes = get_pod_shapes(pods + [dict(cpu=headroom['cpu_per_unit'], memory=headroom['memory_per_unit'],
+                                                 count=headroom['num_of_units'])])
+
+    requested_cpu = sum(cpu * count for cpu, _, count in pod_shapes)
+    requested_memory = sum(memory * count for _, memory, count in pod_shapes)
+
+    instance_type_plans = []
+    for instance_type in instance_types:
+        resources = (instance_type_resources or dict()).get(instance_type)
+        if resources is not None:
+            resources = (resources['vcpu'], resources['memory_gib'])
+        else:
+            resources = get_instance_type_resources(instance_type)
+
+        if resources is None:
+            instance_type_plans.append(dict(instance_type=instance_type, nodes=None,
+                                            msg='Unknown instance type size, set it in the pods file instance_types'))
+            continue
+
+        vcpu, memory_gib = resources
+        node_cpu = int(vcpu * 1000 * allocatable_percentage / 100)
+        node_memory = int(memory_gib * 1024 * allocatable_percentage / 100)
+        nodes = pack_pods(pod_shapes, node_cpu, node_memory)
+
+        if nodes is None:
+            instance_type_plans.append(dict(instance_type=instance_type, nodes=None,
+                                            msg='The largest pods do not fit on this instance type'))
+            continue
+
+        instance_type_plans.append(dict(
+            instance_type=instance_type,
+            nodes=nodes,
+            vcpu=nodes * vcpu,
+            memory_gib=nodes * memory_gib,
+            cpu_utilization=round(requested_cpu / float(nodes * vcpu * 1000), 2) if nodes else 0,
+            memory_utilization=round(requested_memory / float(nodes * memory_gib * 1024), 2) if nodes else 0))
+
+    packed_plans = [plan for plan in instance_type_plans if plan['nodes'] is not None]
+    if not packed_plans:
+        return None, dict(instance_type=None, instance_types=instance_type_plans)
+
+    # the type wasting the least capacity, counting cpu and memory alike
+    best_plan = max(packed_plans, key=lambda plan: plan['cpu_utilization'] + plan['memory_utilization'])
+    buffer = 1 + limits_buffer_percentage / 100.0
+
+    auto_scaler = dict(
+        headroom=headroom,
+        resource_limits=dict(
+            max_vCpu=int(math.ceil(best_plan['vcpu'] * buffer)),
+            max_memory_gib=int(math.ceil(best_plan['memory_gib'] * buffer))))
+
+    return auto_scaler, dict(instance_type=best_plan['instance_type'], instance_types=instance_type_plans)
+
+
+def handle_auto_scaler_plan(module):
+    auto_scaler_plan = module.params.get('auto_scaler_plan')
+    compute = module.params.get('compute') or dict()
+    instance_types = (compute.get('instance_types') or dict()).get('whitelist')
+
+    if not auto_scaler_plan.get('pods_file'):
+        module.fail_json(msg="auto_scaler_plan.pods_file is required")
+    if not instance_types:
+        module.fail_json(msg="auto_scaler_plan requires compute.instance_types.whitelist")
+
+    try:
+        pods, instance_type_resources = load_pods_file(pods_file=os.path.expanduser(auto_scaler_plan['pods_file']))
+    except (IOError, ValueError) as exc:
+        module.fail_json(msg="Failed reading the pods file: " + str(exc))
+
+    recommended, plan = plan_auto_scaler(pods=pods, instance_types=instance_types, auto_scaler_plan=auto_scaler_plan,
+                                         instance_type_resources=instance_type_resources)
+
+    if recommended is None:
+        module.fail_json(msg="None of the whitelisted instance types can run the pods", auto_scaler_plan=plan)
+
+    auto_scaler = dict(module.params.get('auto_scaler') or dict())
+    auto_scaler.update(recommended)
+
+    return auto_scaler, plan
 # endregion
 
 
@@ -457,17 +781,18 @@ def handle_ocean(client, module):
     group_id = None
     message = None
     has_changed = False
+    roll = None
 
     if request_type == "create":
         group_id, message, has_changed = handle_create(client=client, module=module)
     elif request_type == "update":
-        group_id, message, has_changed = handle_update(client=client, module=module, ocean_id=ocean_id)
+        group_id, message, has_changed, roll = handle_update(client=client, module=module, ocean_id=ocean_id)
     elif request_type == "delete":
         group_id, message, has_changed = handle_delete(client=client, module=module, ocean_id=ocean_id)
     else:
         module.fail_json(msg="Action Not Allowed")
 
-    return group_id, message, has_changed
+    return group_id, message, has_changed, roll
 
 
 def get_request_type_and_id(client, module):
@@ -567,8 +892,86 @@ def handle_update(client, module, ocean_id):
 
     message = 'Updated Ocean Cluster successfully'
     has_changed = True
+    roll = None
 
-    return ocean_id, message, has_changed
+    roll_config = module.params.get('roll_config')
+    if roll_config:
+        try:
+            roll = start_roll(client=client, ocean_id=ocean_id, roll_config=roll_config)
+            message = 'Updated and started rolling the Ocean Cluster successfully'
+        except SpotinstClientException as exc:
+            message = 'Updated Ocean Cluster successfully, but failed to perform roll. Error:' + str(exc)
+
+        if roll is not None and roll_config.get('wait'):
+            wait_timeout = roll_config.get('wait_timeout') or 1800
+            roll = wait_for_roll(client=client, ocean_id=ocean_id, roll=roll, wait_timeout=wait_timeout)
+
+            if roll.get('status') != 'COMPLETED':
+                module.fail_json(changed=has_changed, group_id=ocean_id, roll=roll,
+                                 msg='Updated Ocean Cluster successfully, but roll {0} ended with status {1}'.format(
+                                     roll.get('id'), roll.get('status')))
+
+            message = 'Updated and rolled the Ocean Cluster successfully'
+
+    return ocean_id, message, has_changed, roll
+
+
+def start_roll(client, ocean_id, roll_config):
+    roll_request = dict(roll=expand_roll(roll_config=roll_config))
+
+    response = client.send_post(
+        body=json.dumps(roll_request),
+        url=OCEAN_CLUSTER_URL + "/" + ocean_id + "/roll",
+        entity_name='ocean roll')
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"][0]
+
+
+def get_roll(client, ocean_id, roll_id):
+    response = client.send_get(
+        url=OCEAN_CLUSTER_URL + "/" + ocean_id + "/roll/" + roll_id,
+        entity_name='ocean roll')
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"][0]
+
+
+def wait_for_roll(client, ocean_id, roll, wait_timeout):
+    start_time = time.time()
+    deadline = start_time + wait_timeout
+    delay = ROLL_POLL_MIN_DELAY
+
+    batches = []
+    current_batch = roll.get('current_batch')
+    batch_start_time = start_time
+
+    while roll.get('status') not in ROLL_END_STATUSES and time.time() < deadline:
+        time.sleep(min(delay, max(deadline - time.time(), 0)))
+        roll = get_roll(client=client, ocean_id=ocean_id, roll_id=roll['id'])
+
+        if roll.get('current_batch') != current_batch:
+            now = time.time()
+            if current_batch is not None:
+                batches.append(dict(batch=current_batch, duration=round(now - batch_start_time, 1)))
+
+            current_batch = roll.get('current_batch')
+            batch_start_time = now
+            # a new batch started, poll at a fine granularity again
+            delay = ROLL_POLL_MIN_DELAY
+        else:
+            delay = min(delay * 2, ROLL_POLL_MAX_DELAY)
+
+    now = time.time()
+    if roll.get('status') in ROLL_END_STATUSES and current_batch is not None:
+        batches.append(dict(batch=current_batch, duration=round(now - batch_start_time, 1)))
+
+    roll['batches'] = batches
+    roll['duration'] = round(now - start_time, 1)
+
+    return roll
 
 
 def handle_delete(client, module, ocean_id):
@@ -596,18 +999,24 @@ def main():
         auto_scaler=dict(type='dict'),
         capacity=dict(type='dict'),
         strategy=dict(type='dict'),
-        compute=dict(type='dict'))
+        compute=dict(type='dict'),
+        roll_config=dict(type='dict'),
+        auto_scaler_plan=dict(type='dict'))
 
     module = AnsibleModule(argument_spec=fields)
 
+    if module.params.get('auto_scaler_plan') is not None:
+        auto_scaler, plan = handle_auto_scaler_plan(module=module)
+        module.exit_json(changed=False, auto_scaler=auto_scaler, auto_scaler_plan=plan)
+
     if not HAS_SPOTINST_SDK:
         module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
 
     client = get_client(module=module)
 
-    group_id, message, has_changed = handle_ocean(client=client, module=module)
+    group_id, message, has_changed, roll = handle_ocean(client=client, module=module)
 
-    module.exit_json(changed=has_changed, group_id=group_id, message=message, instances=[])
+    module.exit_json(changed=has_changed, group_id=group_id, message=message, instances=[], roll=roll)
 
 
 if __name__ == '__main__':
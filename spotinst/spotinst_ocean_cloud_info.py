@@ -0,0 +1,339 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_ocean_cloud_info
+version_added: 2.8
+short_description: Get information about Spotinst Ocean clusters, their launch specifications and nodes
+author: Spotinst (@jeffnoehren)
+description:
+  - Can get Spotinst Ocean clusters together with their launch specifications and running nodes.
+    Launch specifications and nodes of all the matching clusters are fetched in parallel.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk >= 1.0.44
+options:
+
+  id:
+    type: str
+    description:
+      - Optional Ocean cluster id. When set only this cluster is returned
+
+  name:
+    type: str
+    description:
+      - Optional Ocean cluster name. When set only clusters with this name are returned
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  include_launch_specs:
+    type: bool
+    default: true
+    description:
+      - Whether to fetch the launch specifications of every cluster
+
+  include_nodes:
+    type: bool
+    default: true
+    description:
+      - Whether to fetch the nodes of every cluster
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+
+  cache_path:
+    type: path
+    default: "~/.spotinst/cache/ocean_cloud_info.json"
+    description:
+      - File the fetched clusters are cached in. Only used when cache_ttl is set
+
+  cache_ttl:
+    type: int
+    default: 0
+    description:
+      - Number of seconds a cached result stays valid. 0 disables the cache
+"""
+EXAMPLES = """
+#In this basic example, we get a cluster with its launch specifications and nodes
+
+- hosts: localhost
+  tasks:
+    - name: get ocean
+      spotinst_ocean_cloud_info:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        name: ansible_test_ocean
+        cache_ttl: 60
+      register: result
+    - debug: var=result.clusters[0].nodes_by_launch_spec
+"""
+RETURN = """
+---
+clusters:
+    type: list
+    returned: success
+    description:
+      - The matching Ocean clusters. Every cluster also contains its C(launch_specs), C(nodes),
+        C(nodes_by_launch_spec) and C(nodes_by_instance_type)
+    sample: [{"id": "o-d861f48d", "name": "ansible_test_ocean", "launch_specs": [], "nodes": [],
+              "nodes_by_launch_spec": {}, "nodes_by_instance_type": {}}]
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk as spotinst
+    from spotinst_sdk import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+OCEAN_BASE_URL = "https://api.spotinst.io/ocean/aws/k8s"
+
+DEFAULT_LAUNCH_SPEC = "default"
+
+
+# region Fetch Functions
+def get_clusters(client, module):
+    ocean_id = module.params.get('id')
+    name = module.params.get('name')
+
+    if ocean_id is not None:
+        clusters = [client.get_ocean_cluster(ocean_id=ocean_id)]
+    else:
+        clusters = client.get_all_ocean_cluster()
+
+    if name is not None:
+        clusters = [cluster for cluster in clusters if cluster.get('name') == name]
+
+    return clusters
+
+
+def get_launch_specs(client, ocean_id):
+    response = client.send_get(
+        url=OCEAN_BASE_URL + "/launchSpec",
+        entity_name="ocean launch spec",
+        query_params=dict(oceanId=ocean_id))
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"]
+
+
+def get_cluster_nodes(client, ocean_id):
+    response = client.send_get(
+        url=OCEAN_BASE_URL + "/cluster/" + ocean_id + "/nodes",
+        entity_name="ocean nodes")
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"]
+
+
+def fetch_clusters(client, module):
+    include_launch_specs = module.params.get('include_launch_specs')
+    include_nodes = module.params.get('include_nodes')
+    max_workers = module.params.get('max_workers') or 1
+
+    clusters = get_clusters(client=client, module=module)
+
+    # one listing for the clusters, then every per-cluster request runs concurrently
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        launch_spec_futures = dict()
+        node_futures = dict()
+
+        for cluster in clusters:
+            if include_launch_specs:
+                launch_spec_futures[cluster['id']] = executor.submit(get_launch_specs, client, cluster['id'])
+            if include_nodes:
+                node_futures[cluster['id']] = executor.submit(get_cluster_nodes, client, cluster['id'])
+
+        for cluster in clusters:
+            if include_launch_specs:
+                cluster['launch_specs'] = launch_spec_futures[cluster['id']].result()
+            if include_nodes:
+                cluster['nodes'] = node_futures[cluster['id']].result()
+                cluster['nodes_by_launch_spec'], cluster['nodes_by_instance_type'] = group_nodes(cluster['nodes'])
+
+    return clusters
+
+
+def group_nodes(nodes):
+    nodes_by_launch_spec = dict()
+    nodes_by_instance_type = dict()
+
+    for node in nodes:
+        instance_id = node.get('instance_id')
+        launch_spec = node.get('launch_spec_id') or DEFAULT_LAUNCH_SPEC
+        instance_type = node.get('instance_type')
+
+        nodes_by_launch_spec.setdefault(launch_spec, []).append(instance_id)
+
+        if instance_type is not None:
+            nodes_by_instance_type.setdefault(instance_type, []).append(instance_id)
+
+    return nodes_by_launch_spec, nodes_by_instance_type
+# endregion
+
+
+# region Cache Functions
+def get_cache_key(module):
+    return "{0}/{1}/{2}/{3}/{4}".format(
+        module.params.get('account_id'),
+        module.params.get('id'),
+        module.params.get('name'),
+        module.params.get('include_launch_specs'),
+        module.params.get('include_nodes'))
+
+
+def load_cache(cache_path, cache_key, cache_ttl):
+    try:
+        with open(cache_path, "r") as cache_file:
+            entry = json.load(cache_file).get(cache_key)
+    except (IOError, ValueError):
+        return None
+
+    if entry is None or time.time() - entry['timestamp'] > cache_ttl:
+        return None
+
+    return entry['clusters']
+
+
+def save_cache(cache_path, cache_key, clusters):
+    try:
+        with open(cache_path, "r") as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, ValueError):
+        cache = dict()
+
+    cache[cache_key] = dict(timestamp=time.time(), clusters=clusters)
+
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir and not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    with open(cache_path, "w") as cache_file:
+        json.dump(cache, cache_file)
+# endregion
+
+
+# region Util Functions
+def handle_ocean_info(client, module):
+    cache_ttl = module.params.get('cache_ttl')
+    cache_path = module.params.get('cache_path')
+    cache_key = get_cache_key(module=module)
+
+    if cache_ttl:
+        clusters = load_cache(cache_path=cache_path, cache_key=cache_key, cache_ttl=cache_ttl)
+        if clusters is not None:
+            return clusters
+
+    try:
+        clusters = fetch_clusters(client=client, module=module)
+    except SpotinstClientException as exc:
+        module.fail_json(msg="Error while attempting to get Ocean clusters: " + str(exc))
+
+    if cache_ttl:
+        save_cache(cache_path=cache_path, cache_key=cache_key, clusters=clusters)
+
+    return clusters
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find('=')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    client = spotinst.SpotinstClient(auth_token=token, print_output=False)
+
+    if account is not None:
+        client = spotinst.SpotinstClient(auth_token=token, account_id=account, print_output=False)
+
+    return client
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        id=dict(type='str'),
+        name=dict(type='str'),
+        include_launch_specs=dict(type='bool', default=True),
+        include_nodes=dict(type='bool', default=True),
+        max_workers=dict(type='int', default=10),
+        cache_path=dict(type='path', default="~/.spotinst/cache/ocean_cloud_info.json"),
+        cache_ttl=dict(type='int', default=0))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
+
+    client = get_client(module=module)
+
+    clusters = handle_ocean_info(client=client, module=module)
+
+    module.exit_json(changed=False, clusters=clusters)
+
+
+if __name__ == '__main__':
+    main()
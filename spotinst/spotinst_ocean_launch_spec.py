@@ -0,0 +1,368 @@
+#!/usr/bin/python
+# Copyright (c) 2017 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+DOCUMENTATION = """
+---
+module: spotinst_ocean_launch_spec
+version_added: 2.8
+short_description: Create, update or delete the launch specifications (virtual node groups) of a Spotinst Ocean cluster
+author: Spotinst (@jeffnoehren)
+description:
+  - Reconciles all the given launch specifications of an Ocean cluster in a single task.
+    The launch specifications of the cluster are listed once and matched by name, then the required
+    creates, updates and deletes are sent in parallel. Launch specifications that already match are left untouched.
+    You will have to have a credentials file in this location - <home>/.spotinst/credentials
+    The credentials file must contain a row that looks like this
+    token = <YOUR TOKEN>
+    Full documentation available at U(https://help.spotinst.com/hc/en-us/articles/115003530285-Ansible-)
+requirements:
+  - python >= 2.7
+  - spotinst_sdk >= 1.0.44
+options:
+
+  credentials_path:
+    type: str
+    default: "/root/.spotinst/credentials"
+    description:
+      - Optional parameter that allows to set a non-default credentials path.
+
+  account_id:
+    type: str
+    description:
+      - Optional parameter that allows to set an account-id inside the module configuration. By default this is retrieved from the credentials path
+
+  token:
+    type: str
+    description:
+      - Optional parameter that allows to set an token inside the module configuration. By default this is retrieved from the credentials path
+
+  ocean_id:
+    type: str
+    description:
+      - The id of the Ocean cluster the launch specifications belong to
+    required: true
+
+  launch_specs:
+    type: list
+    description:
+      - List of launch specifications, matched with the existing ones by name.
+      - Every item may set state (present or absent, default present) and any of name (required), image_id,
+        user_data (base64 encoded), security_group_ids, subnet_ids, iam_instance_profile (arn, name), instance_types,
+        root_volume_size, associate_public_ip_address, labels (key, value), taints (key, value, effect),
+        tags (tag_key, tag_value), auto_scale (headrooms - cpu_per_unit, memory_per_unit, gpu_per_unit, num_of_units)
+        and resource_limits (max_instance_count)
+    required: true
+
+  purge:
+    type: bool
+    default: false
+    description:
+      - Delete the launch specifications of the cluster that are not in launch_specs
+
+  max_workers:
+    type: int
+    default: 10
+    description:
+      - Maximum number of concurrent API requests
+"""
+EXAMPLES = """
+#In this basic example, we converge all the launch specifications of a cluster
+
+- hosts: localhost
+  tasks:
+    - name: converge launch specs
+      spotinst_ocean_launch_spec:
+        account_id: YOUR_ACCOUNT_ID
+        token: YOUR_API_TOKEN
+        ocean_id: o-d861f48d
+        purge: True
+        launch_specs:
+          - name: gpu-workloads
+            image_id: ami-123456
+            instance_types:
+              - p3.2xlarge
+            labels:
+              - key: workload
+                value: gpu
+            taints:
+              - key: nvidia.com/gpu
+                value: "true"
+                effect: NoSchedule
+          - name: batch
+            image_id: ami-123456
+            subnet_ids:
+              - subnet-123456
+            auto_scale:
+              headrooms:
+                - cpu_per_unit: 1000
+                  memory_per_unit: 2048
+                  num_of_units: 2
+          - name: legacy
+            state: absent
+      register: result
+    - debug: var=result
+"""
+RETURN = """
+---
+launch_specs:
+    type: list
+    returned: success
+    description:
+      - The reconciled launch specifications with the action taken for each one (created, updated, deleted or unchanged)
+    sample: [{"name": "gpu-workloads", "id": "ols-12345678", "action": "created"}]
+"""
+HAS_SPOTINST_SDK = False
+__metaclass__ = type
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
+
+try:
+    import spotinst_sdk as spotinst
+    from spotinst_sdk import SpotinstClientException
+
+    HAS_SPOTINST_SDK = True
+
+except ImportError:
+    pass
+
+LAUNCH_SPEC_URL = "https://api.spotinst.io/ocean/aws/k8s/launchSpec"
+
+launch_spec_fields = ('name',
+                      'image_id',
+                      'user_data',
+                      'security_group_ids',
+                      'subnet_ids',
+                      'iam_instance_profile',
+                      'instance_types',
+                      'root_volume_size',
+                      'associate_public_ip_address',
+                      'labels',
+                      'taints',
+                      'tags',
+                      'auto_scale',
+                      'resource_limits')
+
+
+# region Request Builder Functions
+def expand_launch_spec(ocean_id, launch_spec):
+    ocean_launch_spec = dict(ocean_id=ocean_id)
+
+    for field in launch_spec_fields:
+        if launch_spec.get(field) is not None:
+            ocean_launch_spec[field] = launch_spec.get(field)
+
+    return ocean_launch_spec
+
+
+def is_launch_spec_changed(desired_launch_spec, existing_launch_spec):
+    return not is_subset(desired_launch_spec, existing_launch_spec)
+
+
+def is_subset(desired, existing):
+    # the API returns every attribute of a launch spec, only the desired ones are compared
+    if isinstance(desired, dict):
+        if not isinstance(existing, dict):
+            return False
+
+        return all(is_subset(value, existing.get(key)) for key, value in desired.items())
+
+    if isinstance(desired, list):
+        if not isinstance(existing, list) or len(desired) != len(existing):
+            return False
+
+        return all(is_subset(desired_item, existing_item) for desired_item, existing_item in zip(desired, existing))
+
+    return desired == existing
+# endregion
+
+
+# region Util Functions
+def plan_launch_specs(ocean_id, launch_specs, existing_launch_specs, purge):
+    existing_by_name = dict((launch_spec.get('name'), launch_spec) for launch_spec in existing_launch_specs)
+    desired_names = set()
+    plan = []
+
+    for launch_spec in launch_specs:
+        name = launch_spec['name']
+        existing_launch_spec = existing_by_name.get(name)
+        desired_names.add(name)
+
+        if launch_spec.get('state', 'present') == 'absent':
+            if existing_launch_spec is not None:
+                plan.append(dict(action='deleted', name=name, id=existing_launch_spec['id']))
+            continue
+
+        request = expand_launch_spec(ocean_id=ocean_id, launch_spec=launch_spec)
+
+        if existing_launch_spec is None:
+            plan.append(dict(action='created', name=name, request=request))
+        elif is_launch_spec_changed(request, existing_launch_spec):
+            plan.append(dict(action='updated', name=name, id=existing_launch_spec['id'], request=request))
+        else:
+            plan.append(dict(action='unchanged', name=name, id=existing_launch_spec['id']))
+
+    if purge:
+        for name, existing_launch_spec in existing_by_name.items():
+            if name not in desired_names:
+                plan.append(dict(action='deleted', name=name, id=existing_launch_spec['id']))
+
+    return plan
+
+
+def apply_launch_spec(client, item):
+    if item['action'] == 'created':
+        launch_spec = create_launch_spec(client=client, launch_spec=item['request'])
+        item['id'] = launch_spec['id']
+    elif item['action'] == 'updated':
+        update_launch_spec(client=client, launch_spec_id=item['id'], launch_spec=item['request'])
+    elif item['action'] == 'deleted':
+        delete_launch_spec(client=client, launch_spec_id=item['id'])
+
+    return item
+
+
+def handle_launch_specs(client, module):
+    ocean_id = module.params.get('ocean_id')
+    launch_specs = module.params.get('launch_specs')
+    purge = module.params.get('purge')
+    max_workers = module.params.get('max_workers') or 1
+
+    for launch_spec in launch_specs:
+        if launch_spec.get('name') is None:
+            module.fail_json(msg="Every item of launch_specs must have a name")
+
+    existing_launch_specs = get_launch_specs(client=client, ocean_id=ocean_id)
+    plan = plan_launch_specs(ocean_id=ocean_id, launch_specs=launch_specs,
+                             existing_launch_specs=existing_launch_specs, purge=purge)
+    changes = [item for item in plan if item['action'] != 'unchanged']
+    errors = []
+
+    if not module.check_mode:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(item, executor.submit(apply_launch_spec, client, item)) for item in changes]
+
+            for item, future in futures:
+                try:
+                    future.result()
+                except SpotinstClientException as exc:
+                    item['error'] = str(exc)
+                    errors.append(item['name'])
+
+    for item in plan:
+        item.pop('request', None)
+
+    if errors:
+        module.fail_json(changed=len(changes) > len(errors), launch_specs=plan,
+                         msg="Failed reconciling launch specs: " + ", ".join(errors))
+
+    return plan, len(changes) > 0
+
+
+def get_client(module):
+    # Retrieve creds file variables
+    creds_file_loaded_vars = dict()
+
+    credentials_path = module.params.get('credentials_path')
+
+    if credentials_path is not None:
+        try:
+            with open(credentials_path, "r") as creds:
+                for line in creds:
+                    eq_index = line.find('=')
+                    var_name = line[:eq_index].strip()
+                    string_value = line[eq_index + 1:].strip()
+                    creds_file_loaded_vars[var_name] = string_value
+        except IOError:
+            pass
+    # End of creds file retrieval
+
+    token = module.params.get('token')
+    if not token:
+        token = creds_file_loaded_vars.get("token")
+
+    account = module.params.get('account_id')
+    if not account:
+        account = creds_file_loaded_vars.get("account")
+
+    client = spotinst.SpotinstClient(auth_token=token, print_output=False)
+
+    if account is not None:
+        client = spotinst.SpotinstClient(auth_token=token, account_id=account, print_output=False)
+
+    return client
+# endregion
+
+
+# region Request Functions
+def get_launch_specs(client, ocean_id):
+    response = client.send_get(
+        url=LAUNCH_SPEC_URL,
+        entity_name='ocean launch spec',
+        query_params=dict(oceanId=ocean_id))
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"]
+
+
+def create_launch_spec(client, launch_spec):
+    body = client.convert_json(dict(launch_spec=launch_spec), client.underscore_to_camel)
+
+    response = client.send_post(
+        body=json.dumps(body),
+        url=LAUNCH_SPEC_URL,
+        entity_name='ocean launch spec')
+
+    formatted_response = client.convert_json(response, client.camel_to_underscore)
+
+    return formatted_response["response"]["items"][0]
+
+
+def update_launch_spec(client, launch_spec_id, launch_spec):
+    body = client.convert_json(dict(launch_spec=launch_spec), client.underscore_to_camel)
+
+    client.send_put(
+        body=json.dumps(body),
+        url=LAUNCH_SPEC_URL + "/" + launch_spec_id,
+        entity_name='ocean launch spec')
+
+
+def delete_launch_spec(client, launch_spec_id):
+    client.send_delete(
+        url=LAUNCH_SPEC_URL + "/" + launch_spec_id,
+        entity_name='ocean launch spec')
+# endregion
+
+
+def main():
+    fields = dict(
+        account_id=dict(type='str', fallback=(env_fallback, ['SPOTINST_ACCOUNT_ID', 'ACCOUNT'])),
+        token=dict(type='str', fallback=(env_fallback, ['SPOTINST_TOKEN']), no_log=True),
+        credentials_path=dict(type='path', default="~/.spotinst/credentials"),
+
+        ocean_id=dict(type='str', required=True),
+        launch_specs=dict(type='list', elements='dict', required=True),
+        purge=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=10))
+
+    module = AnsibleModule(argument_spec=fields, supports_check_mode=True)
+
+    if not HAS_SPOTINST_SDK:
+        module.fail_json(msg="the Spotinst SDK library is required. (pip install spotinst_sdk)")
+
+    client = get_client(module=module)
+
+    launch_specs, has_changed = handle_launch_specs(client=client, module=module)
+
+    module.exit_json(changed=has_changed, launch_specs=launch_specs)
+
+
+if __name__ == '__main__':
+    main()
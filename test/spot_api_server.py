@@ -0,0 +1,469 @@
+"""
+Local stand-in for the Spot API endpoints used by the spotinst modules.
+
+Serves elastigroups (with their status, instance healthiness, scale, roll and detach calls),
+managed instances, EMR scalers (with their cluster and instances), Ocean clusters (with their
+nodes and rolls), Ocean launch specifications and event subscriptions from memory, with
+configurable latency, rate limit and fleet size, so the request flow of the modules can be
+exercised end to end without an account.
+
+The SDKs have the API host hard coded, `redirect_requests` sends their calls to the stand-in:
+
+    with SpotApiServer(fleet_size=3000, latency=0.05) as server, redirect_requests(server.url):
+        client = spotinst_sdk2.SpotinstSession(auth_token='token').client("elastigroup_aws")
+        client.get_elastigroups()
+
+Or as a standalone server:
+
+    python test/spot_api_server.py --port 8000 --latency 0.05 --rate-limit 50 --fleet-size 3000
+"""
+import argparse
+import copy
+import itertools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    raise ImportError("the Spot API stand-in requires python 3.7+")
+
+import requests
+
+SPOT_API_URL = "https://api.spotinst.io"
+
+# collection path, id prefix and response kind of every resource type
+RESOURCES = dict(
+    group=("/aws/ec2/group", "sig", "spotinst:aws:ec2:group"),
+    managed_instance=("/aws/ec2/managedInstance", "smi", "spotinst:aws:ec2:managedInstance"),
+    emr=("/aws/emr/mrScaler", "simrs", "spotinst:aws:emr:mrScaler"),
+    ocean=("/ocean/aws/k8s/cluster", "o", "spotinst:ocean:aws:k8s"),
+    launch_spec=("/ocean/aws/k8s/launchSpec", "ols", "spotinst:ocean:aws:k8s:launchSpec"),
+    subscription=("/events/subscription", "sis", "spotinst:events:subscription"))
+
+
+class SpotApiError(Exception):
+
+    def __init__(self, status, code, message):
+        super(SpotApiError, self).__init__(message)
+        self.status = status
+        self.code = code
+
+
+class SpotApiState(object):
+    """In-memory resources of the stand-in, safe to use from the handler threads"""
+
+    def __init__(self, provision_delay=0.0):
+        self.provision_delay = provision_delay
+        self.resources = dict((kind, dict()) for kind in RESOURCES)
+        self.rolls = dict()
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def new_id(self, prefix):
+        return "{0}-{1:08x}".format(prefix, next(self._ids))
+
+    def seed(self, fleet_size):
+        """Create fleet_size groups and a proportional number of the other resources"""
+        for index in range(fleet_size):
+            group = self.create("group", dict(
+                name="group-{0}".format(index),
+                capacity=dict(minimum=0, maximum=10, target=index % 4, unit="instance"),
+                compute=dict(availabilityZones=[dict(name="us-west-2a", subnetIds=["subnet-123456"])],
+                             instanceTypes=dict(ondemand="c5.large", spot=["c5.large", "m5.large"]),
+                             launchSpecification=dict(imageId="ami-123456", securityGroupIds=["sg-123456"]),
+                             product="Linux/UNIX"),
+                strategy=dict(risk=100, fallbackToOd=True)), ready=True)
+
+            if index % 10 == 0:
+                self.create("subscription", dict(resourceId=group["id"], protocol="web",
+                                                 endpoint="https://webhook.com", eventType="GROUP_UPDATED"))
+
+        for index in range(max(fleet_size // 10, 1) if fleet_size else 0):
+            ocean = self.create("ocean", dict(name="ocean-{0}".format(index), controllerClusterId="ocean-{0}".format(index),
+                                              capacity=dict(minimum=0, maximum=100, target=2)), ready=True)
+            self.create("launch_spec", dict(oceanId=ocean["id"], name="default", imageId="ami-123456"))
+            self.create("emr", dict(name="emr-{0}".format(index), compute=dict(instanceGroups=dict(
+                masterGroup=dict(target=1), coreGroup=dict(target=2)))), ready=True)
+            self.create("managed_instance", dict(name="mi-{0}".format(index), region="us-west-2"))
+
+    def create(self, kind, resource, ready=False):
+        now = time.time()
+        resource = copy.deepcopy(resource)
+
+        with self.lock:
+            resource["id"] = self.new_id(RESOURCES[kind][1])
+            resource["createdAt"] = resource["updatedAt"] = format_time(now)
+            resource["_readyAt"] = now if ready else now + self.provision_delay
+            self.resources[kind][resource["id"]] = resource
+
+        return resource
+
+    def get(self, kind, resource_id):
+        with self.lock:
+            resource = self.resources[kind].get(resource_id)
+
+        if resource is None:
+            raise SpotApiError(404, "NOT_FOUND", "{0} {1} does not exist".format(kind, resource_id))
+
+        return resource
+
+    def list(self, kind, **filters):
+        with self.lock:
+            resources = list(self.resources[kind].values())
+
+        return [resource for resource in resources
+                if all(resource.get(key) == value for key, value in filters.items())]
+
+    def update(self, kind, resource_id, changes):
+        resource = self.get(kind, resource_id)
+
+        with self.lock:
+            merge(resource, changes)
+            resource["updatedAt"] = format_time(time.time())
+            if "capacity" in changes:
+                resource["_readyAt"] = time.time() + self.provision_delay
+
+        return resource
+
+    def delete(self, kind, resource_id):
+        self.get(kind, resource_id)
+
+        with self.lock:
+            del self.resources[kind][resource_id]
+
+    def scale(self, group_id, adjustment):
+        group = self.get("group", group_id)
+        capacity = group.setdefault("capacity", dict())
+        target = min(max(capacity.get("target", 0) + adjustment, capacity.get("minimum", 0)),
+                     capacity.get("maximum", 1000))
+
+        return self.update("group", group_id, dict(capacity=dict(target=target)))
+
+    def group_instances(self, group_id):
+        group = self.get("group", group_id)
+        target = (group.get("capacity") or dict()).get("target") or 0
+        ready = time.time() >= group["_readyAt"]
+
+        instances = []
+        for index in range(target):
+            instance = dict(instanceId="i-{0}{1:04x}".format(group_id[4:], index),
+                            instanceType="c5.large", product="Linux/UNIX", availabilityZone="us-west-2a",
+                            status="fulfilled" if ready else "pending-evaluation", lifeCycle="SPOT")
+            if ready:
+                instance["privateIp"] = "10.0.{0}.{1}".format(index // 250, index % 250 + 1)
+            instances.append(instance)
+
+        return instances
+
+    def group_healthiness(self, group_id):
+        return [dict(instanceId=instance["instanceId"],
+                     healthStatus="HEALTHY" if "privateIp" in instance else "UNKNOWN")
+                for instance in self.group_instances(group_id)]
+
+    def emr_cluster(self, emr_id):
+        emr = self.get("emr", emr_id)
+        if time.time() < emr["_readyAt"]:
+            raise SpotApiError(400, "CLUSTER_NOT_FOUND", "EMR cluster of {0} is not created yet".format(emr_id))
+
+        return dict(id="j-" + emr_id[6:], name=emr.get("name"), status=dict(state="WAITING"))
+
+    def emr_instances(self, emr_id):
+        emr = self.get("emr", emr_id)
+        instance_groups = (emr.get("compute") or dict()).get("instanceGroups") or dict()
+        state = "RUNNING" if time.time() >= emr["_readyAt"] else "PROVISIONING"
+
+        instances = []
+        for group_type in ("master", "core", "task"):
+            instance_group = instance_groups.get(group_type + "Group") or dict()
+            target = instance_group.get("target") or (instance_group.get("capacity") or dict()).get("target") or 0
+
+            for index in range(target):
+                instances.append(dict(instanceId="i-{0}{1}{2:02x}".format(emr_id[6:], group_type[0], index),
+                                      instanceGroupType=group_type.upper(), status=dict(state=state)))
+
+        return instances
+
+    def ocean_nodes(self, ocean_id):
+        ocean = self.get("ocean", ocean_id)
+        target = (ocean.get("capacity") or dict()).get("target") or 0
+        launch_spec_ids = [launch_spec["id"] for launch_spec in self.list("launch_spec", oceanId=ocean_id)] or [None]
+
+        return [dict(instanceId="i-{0}{1:04x}".format(ocean_id[2:], index), instanceType="m5.large",
+                     lifeCycle="spot", launchSpecId=launch_spec_ids[index % len(launch_spec_ids)],
+                     privateIp="10.1.{0}.{1}".format(index // 250, index % 250 + 1),
+                     nodeName="ip-10-1-{0}-{1}".format(index // 250, index % 250 + 1))
+                for index in range(target)]
+
+    def start_ocean_roll(self, ocean_id, roll):
+        self.get("ocean", ocean_id)
+        batch_size = roll.get("batchSizePercentage") or 20
+        roll = dict(id=self.new_id("scr"), oceanId=ocean_id, startedAt=time.time(),
+                    numOfBatches=max(int(100 / batch_size), 1))
+
+        with self.lock:
+            self.rolls[roll["id"]] = roll
+
+        return self.ocean_roll(ocean_id, roll["id"])
+
+    def ocean_roll(self, ocean_id, roll_id):
+        roll = self.rolls.get(roll_id)
+        if roll is None or roll["oceanId"] != ocean_id:
+            raise SpotApiError(404, "NOT_FOUND", "roll {0} does not exist".format(roll_id))
+
+        # every batch takes provision_delay seconds
+        elapsed_batches = int((time.time() - roll["startedAt"]) / self.provision_delay) \
+            if self.provision_delay else roll["numOfBatches"]
+        current_batch = min(elapsed_batches + 1, roll["numOfBatches"])
+        status = "COMPLETED" if elapsed_batches >= roll["numOfBatches"] else "IN_PROGRESS"
+
+        return dict(id=roll_id, status=status, currentBatch=current_batch, numOfBatches=roll["numOfBatches"],
+                    progress=dict(unit="percent", value=100 * min(elapsed_batches, roll["numOfBatches"]) //
+                                  roll["numOfBatches"]))
+
+
+class SpotApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering like the Spot API, started in the background by start()"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, rate_limit=None, fleet_size=0, provision_delay=0.0):
+        ThreadingHTTPServer.__init__(self, (host, port), SpotApiHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.state = SpotApiState(provision_delay=provision_delay)
+        self.state.seed(fleet_size)
+        self.request_count = 0
+        self.throttled_count = 0
+        self._window = []
+        self._window_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://{0}:{1}".format(*self.server_address[:2])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="spot-api-server")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def admit(self):
+        """Count the request, False when it exceeds rate_limit requests in the last second"""
+        now = time.time()
+
+        with self._window_lock:
+            self.request_count += 1
+
+            if self.rate_limit is None:
+                return True
+
+            self._window = [timestamp for timestamp in self._window if now - timestamp < 1.0]
+            if len(self._window) >= self.rate_limit:
+                self.throttled_count += 1
+                return False
+
+            self._window.append(now)
+            return True
+
+
+class SpotApiHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = (
+        ("GET", r"/aws/ec2/group/(?P<id>[^/]+)/status", lambda state, match, query, body:
+            state.group_instances(match["id"])),
+        ("GET", r"/aws/ec2/group/(?P<id>[^/]+)/instanceHealthiness", lambda state, match, query, body:
+            state.group_healthiness(match["id"])),
+        ("PUT", r"/aws/ec2/group/(?P<id>[^/]+)/scale/up", lambda state, match, query, body:
+            [state.scale(match["id"], int(query.get("adjustment", 1)))]),
+        ("PUT", r"/aws/ec2/group/(?P<id>[^/]+)/scale/down", lambda state, match, query, body:
+            [state.scale(match["id"], -int(query.get("adjustment", 1)))]),
+        ("PUT", r"/aws/ec2/group/(?P<id>[^/]+)/roll", lambda state, match, query, body:
+            [dict(id=state.new_id("sbgd"), groupId=state.get("group", match["id"])["id"], status="STARTING")]),
+        ("PUT", r"/aws/ec2/group/(?P<id>[^/]+)/detachInstances", lambda state, match, query, body:
+            [state.scale(match["id"], -len((body.get("instancesToDetach") or [])))
+             if body.get("shouldDecrementTargetCapacity") else state.get("group", match["id"])]),
+        ("GET", r"/aws/emr/mrScaler/(?P<id>[^/]+)/cluster", lambda state, match, query, body:
+            [state.emr_cluster(match["id"])]),
+        ("GET", r"/aws/emr/mrScaler/(?P<id>[^/]+)/instance", lambda state, match, query, body:
+            state.emr_instances(match["id"])),
+        ("GET", r"/ocean/aws/k8s/cluster/(?P<id>[^/]+)/nodes", lambda state, match, query, body:
+            state.ocean_nodes(match["id"])),
+        ("POST", r"/ocean/aws/k8s/cluster/(?P<id>[^/]+)/roll", lambda state, match, query, body:
+            [state.start_ocean_roll(match["id"], body.get("roll") or dict())]),
+        ("GET", r"/ocean/aws/k8s/cluster/(?P<id>[^/]+)/roll/(?P<roll_id>[^/]+)", lambda state, match, query, body:
+            [state.ocean_roll(match["id"], match["roll_id"])]),
+    )
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_method("GET")
+
+    def do_POST(self):
+        self.handle_method("POST")
+
+    def do_PUT(self):
+        self.handle_method("PUT")
+
+    def do_DELETE(self):
+        self.handle_method("DELETE")
+
+    def handle_method(self, method):
+        parsed_url = urlparse(self.path)
+        query = dict((key, values[0]) for key, values in parse_qs(parsed_url.query).items())
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length).decode("utf-8")) if length else dict()
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if not self.server.admit():
+            return self.send_error_response(SpotApiError(429, "TOO_MANY_REQUESTS", "Rate limit exceeded"))
+
+        try:
+            kind, items = self.dispatch(method, parsed_url.path.rstrip("/"), query, body or dict())
+        except SpotApiError as exc:
+            return self.send_error_response(exc)
+
+        self.send_json(200, dict(
+            request=dict(id=self.server.state.new_id("req"), url=self.path, method=method, timestamp=format_time()),
+            response=dict(status=dict(code=200, message="OK"), kind=kind, count=len(items),
+                          items=[strip_private(item) for item in items])))
+
+    def dispatch(self, method, path, query, body):
+        for route_method, pattern, handler in self.ROUTES:
+            match = re.match(pattern + "$", path)
+            if route_method == method and match:
+                return None, handler(self.server.state, match.groupdict(), query, body)
+
+        state = self.server.state
+
+        for kind, (collection_path, _, response_kind) in RESOURCES.items():
+            if path == collection_path:
+                if method == "GET":
+                    filters = dict(oceanId=query["oceanId"]) if "oceanId" in query else dict()
+                    return response_kind, [listing_item(kind, resource) for resource in state.list(kind, **filters)]
+                if method == "POST":
+                    return response_kind, [state.create(kind, unwrap(body))]
+
+            elif path.startswith(collection_path + "/") and "/" not in path[len(collection_path) + 1:]:
+                resource_id = path[len(collection_path) + 1:]
+                if method == "GET":
+                    return response_kind, [state.get(kind, resource_id)]
+                if method == "PUT":
+                    return response_kind, [state.update(kind, resource_id, unwrap(body))]
+                if method == "DELETE":
+                    state.delete(kind, resource_id)
+                    return response_kind, []
+
+        raise SpotApiError(404, "NOT_FOUND", "{0} {1} is not supported by the stand-in".format(method, path))
+
+    def send_error_response(self, exc):
+        self.send_json(exc.status, dict(response=dict(
+            status=dict(code=exc.status), errors=[dict(code=exc.code, message=str(exc))])))
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@contextmanager
+def redirect_requests(server_url, api_url=SPOT_API_URL):
+    """Send every request the SDKs make to api_url to server_url instead"""
+    original_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        if url.startswith(api_url):
+            url = server_url + url[len(api_url):]
+        return original_request(session, method, url, *args, **kwargs)
+
+    requests.Session.request = request
+    try:
+        yield
+    finally:
+        requests.Session.request = original_request
+
+
+def listing_item(kind, resource):
+    # the managed instance listing holds the configuration of every instance under config
+    if kind == "managed_instance":
+        return dict(id=resource["id"], config=strip_private(resource))
+
+    return resource
+
+
+def unwrap(body):
+    # create and update bodies hold the resource under a single key, e.g. {"group": {...}}
+    if len(body) == 1:
+        value = next(iter(body.values()))
+        if isinstance(value, dict):
+            return value
+
+    return body
+
+
+def merge(target, changes):
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def strip_private(item):
+    return dict((key, value) for key, value in item.items() if not key.startswith("_"))
+
+
+def format_time(timestamp=None):
+    timestamp = time.time() if timestamp is None else timestamp
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + ".{0:03d}Z".format(int(timestamp * 1000) % 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=None, help="requests per second before 429 responses")
+    parser.add_argument("--fleet-size", type=int, default=0, help="number of groups to create on start")
+    parser.add_argument("--provision-delay", type=float, default=0.0,
+                        help="seconds until new instances, EMR clusters and roll batches are ready")
+    args = parser.parse_args()
+
+    server = SpotApiServer(host=args.host, port=args.port, latency=args.latency, rate_limit=args.rate_limit,
+                           fleet_size=args.fleet_size, provision_delay=args.provision_delay)
+    print("Spot API stand-in listening on {0}".format(server.url))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
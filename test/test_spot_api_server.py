@@ -0,0 +1,230 @@
+import unittest
+import sys
+from mock import patch
+
+# the other tests replace spotinst_sdk with a mock, the end to end tests need the real SDK
+mocked_sdk = sys.modules.pop('spotinst_sdk', None)
+import spotinst_sdk
+if mocked_sdk is not None:
+    sys.modules['spotinst_sdk'] = mocked_sdk
+
+from spotinst_sdk2 import SpotinstSession
+from spotinst_sdk2.client import SpotinstClientException
+
+from ansible.modules.cloud.spotinst import spotinst_aws_elastigroup, spotinst_aws_managed_instance, \
+    spotinst_mrscaler, spotinst_ocean_cloud
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup import find_group_with_same_name, \
+    retrieve_group_instances
+from ansible.modules.cloud.spotinst.spotinst_ocean_cloud import start_roll, wait_for_roll
+from test.spot_api_server import SpotApiServer, redirect_requests
+
+
+class MockModule:
+
+    def __init__(self, input_dict):
+        self.params = input_dict
+        self.custom_params = input_dict
+
+    def debug(self, msg):
+        pass
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs.get('msg'))
+
+
+def use_sdk(module):
+    # the module keeps the SDK it was first imported with, which may be the mock
+    return patch.multiple(module, spotinst=spotinst_sdk, SpotinstClientException=spotinst_sdk.SpotinstClientException)
+
+
+class TestSpotApiServer(unittest.TestCase):
+    """End to end requests of the modules against the local Spot API stand-in"""
+
+    def test_elastigroup_request_flow(self):
+        with SpotApiServer(fleet_size=50) as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            groups = client.get_elastigroups()
+            self.assertEqual(50, len(groups))
+
+            is_new, group_id = find_group_with_same_name(groups=groups, name="group-7")
+            self.assertFalse(is_new)
+
+            client.scale_elastigroup_up(group_id=group_id, adjustment=2)
+
+            module = MockModule(input_dict=dict(wait_for_instances=True, wait_timeout=60, target=5,
+                                                state='present', health_check_type=None))
+            with patch('time.sleep'):
+                instances = retrieve_group_instances(client=client, module=module, group_id=group_id)
+
+            self.assertEqual(5, len(instances))
+            self.assertTrue(all(instance['private_ip'] for instance in instances))
+
+            module.params['health_check_type'] = 'ELB'
+            with patch('time.sleep') as sleep:
+                instances = retrieve_group_instances(client=client, module=module, group_id=group_id)
+
+            self.assertEqual(5, len(instances))
+            self.assertFalse(sleep.called)
+
+    def test_handle_elastigroup(self):
+        """Create, update and delete a group with the params of spotinst_aws_elastigroup"""
+
+        params = dict(name="web", state="present", uniqueness_by="name", min_size=0, max_size=4, target=2,
+                      product="Linux/UNIX", image_id="ami-123456", security_group_ids=["sg-123456"],
+                      spot_instance_types=["c5.large", "m5.large"], on_demand_instance_type="c5.large",
+                      availability_vs_cost="balanced",
+                      availability_zones=[dict(name="us-west-2a", subnet_id="subnet-123456")],
+                      target_group_arns=["arn:aws:elasticloadbalancing:us-west-2:123456789012:targetgroup/web/1"])
+
+        with SpotApiServer(fleet_size=5) as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            group_id, message, has_changed = spotinst_aws_elastigroup.handle_elastigroup(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual('Created group Successfully.', message)
+            group = server.state.get("group", group_id)
+            self.assertEqual(dict(minimum=0, maximum=4, target=2), group["capacity"])
+            self.assertEqual(["c5.large", "m5.large"], group["compute"]["instanceTypes"]["spot"])
+            self.assertEqual("TARGET_GROUP",
+                             group["compute"]["launchSpecification"]["loadBalancersConfig"]["loadBalancers"][0]["type"])
+
+            params.update(target=3, image_id="ami-654321")
+            updated_id, message, has_changed = spotinst_aws_elastigroup.handle_elastigroup(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual(group_id, updated_id)
+            self.assertEqual('Updated group successfully.', message)
+            self.assertEqual(3, group["capacity"]["target"])
+            self.assertEqual("ami-654321", group["compute"]["launchSpecification"]["imageId"])
+
+            params['state'] = 'absent'
+            spotinst_aws_elastigroup.handle_elastigroup(client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual(5, len(server.state.list("group")))
+            self.assertFalse(any(group["name"] == "web" for group in server.state.list("group")))
+
+    def test_handle_ocean(self):
+        """Create, update and delete a cluster with the params of spotinst_ocean_cloud"""
+
+        params = dict(name="ocean", state="present", uniqueness_by="name", controller_cluster_id="ocean",
+                      region="us-west-2", capacity=dict(minimum=0, maximum=10, target=2),
+                      compute=dict(subnet_ids=["subnet-123456"],
+                                   launch_specification=dict(image_id="ami-123456", security_group_ids=["sg-123456"])))
+
+        with SpotApiServer() as server, redirect_requests(server.url), use_sdk(spotinst_ocean_cloud):
+            client = spotinst_sdk.SpotinstClient(auth_token="token", print_output=False)
+
+            ocean_id, message, has_changed, roll = spotinst_ocean_cloud.handle_ocean(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual('Created Ocean Cluster successfully', message)
+            ocean = server.state.get("ocean", ocean_id)
+            self.assertEqual("ocean", ocean["controllerClusterId"])
+            self.assertEqual(["subnet-123456"], ocean["compute"]["subnetIds"])
+
+            params['capacity']['target'] = 5
+            params['roll_config'] = dict(batch_size_percentage=50, wait=True, wait_timeout=60)
+            updated_id, message, has_changed, roll = spotinst_ocean_cloud.handle_ocean(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual(ocean_id, updated_id)
+            self.assertEqual('Updated and rolled the Ocean Cluster successfully', message)
+            self.assertEqual(5, ocean["capacity"]["target"])
+            self.assertEqual('COMPLETED', roll['status'])
+
+            params['state'] = 'absent'
+            spotinst_ocean_cloud.handle_ocean(client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual([], server.state.list("ocean"))
+
+    def test_handle_emr(self):
+        """Create and wait for, update and delete a cluster with the params of spotinst_mrscaler"""
+
+        params = dict(name="emr", state="present", uniqueness_by="name", wait=True, wait_timeout=60,
+                      strategy=dict(new=dict(release_label="emr-5.17.0")),
+                      compute=dict(instance_groups=dict(
+                          master_group=dict(target=1, life_cycle="SPOT", instance_types=["m5.xlarge"]),
+                          core_group=dict(target=2, life_cycle="SPOT", instance_types=["m5.xlarge"]))))
+
+        with SpotApiServer() as server, redirect_requests(server.url), use_sdk(spotinst_mrscaler), \
+                patch('time.sleep'):
+            client = spotinst_sdk.SpotinstClient(auth_token="token", print_output=False)
+
+            emr_id, message, has_changed, cluster = spotinst_mrscaler.handle_emr(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual('Created EMR Cluster Successfully and it is running.', message)
+            self.assertEqual(dict(MASTER=dict(target=1, running=1), CORE=dict(target=2, running=2)),
+                             cluster['instance_groups'])
+            self.assertEqual("emr-5.17.0", server.state.get("emr", emr_id)["strategy"]["new"]["releaseLabel"])
+
+            params['compute']['instance_groups']['core_group']['capacity'] = dict(minimum=1, maximum=4, target=3)
+            updated_id, message, has_changed, cluster = spotinst_mrscaler.handle_emr(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual(emr_id, updated_id)
+            self.assertEqual('Updated EMR Cluster successfully.', message)
+            self.assertEqual(dict(minimum=1, maximum=4, target=3),
+                             server.state.get("emr", emr_id)["compute"]["instanceGroups"]["coreGroup"]["capacity"])
+
+            params['state'] = 'absent'
+            spotinst_mrscaler.handle_emr(client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual([], server.state.list("emr"))
+
+    def test_handle_managed_instance(self):
+        """Create, update and delete an instance with the params of spotinst_aws_managed_instance"""
+
+        params = dict(state="present", uniqueness_by="name", managed_instance=dict(
+            name="mi", region="us-west-2", strategy=dict(life_cycle="spot"),
+            compute=dict(product="Linux/UNIX", subnet_ids=["subnet-123456"], vpc_id="vpc-123456",
+                         launch_specification=dict(image_id="ami-123456", security_group_ids=["sg-123456"],
+                                                   instance_types=dict(types=["t3.micro", "t3.small"],
+                                                                       preferred_type="t3.micro")))))
+
+        with SpotApiServer() as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("managed_instance_aws")
+
+            mi_id, message, has_changed = spotinst_aws_managed_instance.handle_managed_instance(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual("Managed instance created successfully", message)
+            managed_instance = server.state.get("managed_instance", mi_id)
+            self.assertEqual(["t3.micro", "t3.small"],
+                             managed_instance["compute"]["launchSpecification"]["instanceTypes"]["types"])
+
+            params['managed_instance']['compute']['launch_specification']['image_id'] = "ami-654321"
+            params['do_not_update'] = ["compute.product"]
+            updated_id, message, has_changed = spotinst_aws_managed_instance.handle_managed_instance(
+                client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual(mi_id, updated_id)
+            self.assertEqual("Managed instance updated successfully", message)
+            self.assertEqual("ami-654321", managed_instance["compute"]["launchSpecification"]["imageId"])
+
+            params['state'] = 'absent'
+            spotinst_aws_managed_instance.handle_managed_instance(client=client, module=MockModule(input_dict=params))
+
+            self.assertEqual([], server.state.list("managed_instance"))
+
+    def test_rate_limit(self):
+        with SpotApiServer(fleet_size=1, rate_limit=2) as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            client.get_elastigroups()
+            client.get_elastigroups()
+            self.assertRaises(SpotinstClientException, client.get_elastigroups)
+            self.assertEqual(1, server.throttled_count)
+
+    def test_ocean_roll(self):
+        with SpotApiServer(fleet_size=10) as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+            ocean_id = server.state.list("ocean")[0]["id"]
+
+            roll = start_roll(client=client, ocean_id=ocean_id, roll_config=dict(batch_size_percentage=50))
+            roll = wait_for_roll(client=client, ocean_id=ocean_id, roll=roll, wait_timeout=60)
+
+            self.assertEqual('COMPLETED', roll['status'])
+            self.assertEqual(2, roll['num_of_batches'])
@@ -3,7 +3,9 @@ import sys
 from mock import MagicMock
 sys.modules['spotinst_sdk'] = MagicMock()
 
-from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup import expand_elastigroup
+from ansible.modules.cloud.spotinst import spotinst_aws_elastigroup
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup import expand_elastigroup, validate_nested_params, \
+    omit_unchanged_scripts, expand_fields, FieldMap
 
 
 class MockModule:
@@ -27,6 +29,7 @@ class TestSpotinstAwsElastigroup(unittest.TestCase):
             image_id="test_id",
             health_check_grace_period=0,
             ebs_optimized=True,
+            spot_instance_types=["c5.large", "m5.large"],
             elastic_beanstalk=dict(
                 managed_actions=dict(
                     platform_update=dict(
@@ -55,6 +58,10 @@ class TestSpotinstAwsElastigroup(unittest.TestCase):
         self.assertEqual("test_id", actual_eg.compute.launch_specification.image_id)
         self.assertEqual(0, actual_eg.compute.launch_specification.health_check_grace_period)
         self.assertEqual(True, actual_eg.compute.launch_specification.ebs_optimized)
+        self.assertEqual(["c5.large", "m5.large"], actual_eg.compute.instance_types.spot)
+        # left unset, not sent as null
+        self.assertEqual(spotinst_aws_elastigroup.spotinst.models.elastigroup.aws.InstanceTypes().ondemand,
+                         actual_eg.compute.instance_types.ondemand)
 
         self.assertEqual(
             "test_perform_at", actual_eg.third_parties_integration.elastic_beanstalk.managed_actions.platform_update.perform_at)
@@ -69,3 +76,75 @@ class TestSpotinstAwsElastigroup(unittest.TestCase):
             100, actual_eg.third_parties_integration.elastic_beanstalk.deployment_preferences.batch_size_percentage)
         self.assertEqual(
             True, actual_eg.third_parties_integration.elastic_beanstalk.deployment_preferences.automatic_roll)
+
+    def test_validate_nested_params(self):
+        """Report the unsupported keys and wrong types of the nested params"""
+
+        params = dict(
+            name="test_name",
+            ecs=dict(cluster_name="test_cluster", auto_scale=dict(is_enabled=True, headroom=dict(cpu_per_unit=1),
+                                                                  down=dict(evaluation_period=3))),
+            network_interfaces=[dict(device_index=0, private_ip_addresses=[dict(private_ip_address="10.0.0.1",
+                                                                                primary=True)])],
+            scheduled_tasks=[dict(task_type="scale", cron_expresion="0 1 * * *")],
+            block_device_mappings=dict(device_name="/dev/xvda"),
+            kubernetes=None)
+
+        self.assertEqual(
+            ["block_device_mappings must be a list",
+             "ecs.auto_scale.down has unsupported keys evaluation_period, supported keys are evaluation_periods",
+             "scheduled_tasks[0] has unsupported keys cron_expresion, supported keys are adjustment, "
+             "adjustment_percentage, batch_size_percentage, cron_expression, frequency, grace_period, is_enabled, "
+             "scale_max_capacity, scale_min_capacity, scale_target_capacity, start_time, task_type"],
+            validate_nested_params(params))
+
+        self.assertEqual([], validate_nested_params(dict(network_interfaces=params['network_interfaces'])))
+
+    def test_omit_unchanged_scripts(self):
+        """Leave the scripts the group already has out of the update"""
+
+        module = MockModule(input_dict=dict(
+            name="test_name",
+            image_id="test_id",
+            user_data="IyEvYmluL2Jhc2gKZWNobyBoZWxsbwo=",
+            shutdown_script="IyEvYmluL2Jhc2gKZWNobyBieWUK"))
+        eg = expand_elastigroup(module=module, is_update=True)
+
+        groups = [dict(id="sig-1", compute=dict(launch_specification=dict(
+            user_data="IyEvYmluL2Jhc2gKZWNo\nbyBoZWxsbwo=",
+            shutdown_script="IyEvYmluL2Jhc2gKZWNobyBzZWUgeW91Cg==")))]
+        client = MagicMock()
+
+        omit_unchanged_scripts(client=client, module=module, eg=eg, groups=groups, group_id="sig-1")
+
+        self.assertNotIn('user_data', vars(eg.compute.launch_specification))
+        self.assertEqual("IyEvYmluL2Jhc2gKZWNobyBieWUK", eg.compute.launch_specification.shutdown_script)
+        client.get_elastigroup.assert_not_called()
+
+    def test_field_maps_round_trip(self):
+        """Every field of every table is set on its SDK model"""
+
+        field_maps = [value for value in vars(spotinst_aws_elastigroup).values() if isinstance(value, FieldMap)]
+        self.assertTrue(len(field_maps) > 50)
+
+        for field_map in field_maps:
+            item = dict((ansible_field_name, "value_" + ansible_field_name)
+                        for ansible_field_name in field_map.ansible_field_names)
+
+            expanded = expand_fields(field_map, item)
+
+            self.assertIsInstance(expanded, field_map.model)
+            for ansible_field_name, spotinst_field_name in field_map.pairs:
+                self.assertEqual(item[ansible_field_name], getattr(expanded, spotinst_field_name),
+                                 field_map.class_name + "." + spotinst_field_name)
+
+    def test_malformed_field_maps(self):
+        """Reject tables with invalid or duplicate fields and unknown models"""
+
+        for class_name, fields in (('Capacity', (('minimum', 'maximum'),)),
+                                   ('Capacity', (dict(ansible_field_name='min_size'),)),
+                                   ('Capacity', ('target', 'target')),
+                                   ('Capacity', ('',)),
+                                   ('NoSuchModel', ('target',))):
+            with self.assertRaises(ValueError):
+                FieldMap(class_name, *fields)
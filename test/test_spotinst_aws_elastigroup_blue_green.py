@@ -0,0 +1,117 @@
+import unittest
+
+from mock import patch
+from spotinst_sdk2 import SpotinstSession
+
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_blue_green import get_green_name, handle_blue_green
+from test.spot_api_server import SpotApiServer, redirect_requests
+
+TARGET_GROUP_ARN = "arn:aws:elasticloadbalancing:us-west-2:123456789012:targetgroup/web/73e2d6bc24d8a067"
+
+
+class ModuleFailed(Exception):
+    pass
+
+
+class MockModule:
+
+    def __init__(self, input_dict, check_mode=False):
+        self.params = input_dict
+        self.check_mode = check_mode
+
+    def fail_json(self, msg, **kwargs):
+        raise ModuleFailed(msg)
+
+
+class TestSpotinstAwsElastigroupBlueGreen(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_blue_green module"""
+
+    def test_green_name(self):
+        """Alternate between two names by default, for deployments deleting the blue group"""
+
+        self.assertEqual("web-green", get_green_name("web", None))
+        self.assertEqual("web", get_green_name("web-green", None))
+        self.assertEqual("web-v2", get_green_name("web", "web-v2"))
+
+    def test_blue_green(self):
+        """Clone the group, move one of its load balancers and scale the blue group down"""
+
+        with SpotApiServer(fleet_size=2) as server, redirect_requests(server.url), patch("time.sleep"):
+            blue = server.state.list("group", name="group-1")[0]
+            server.state.update("group", blue["id"], dict(compute=dict(launchSpecification=dict(
+                loadBalancersConfig=dict(loadBalancers=[dict(arn=TARGET_GROUP_ARN, type="TARGET_GROUP"),
+                                                        dict(name="legacy", type="CLASSIC")])))))
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            module = MockModule(dict(id=None, name="group-1", green_name="group-1-v2", image_id="ami-654321",
+                                     load_balancers=None, target_group_arns=[TARGET_GROUP_ARN], health_check=True,
+                                     wait_timeout=60, blue_action="scale_down"))
+            result = handle_blue_green(client=client, module=module)
+
+            self.assertEqual(["clone", "wait", "swap", "retire"], [phase['name'] for phase in result['phases']])
+            self.assertEqual(1, len(result['instances']))
+
+            green = server.state.get("group", result['green_group_id'])
+            self.assertEqual("group-1-v2", green["name"])
+            self.assertEqual("ami-654321", green["compute"]["launchSpecification"]["imageId"])
+            self.assertEqual([dict(arn=TARGET_GROUP_ARN, type="TARGET_GROUP")],
+                             green["compute"]["launchSpecification"]["loadBalancersConfig"]["loadBalancers"])
+            self.assertEqual(["c5.large", "m5.large"], green["compute"]["instanceTypes"]["spot"])
+
+            blue = server.state.get("group", blue["id"])
+            self.assertEqual(0, blue["capacity"]["target"])
+            self.assertEqual([dict(name="legacy", type="CLASSIC")],
+                             blue["compute"]["launchSpecification"]["loadBalancersConfig"]["loadBalancers"])
+
+            with self.assertRaises(ModuleFailed) as context:
+                handle_blue_green(client=client, module=module)
+
+            self.assertEqual("Group group-1-v2 already exists, delete it or set another green_name",
+                             str(context.exception))
+
+    def test_green_name_required(self):
+        """The blue group keeps its name unless it is deleted"""
+
+        module = MockModule(dict(id=None, name="group-1", green_name=None, image_id="ami-654321",
+                                 load_balancers=None, target_group_arns=None, health_check=False,
+                                 wait_timeout=60, blue_action="scale_down"))
+
+        with self.assertRaises(ModuleFailed) as context:
+            handle_blue_green(client=None, module=module)
+
+        self.assertEqual("green_name is required unless blue_action is delete, the blue group keeps its name",
+                         str(context.exception))
+
+    def test_alternate_names(self):
+        """Deployments deleting the blue group alternate between two names"""
+
+        with SpotApiServer(fleet_size=2) as server, redirect_requests(server.url), patch("time.sleep"):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            for name, green_name in (("group-1", "group-1-green"), ("group-1-green", "group-1")):
+                module = MockModule(dict(id=None, name=name, green_name=None, image_id="ami-654321",
+                                         load_balancers=None, target_group_arns=None, health_check=False,
+                                         wait_timeout=60, blue_action="delete"))
+                result = handle_blue_green(client=client, module=module)
+
+                self.assertEqual(green_name, result['green_name'])
+                self.assertEqual(["group-0", green_name], sorted(group["name"] for group in server.state.list("group")))
+
+    def test_ambiguous_name(self):
+        """Fail instead of cloning one of the groups with the same name"""
+
+        with SpotApiServer(fleet_size=2) as server, redirect_requests(server.url):
+            duplicate = server.state.create("group", dict(name="group-1"), ready=True)
+            blue = server.state.list("group", name="group-1")[0]
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+
+            module = MockModule(dict(id=None, name="group-1", green_name=None, image_id="ami-654321",
+                                     load_balancers=None, target_group_arns=None, health_check=False,
+                                     wait_timeout=60, blue_action="delete"))
+
+            with self.assertRaises(ModuleFailed) as context:
+                handle_blue_green(client=client, module=module)
+
+            self.assertEqual("Several groups have the name group-1 ({0}, {1}), use id to select one".format(
+                blue["id"], duplicate["id"]), str(context.exception))
+            self.assertEqual(3, len(server.state.list("group")))
@@ -0,0 +1,65 @@
+import unittest
+
+from spotinst_sdk2 import SpotinstSession
+
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_compute_patch import get_compute_changes, \
+    patch_groups, select_groups
+from test.spot_api_server import SpotApiServer, redirect_requests
+
+
+class TestSpotinstAwsElastigroupComputePatch(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_compute_patch module"""
+
+    def test_compute_changes(self):
+        """Send only the compute fields that change"""
+
+        group = dict(id="sig-1", name="web-1", compute=dict(
+            instance_types=dict(ondemand="c5.large", spot=["c4.large", "c5.large"], preferred_spot=["c4.large"]),
+            availability_zones=[dict(name="us-west-2a", subnet_id="subnet-1")]))
+
+        changes, report = get_compute_changes(group, ["c6i.large", "c5.large"], ["c4.large"],
+                                              [dict(name="us-west-2a", subnet_ids=["subnet-1", "subnet-2"]),
+                                               dict(name="us-west-2b", subnet_id="subnet-3")])
+
+        self.assertEqual(dict(
+            instance_types=dict(spot=["c5.large", "c6i.large"], preferred_spot=None),
+            availability_zones=[dict(name="us-west-2a", subnet_ids=["subnet-1", "subnet-2"]),
+                                dict(name="us-west-2b", subnet_ids=["subnet-3"])]), changes)
+        self.assertEqual(dict(id="sig-1", name="web-1", status="patched", added_spot_instance_types=["c6i.large"],
+                              removed_spot_instance_types=["c4.large"],
+                              added_subnet_ids={"us-west-2a": ["subnet-2"], "us-west-2b": ["subnet-3"]}), report)
+
+        changes, report = get_compute_changes(group, ["c5.large"], [], [dict(name="us-west-2a", subnet_id="subnet-1")])
+        self.assertIsNone(changes)
+        self.assertEqual("unchanged", report['status'])
+
+        changes, report = get_compute_changes(group, [], ["c4.large", "c5.large"], [])
+        self.assertEqual("failed", report['status'])
+
+    def test_patch_groups(self):
+        """Patch the selected groups in parallel, nothing is sent in check mode"""
+
+        with SpotApiServer(fleet_size=12) as server, redirect_requests(server.url):
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+            groups = select_groups(client.get_elastigroups(), group_ids=[], name_patterns=["group-1*"])
+            self.assertEqual(["group-1", "group-10", "group-11"], sorted(group['name'] for group in groups))
+
+            reports, summary = patch_groups(client=client, groups=groups, add_spot_instance_types=["c6i.large"],
+                                            remove_spot_instance_types=[], add_availability_zones=[],
+                                            max_workers=4, check_mode=True)
+            self.assertEqual(dict(patched=3, unchanged=0, failed=0), summary)
+            self.assertEqual(["c5.large", "m5.large"],
+                             server.state.list("group", name="group-1")[0]["compute"]["instanceTypes"]["spot"])
+
+            reports, summary = patch_groups(client=client, groups=groups, add_spot_instance_types=["c6i.large"],
+                                            remove_spot_instance_types=[], add_availability_zones=[
+                                                dict(name="us-west-2b", subnet_id="subnet-654321")],
+                                            max_workers=4, check_mode=False)
+            self.assertEqual(dict(patched=3, unchanged=0, failed=0), summary)
+
+            compute = server.state.list("group", name="group-1")[0]["compute"]
+            self.assertEqual(["c5.large", "m5.large", "c6i.large"], compute["instanceTypes"]["spot"])
+            self.assertEqual("c5.large", compute["instanceTypes"]["ondemand"])
+            self.assertEqual(["us-west-2a", "us-west-2b"], [zone["name"] for zone in compute["availabilityZones"]])
+            untouched_zones = server.state.list("group", name="group-2")[0]["compute"]["availabilityZones"]
+            self.assertEqual([dict(name="us-west-2a", subnetIds=["subnet-123456"])], untouched_zones)
@@ -0,0 +1,88 @@
+import unittest
+
+from mock import MagicMock, patch
+from spotinst_sdk2.client import SpotinstClientException
+
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_delete import delete_groups, get_groups, \
+    get_stateful_deallocation
+
+
+def missing_group(*args, **kwargs):
+    raise SpotinstClientException("Client Error", '{"code": "GROUP_DOESNT_EXIST"}')
+
+
+class TestSpotinstAwsElastigroupDelete(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_delete module"""
+
+    def test_stateful_deallocation(self):
+        """Deallocate only when something is deleted with the groups"""
+
+        self.assertIsNone(get_stateful_deallocation(dict(stateful_deallocation_should_delete_volumes=False)))
+
+        deallocation = get_stateful_deallocation(dict(stateful_deallocation_should_delete_volumes=True))
+        self.assertTrue(deallocation.should_delete_volumes)
+        self.assertIsNone(deallocation.should_delete_images)
+
+    @patch("time.sleep")
+    def test_delete_groups(self, sleep):
+        """Poll the groups together until they are gone, with a growing interval"""
+
+        polls = dict()
+
+        def get_stateful_instances(group_id):
+            polls[group_id] = polls.get(group_id, 0) + 1
+            if group_id == "sig-1" and polls[group_id] < 3:
+                return [dict(id="ssi-1", instance_id="i-1", state="DEALLOCATING")]
+            missing_group()
+
+        client = MagicMock()
+        client.delete_elastigroup.side_effect = lambda group_id: missing_group() if group_id == "sig-3" else None
+        client.get_stateful_instances.side_effect = get_stateful_instances
+
+        groups = delete_groups(client=client, groups=[dict(id="sig-1"), dict(id="sig-2"), dict(id="sig-3")],
+                               stateful_deallocation=None, wait=True, wait_timeout=600, max_workers=4)
+
+        self.assertEqual(["deleted", "deleted", "missing"], [group['status'] for group in groups])
+        self.assertNotIn('stateful_instances', groups[0])
+        self.assertEqual(dict(sig1=3, sig2=1), dict(sig1=polls["sig-1"], sig2=polls["sig-2"]))
+        self.assertEqual([5, 10], [call[0][0] for call in sleep.call_args_list])
+
+    @patch("time.sleep")
+    def test_timed_out(self, sleep):
+        """Report the stateful instances the group still has when the wait times out"""
+
+        client = MagicMock()
+        client.get_stateful_instances.return_value = [dict(id="ssi-1", instance_id="i-1", state="DEALLOCATING")]
+
+        groups = delete_groups(client=client, groups=[dict(id="sig-1")],
+                               stateful_deallocation=None, wait=True, wait_timeout=0, max_workers=1)
+
+        self.assertEqual("timed_out", groups[0]['status'])
+        self.assertEqual([dict(id="ssi-1", instance_id="i-1", state="DEALLOCATING")],
+                         groups[0]['stateful_instances'])
+
+    def test_no_wait(self):
+        """Without wait the deletion is only requested"""
+
+        client = MagicMock()
+
+        groups = delete_groups(client=client, groups=[dict(id="sig-1")],
+                               stateful_deallocation=None, wait=False, wait_timeout=600, max_workers=1)
+
+        self.assertEqual("requested", groups[0]['status'])
+        client.get_stateful_instances.assert_not_called()
+
+    def test_ambiguous_names(self):
+        """Fail instead of picking one of the groups with the same name"""
+
+        client = MagicMock()
+        client.get_elastigroups.return_value = [dict(id="sig-1", name="web"), dict(id="sig-2", name="web"),
+                                                dict(id="sig-3", name="db")]
+
+        self.assertEqual([dict(id="sig-3", name="db"), dict(id=None, name="api")],
+                         get_groups(client=client, group_ids=[], names=["db", "api"]))
+
+        with self.assertRaises(ValueError) as context:
+            get_groups(client=client, group_ids=[], names=["web", "db"])
+
+        self.assertEqual("Several groups have the names web (sig-1, sig-2)", str(context.exception))
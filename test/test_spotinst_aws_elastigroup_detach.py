@@ -0,0 +1,137 @@
+import unittest
+
+from mock import MagicMock, patch
+
+from spotinst_sdk2.client import SpotinstClientException
+
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_detach import detach_instances, get_batches, \
+    get_group, select_instances
+
+
+class ModuleFailed(Exception):
+    pass
+
+
+def fail_json(msg, **kwargs):
+    raise ModuleFailed(msg)
+
+
+class TestSpotinstAwsElastigroupDetach(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_detach module"""
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.get_elastigroup_active_instances.return_value = [
+            dict(instance_id="i-{0}".format(index), private_ip="10.0.0.{0}".format(index)) for index in range(4)]
+        self.client.get_instance_healthiness.return_value = [
+            dict(instance_id="i-{0}".format(index), health_status="UNHEALTHY" if index in (1, 3) else "HEALTHY")
+            for index in range(4)]
+
+    def test_select_instances(self):
+        """Select the given instances and those with a health status, in the order of the group"""
+
+        instance_ids, unknown_ids = select_instances(client=self.client, group_id="sig-1",
+                                                     instance_ids=["i-2", "i-9"], health_statuses=["UNHEALTHY"])
+
+        self.assertEqual(["i-1", "i-2", "i-3"], instance_ids)
+        self.assertEqual(["i-9"], unknown_ids)
+        self.assertEqual([["i-1", "i-2"], ["i-3"]], get_batches(instance_ids, 2))
+
+    @patch("time.sleep")
+    def test_replace_instances(self, sleep):
+        """Detach a batch once the replacements of the previous one are up and it had time to drain"""
+
+        def detach_elastigroup_instances(group_id, detach_configuration):
+            # the group replaces the detached instances
+            active = self.client.get_elastigroup_active_instances.return_value
+            for instance_id in detach_configuration.instances_to_detach:
+                active.append(dict(instance_id=instance_id + "-new", private_ip="10.0.1.1"))
+
+        self.client.detach_elastigroup_instances.side_effect = detach_elastigroup_instances
+
+        batches, instances, error = detach_instances(
+            client=self.client, group_id="sig-1", batches=[["i-1"], ["i-3"]], action="replace",
+            should_terminate_instances=True, draining_timeout=120, health_check=False, wait_timeout=900)
+
+        self.assertIsNone(error)
+        self.assertEqual([["i-1"], ["i-3"]], [batch['instance_ids'] for batch in batches])
+        self.assertEqual(["i-0", "i-2", "i-1-new", "i-3-new"], [instance['instance_id'] for instance in instances])
+        self.assertEqual(1, sleep.call_count)
+        self.assertAlmostEqual(120, sleep.call_args[0][0], delta=1)
+
+        detach_configuration = self.client.detach_elastigroup_instances.call_args[1]['detach_configuration']
+        self.assertEqual(["i-3"], detach_configuration.instances_to_detach)
+        self.assertFalse(detach_configuration.should_decrement_target_capacity)
+        self.assertEqual(120, detach_configuration.draining_timeout)
+
+    def replace_healthy(self, group_id, detach_configuration):
+        # the group replaces the detached instances with healthy ones
+        for instance_id in detach_configuration.instances_to_detach:
+            self.client.get_elastigroup_active_instances.return_value.append(
+                dict(instance_id=instance_id + "-new", private_ip="10.0.1.1"))
+            self.client.get_instance_healthiness.return_value.append(
+                dict(instance_id=instance_id + "-new", health_status="HEALTHY"))
+
+    @patch("time.sleep")
+    def test_replace_unhealthy_instances(self, sleep):
+        """Wait for the replacements of a batch only, not for the unhealthy instances of the next batches"""
+
+        self.client.detach_elastigroup_instances.side_effect = self.replace_healthy
+
+        batches, instances, error = detach_instances(
+            client=self.client, group_id="sig-1", batches=[["i-1"], ["i-3"]], action="replace",
+            should_terminate_instances=True, draining_timeout=None, health_check=True, wait_timeout=900)
+
+        self.assertIsNone(error)
+        self.assertEqual([["i-1"], ["i-3"]], [batch['instance_ids'] for batch in batches])
+        self.assertEqual(["i-0", "i-2", "i-1-new", "i-3-new"], [instance['instance_id'] for instance in instances])
+        sleep.assert_not_called()
+
+    @patch("time.sleep")
+    def test_poll_error(self, sleep):
+        """Retry a failed poll until the deadline and report its error when the wait times out"""
+
+        healthiness = self.client.get_instance_healthiness.return_value
+        self.client.detach_elastigroup_instances.side_effect = self.replace_healthy
+        self.client.get_instance_healthiness.side_effect = [SpotinstClientException("Client Error", "503"),
+                                                            healthiness]
+
+        batches, instances, error = detach_instances(
+            client=self.client, group_id="sig-1", batches=[["i-1"]], action="replace",
+            should_terminate_instances=True, draining_timeout=None, health_check=True, wait_timeout=900)
+
+        self.assertIsNone(error)
+        self.assertEqual(1, sleep.call_count)
+
+        self.client.get_instance_healthiness.side_effect = SpotinstClientException("Client Error", "503")
+
+        batches, instances, error = detach_instances(
+            client=self.client, group_id="sig-1", batches=[["i-3"]], action="replace",
+            should_terminate_instances=True, draining_timeout=None, health_check=True, wait_timeout=0)
+
+        self.assertEqual([dict(instance_ids=["i-3"])], batches)
+        self.assertTrue(error.startswith("Timed out waiting for the replacements of i-3: Client Error"))
+
+    def test_ambiguous_name(self):
+        """Fail instead of picking one of the groups with the same name"""
+
+        module = MagicMock(params=dict(id=None, name="web"))
+        module.fail_json.side_effect = fail_json
+        self.client.get_elastigroups.return_value = [dict(id="sig-1", name="web"), dict(id="sig-2", name="web")]
+
+        with self.assertRaises(ModuleFailed) as context:
+            get_group(client=self.client, module=module)
+
+        self.assertEqual("Several groups have the name web (sig-1, sig-2), use id to select one",
+                         str(context.exception))
+
+    @patch("time.sleep")
+    def test_replacement_timeout(self, sleep):
+        """Stop at the batch whose replacements are not up in time"""
+
+        batches, instances, error = detach_instances(
+            client=self.client, group_id="sig-1", batches=[["i-1"], ["i-3"]], action="replace",
+            should_terminate_instances=True, draining_timeout=None, health_check=True, wait_timeout=0)
+
+        self.assertEqual([dict(instance_ids=["i-1"])], batches)
+        self.assertEqual("Timed out waiting for the replacements of i-1", error)
@@ -0,0 +1,76 @@
+import inspect
+import unittest
+
+from mock import MagicMock, patch
+from spotinst_sdk2 import SpotinstSession
+
+from ansible.modules.cloud.spotinst import spotinst_aws_elastigroup, spotinst_aws_elastigroup_blue_green, \
+    spotinst_aws_elastigroup_delete, spotinst_aws_elastigroup_detach, spotinst_aws_elastigroup_scale
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_scale import get_groups, scale_groups, \
+    validate_groups
+from test.spot_api_server import SpotApiServer, redirect_requests
+
+
+class TestSpotinstAwsElastigroupScale(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_scale module"""
+
+    def test_validate_groups(self):
+        """Every group needs an id or a name and a consistent capacity"""
+
+        errors = validate_groups([dict(name="web", target=2), dict(target=2), dict(id="sig-1"),
+                                  dict(id="sig-2", min_size=3, target=2), dict(id="sig-3", max_size=4, target=4)])
+
+        self.assertEqual(["groups[1] must have an id or a name",
+                          "groups[2] must have a min_size, max_size or target",
+                          "groups[3] must have min_size <= target <= max_size"], errors)
+
+    def test_scale_groups(self):
+        """Patch the capacity of the groups and wait for their instances"""
+
+        with SpotApiServer(fleet_size=5, provision_delay=0.2) as server, redirect_requests(server.url), \
+                patch("time.sleep") as sleep:
+            client = SpotinstSession(auth_token="token").client("elastigroup_aws")
+            group_id = server.state.list("group", name="group-2")[0]["id"]
+
+            groups = get_groups(client=client, group_items=[dict(name="group-1", max_size=20, target=12),
+                                                            dict(id=group_id, min_size=1),
+                                                            dict(name="missing", target=1)])
+            self.assertIsNone(groups[2]['id'])
+
+            groups = scale_groups(client=client, groups=groups[:2], wait_for_instances=True, health_check=True,
+                                  wait_timeout=60, max_workers=4)
+
+            self.assertEqual(["fulfilled", "scaled"], [group['status'] for group in groups])
+            self.assertEqual(12, len(groups[0]['instances']))
+            self.assertTrue(sleep.called)
+            self.assertEqual(dict(minimum=0, maximum=20, target=12, unit="instance"),
+                             server.state.list("group", name="group-1")[0]["capacity"])
+            self.assertEqual(1, server.state.get("group", group_id)["capacity"]["minimum"])
+
+    def test_ambiguous_names(self):
+        """Fail instead of picking one of the groups with the same name"""
+
+        client = MagicMock()
+        client.get_elastigroups.return_value = [dict(id="sig-1", name="web"), dict(id="sig-2", name="web")]
+
+        self.assertEqual([dict(id="sig-2", name="web", capacity=dict(target=1))],
+                         get_groups(client=client, group_items=[dict(id="sig-2", name="web", target=1)]))
+
+        with self.assertRaises(ValueError) as context:
+            get_groups(client=client, group_items=[dict(name="web", target=1)])
+
+        self.assertEqual("Several groups have the names web (sig-1, sig-2)", str(context.exception))
+
+    def test_shared_functions(self):
+        """Keep the copies of the functions shared by the elastigroup modules the same"""
+
+        shared_functions = (
+            ('get_fulfilled_instances', (spotinst_aws_elastigroup, spotinst_aws_elastigroup_blue_green,
+                                         spotinst_aws_elastigroup_detach)),
+            ('wait_for_groups', (spotinst_aws_elastigroup_blue_green, spotinst_aws_elastigroup_delete,
+                                 spotinst_aws_elastigroup_detach)))
+
+        for name, modules in shared_functions:
+            for module in modules:
+                self.assertEqual(inspect.getsource(getattr(spotinst_aws_elastigroup_scale, name)),
+                                 inspect.getsource(getattr(module, name)), module.__name__ + "." + name)
@@ -0,0 +1,69 @@
+import unittest
+import inspect
+import sys
+from datetime import datetime
+from mock import MagicMock
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst import spotinst_aws_elastigroup_schedule_analyzer, spotinst_mrscaler
+from ansible.modules.cloud.spotinst.spotinst_aws_elastigroup_schedule_analyzer import analyze_groups, \
+    get_frequency_firings
+
+START = datetime(2020, 1, 5)
+END = datetime(2020, 1, 12)
+
+
+class TestSpotinstAwsElastigroupScheduleAnalyzer(unittest.TestCase):
+    """Unit test for the spotinst_aws_elastigroup_schedule_analyzer module"""
+
+    def test_no_conflicts(self):
+        """Scale up on weekday mornings and back down in the evening"""
+
+        group = dict(name="web", min_size=1, max_size=10, target=2, scheduled_tasks=[
+            dict(task_type="scale", cron_expression="0 8 * * MON-FRI", scale_min_capacity=4, scale_target_capacity=6),
+            dict(task_type="scale", cron_expression="0 20 * * MON-FRI", scale_min_capacity=1,
+                 scale_target_capacity=2),
+            dict(task_type="roll", cron_expression="0 8 * * MON-FRI")])
+
+        conflicts, summary = analyze_groups([group], START, END)
+
+        self.assertEqual([], conflicts)
+        self.assertEqual(dict(groups=1, tasks=2, firings=10, conflicts=dict()), summary)
+
+    def test_conflicts(self):
+        """Report overlaps, invalid and pinned capacities and policies out of the scheduled bounds"""
+
+        group = dict(name="batch", min_size=0, max_size=4, target=0, scheduled_tasks=[
+            dict(task_type="scale", cron_expression="0 8 * * *", scale_max_capacity=2, scale_min_capacity=2,
+                 scale_target_capacity=2),
+            dict(task_type="scaleUp", cron_expression="0 8 * * SUN", adjustment=3),
+            dict(task_type="scale", cron_expression="0 9 * * 1", scale_target_capacity=6)],
+            up_scaling_policies=[dict(policy_name="burst", action_type="setMinTarget", min_target_capacity=3)])
+
+        conflicts, summary = analyze_groups([group], START, END)
+
+        self.assertEqual(dict(overlap=1, clamped=1, policies_blocked=1, policy_out_of_bounds=1,
+                              invalid_capacity=1), summary['conflicts'])
+        self.assertEqual(dict(group="batch", kind="overlap", time="2020-01-05T08:00:00Z", tasks=[0, 1],
+                              occurrences=1, message="2 scheduled tasks change the capacity at the same time"), conflicts[0])
+        self.assertEqual("2020-01-06T09:00:00Z", conflicts[-1]['time'])
+        self.assertEqual("invalid_capacity", conflicts[-1]['kind'])
+        # pinned every morning, reported once
+        self.assertEqual(7, conflicts[2]['occurrences'])
+
+    def test_frequency_firings(self):
+        """Expand frequencies from their start time"""
+
+        firings = get_frequency_firings("daily", "2020-01-01T06:30:00Z", START, END)
+
+        self.assertEqual(7, len(firings))
+        self.assertEqual(datetime(2020, 1, 5, 6, 30), firings[0])
+
+    def test_cron_parsing_matches_mrscaler(self):
+        """Keep the cron parsing the same as the one of spotinst_mrscaler"""
+
+        for name in ('parse_cron_value', 'parse_cron_field', 'parse_cron_expression', 'is_cron_day'):
+            self.assertEqual(inspect.getsource(getattr(spotinst_mrscaler, name)),
+                             inspect.getsource(getattr(spotinst_aws_elastigroup_schedule_analyzer, name)), name)
+
+        self.assertEqual(spotinst_mrscaler.CRON_FIELDS, spotinst_aws_elastigroup_schedule_analyzer.CRON_FIELDS)
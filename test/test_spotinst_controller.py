@@ -0,0 +1,88 @@
+import unittest
+import os
+import importlib.util
+from mock import MagicMock
+
+spec = importlib.util.spec_from_file_location(
+    "spotinst_controller",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "action_plugins", "spotinst_controller.py"))
+spotinst_controller = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(spotinst_controller)
+
+
+def make_module_class(task_args, check_mode=False):
+    return type('ControllerModule', (spotinst_controller.ControllerModule,),
+                dict(module_name="test_module", task_args=task_args, task_check_mode=check_mode))
+
+
+def make_action(transport):
+    action = spotinst_controller.ActionModule.__new__(spotinst_controller.ActionModule)
+    action._connection = MagicMock(transport=transport)
+
+    return action
+
+
+class TestControllerModule(unittest.TestCase):
+    """Unit test for running the modules on the controller"""
+
+    argument_spec = dict(
+        token=dict(type='str', no_log=True),
+        name=dict(type='str', required=True),
+        max_workers=dict(type='int', default=10))
+
+    def test_validate_params(self):
+        module = make_module_class(dict(name="test", max_workers="4"))(argument_spec=self.argument_spec)
+
+        self.assertEqual(dict(token=None, name="test", max_workers=4), module.params)
+        self.assertEqual(dict(name="test", max_workers="4"), module.custom_params)
+
+    def test_fail_on_invalid_params(self):
+        module_class = make_module_class(dict(max_workers=4))
+
+        with self.assertRaises(spotinst_controller.ControllerModuleExit) as context:
+            module_class(argument_spec=self.argument_spec)
+
+        self.assertTrue(context.exception.result['failed'])
+        self.assertEqual("missing required arguments: name", context.exception.result['msg'])
+
+    def test_fail_on_unsupported_params(self):
+        module_class = make_module_class(dict(name="test", size=4))
+
+        with self.assertRaises(spotinst_controller.ControllerModuleExit) as context:
+            module_class(argument_spec=self.argument_spec)
+
+        self.assertTrue(context.exception.result['msg'].startswith("Unsupported parameters for (test_module) module: "))
+
+    def test_exit_json(self):
+        module = make_module_class(dict(name="test", token="secret"))(argument_spec=self.argument_spec)
+
+        with self.assertRaises(spotinst_controller.ControllerModuleExit) as context:
+            module.exit_json(changed=True, group_id="sig-123")
+
+        self.assertEqual("sig-123", context.exception.result['group_id'])
+        self.assertIn("secret", context.exception.no_log_values)
+
+    def test_check_mode_not_supported(self):
+        module_class = make_module_class(dict(name="test"), check_mode=True)
+
+        with self.assertRaises(spotinst_controller.ControllerModuleExit) as context:
+            module_class(argument_spec=self.argument_spec)
+
+        self.assertTrue(context.exception.result['skipped'])
+
+    def test_cache_client(self):
+        get_client = MagicMock(side_effect=lambda module: object())
+        get_cached_client = spotinst_controller.cache_client("test_module", get_client)
+        module_class = make_module_class(dict(name="test", token="token"))
+
+        first_client = get_cached_client(module_class(argument_spec=self.argument_spec))
+        second_client = get_cached_client(module_class(argument_spec=self.argument_spec))
+
+        self.assertIs(first_client, second_client)
+        self.assertEqual(1, get_client.call_count)
+
+    def test_run_on_controller(self):
+        self.assertTrue(make_action("local")._run_on_controller(dict()))
+        self.assertFalse(make_action("ssh")._run_on_controller(dict()))
+        self.assertTrue(make_action("ssh")._run_on_controller(dict(spotinst_controller_execution="yes")))
+        self.assertFalse(make_action("local")._run_on_controller(dict(spotinst_controller_execution=False)))
@@ -0,0 +1,90 @@
+import unittest
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+from mock import MagicMock, patch
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst import spotinst_emr_scaling_simulator, spotinst_mrscaler
+from ansible.modules.cloud.spotinst.spotinst_emr_scaling_simulator import read_metrics, get_policies, simulate
+
+SCALING = dict(
+    up=[dict(metric_name="YARNMemoryAvailablePercentage", statistic="average", operator="lt", threshold=30,
+             period=300, evaluation_periods=1, cooldown=600, action=dict(type="adjustment", adjustment=2))],
+    down=[dict(metric_name="YARNMemoryAvailablePercentage", statistic="average", operator="gt", threshold=80,
+               period=300, evaluation_periods=3, cooldown=300, action=dict(type="adjustment", adjustment=1))])
+
+
+class TestSpotinstEmrScalingSimulator(unittest.TestCase):
+    """Unit test for the spotinst_emr_scaling_simulator module"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.metrics_path = os.path.join(self.tmp_dir, "metrics.csv")
+
+        # an idle hour, a busy hour and an idle hour, by minute
+        with open(self.metrics_path, "w") as metrics:
+            metrics.write("timestamp,YARNMemoryAvailablePercentage\n")
+            for minute in range(180):
+                metrics.write("2020-01-01T{0:02d}:{1:02d}:00Z,{2}\n".format(
+                    minute // 60, minute % 60, 20 if 60 <= minute < 120 else 90))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def simulate(self):
+        timestamps, values = read_metrics(self.metrics_path)
+
+        return simulate(timestamps=timestamps, values=values, policies=get_policies(SCALING),
+                        capacity=dict(minimum=1, maximum=6, target=2))
+
+    def test_simulate(self):
+        """Scale up with cooldown up to the maximum and back down to the minimum"""
+
+        with patch.object(spotinst_emr_scaling_simulator, 'HAS_NUMPY', False):
+            changes, summary = self.simulate()
+
+        self.assertEqual([("2020-01-01T00:15:00Z", 1), ("2020-01-01T01:05:00Z", 3), ("2020-01-01T01:15:00Z", 5),
+                          ("2020-01-01T01:25:00Z", 6), ("2020-01-01T02:15:00Z", 5), ("2020-01-01T02:20:00Z", 4),
+                          ("2020-01-01T02:25:00Z", 3), ("2020-01-01T02:30:00Z", 2), ("2020-01-01T02:35:00Z", 1)],
+                         [(spotinst_emr_scaling_simulator.format_timestamp(change['timestamp']), change['capacity'])
+                          for change in changes])
+        self.assertEqual(dict(start="2020-01-01T00:00:00Z", end="2020-01-01T03:00:00Z", min_capacity=1,
+                              max_capacity=6, mean_capacity=3.083, instance_hours=9.25, scale_ups=3, scale_downs=6,
+                              sla_misses=9), summary)
+
+    def test_invalid_capacity(self):
+        """Fail instead of simulating a capacity without bounds or with a target out of them"""
+
+        timestamps, values = read_metrics(self.metrics_path)
+
+        for capacity in (dict(minimum=1, target=2), dict(maximum=6), dict(minimum=1, maximum=6, target=8)):
+            self.assertRaises(ValueError, simulate, timestamps=timestamps, values=values,
+                              policies=get_policies(SCALING), capacity=capacity)
+
+    def test_step_policies_match_mrscaler(self):
+        """Keep the step expansion the same as the one of spotinst_mrscaler"""
+
+        for name in ('generate_step_policies', 'get_step_thresholds', 'get_step_adjustments'):
+            self.assertEqual(inspect.getsource(getattr(spotinst_mrscaler, name)),
+                             inspect.getsource(getattr(spotinst_emr_scaling_simulator, name)), name)
+
+    @unittest.skipUnless(spotinst_emr_scaling_simulator.HAS_NUMPY, "numpy is not installed")
+    def test_simulate_numpy(self):
+        """Evaluate the policies the same way with numpy"""
+
+        with patch.object(spotinst_emr_scaling_simulator, 'HAS_NUMPY', False):
+            expected = self.simulate()
+
+        self.assertEqual(expected, self.simulate())
+
+    def test_steps(self):
+        """Expand policies with steps like spotinst_mrscaler"""
+
+        policies = get_policies(dict(up=[dict(metric_name="AppsPending", operator="gt",
+                                              steps=dict(thresholds=[5, 10], adjustments=[1, 3]))]))
+
+        self.assertEqual([(5.0, 1), (10.0, 3)],
+                         [(policy['threshold'], policy['action']['adjustment']) for policy in policies])
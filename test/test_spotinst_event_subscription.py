@@ -3,7 +3,8 @@ import sys
 from mock import MagicMock
 sys.modules['spotinst_sdk'] = MagicMock()
 
-from ansible.modules.cloud.spotinst.spotinst_event_subscription import expand_subscription_request
+from ansible.modules.cloud.spotinst.spotinst_event_subscription import expand_subscription_request, \
+    find_request_type_and_id, handle_subscriptions, index_subscriptions
 
 
 class MockModule:
@@ -33,3 +34,54 @@ class TestSpotinstEventSubscription(unittest.TestCase):
         self.assertEqual("test_endpoint", actual_event_subscription.endpoint)
         self.assertEqual("test_event_type", actual_event_subscription.event_type)
         self.assertEqual("test_event_format", actual_event_subscription.event_format)
+
+
+class TestSubscriptionLookup(unittest.TestCase):
+    """Unit test for matching desired subscriptions with the existing ones"""
+
+    existing_subscriptions = [
+        dict(id="sis-1", resource_id="sig-1", event_type="GROUP_UPDATED", protocol="web",
+             endpoint="https://webhook.com", event_format=dict(subject="%s")),
+        dict(id="sis-2", resource_id="sig-2", event_type="GROUP_UPDATED", protocol="web",
+             endpoint="https://webhook.com")
+    ]
+
+    def test_find_request_type_and_id(self):
+        subscriptions_index = index_subscriptions(self.existing_subscriptions)
+        desired = dict(resource_id="sig-1", event_type="GROUP_UPDATED", protocol="web", endpoint="https://webhook.com")
+
+        self.assertEqual((None, "sis-1"), find_request_type_and_id(
+            subscription=dict(desired, event_format=dict(subject="%s")), state="present",
+            subscriptions_index=subscriptions_index))
+        self.assertEqual(("update", "sis-1"), find_request_type_and_id(
+            subscription=dict(desired, event_format=dict(subject="%s", message="%s")), state="present",
+            subscriptions_index=subscriptions_index))
+        self.assertEqual(("delete", "sis-1"), find_request_type_and_id(
+            subscription=desired, state="absent", subscriptions_index=subscriptions_index))
+        self.assertEqual(("create", None), find_request_type_and_id(
+            subscription=dict(desired, resource_id="sig-3"), state="present",
+            subscriptions_index=subscriptions_index))
+        self.assertEqual((None, None), find_request_type_and_id(
+            subscription=dict(desired, endpoint="https://other.com"), state="absent",
+            subscriptions_index=subscriptions_index))
+
+    def test_handle_subscriptions(self):
+        client = MagicMock()
+        client.get_all_event_subscription.return_value = self.existing_subscriptions
+        client.create_event_subscription.return_value = dict(id="sis-3")
+
+        module = MockModule(input_dict=dict(max_workers=2, subscriptions=[
+            dict(resource_id="sig-1", event_type="GROUP_UPDATED", protocol="web", endpoint="https://webhook.com"),
+            dict(resource_id="sig-2", event_type="GROUP_UPDATED", protocol="web", endpoint="https://webhook.com",
+                 state="absent"),
+            dict(resource_id="sig-3", event_type="GROUP_UPDATED", protocol="web", endpoint="https://webhook.com")
+        ]))
+
+        subscriptions, has_changed = handle_subscriptions(client=client, module=module)
+
+        self.assertTrue(has_changed)
+        self.assertEqual(1, client.get_all_event_subscription.call_count)
+        self.assertEqual([("sis-1", "unchanged"), ("sis-2", "deleted"), ("sis-3", "created")],
+                         [(subscription['id'], subscription['action']) for subscription in subscriptions])
+        client.delete_event_subscription.assert_called_once_with(subscription_id="sis-2")
+        client.update_event_subscription.assert_not_called()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+from mock import MagicMock
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst.spotinst_fleet_drift import to_group_config, to_ocean_config, detect_drift
+
+
+class TestSpotinstFleetDrift(unittest.TestCase):
+    """Unit test for the spotinst_fleet_drift module"""
+
+    def test_group_config(self):
+        """Put the flat elastigroup params where the group has them"""
+
+        config = to_group_config(dict(name="test", min_size=0, target=2, spot_instance_types=["c5.large"],
+                                      iam_role_name="role", tags=[dict(Name="test")], key_pair=None,
+                                      up_scaling_policies=[dict(policy_name="up", action_type="adjustment",
+                                                                adjustment=1)]))
+
+        self.assertEqual(dict(
+            name="test",
+            capacity=dict(minimum=0, target=2),
+            compute=dict(instance_types=dict(spot=["c5.large"]),
+                         launch_specification=dict(iam_role=dict(name="role"),
+                                                   tags=[dict(tag_key="Name", tag_value="test")])),
+            scaling=dict(up=[dict(policy_name="up", action=dict(type="adjustment", adjustment=1))])), config)
+
+    def test_detect_drift(self):
+        """Report only the desired fields that differ from the live resources"""
+
+        live_group = dict(id="sig-1", name="group", capacity=dict(minimum=0, maximum=10, target=4, unit="instance"),
+                          compute=dict(instance_types=dict(spot=["m5.large", "c5.large"]),
+                                       launch_specification=dict(user_data="old")))
+        live_ocean = dict(id="o-1", name="ocean", compute=dict(launch_specification=dict(max_v_cpu=10)))
+
+        resources = [
+            dict(type="group", params=dict(name="group", min_size=0, target=2, user_data="new",
+                                           spot_instance_types=["c5.large", "m5.large"])),
+            dict(type="ocean", id="o-1", params=dict(name="ocean", state="present",
+                                                     compute=dict(launch_specification=dict(max_vCpu=10)))),
+            dict(type="group", params=dict(name="removed"))]
+
+        drift, summary = detect_drift(resources, [live_group, live_ocean, None],
+                                      ["compute.launch_specification.user_data"])
+
+        self.assertEqual(dict(in_sync=1, drifted=1, missing=1, unknown=0), summary)
+        self.assertEqual("sig-1", drift[0]['id'])
+        self.assertEqual([dict(path="capacity.target", desired=2, live=4)], drift[0]['diffs'])
+        self.assertEqual("in_sync", drift[1]['status'])
+        self.assertEqual("missing", drift[2]['status'])
+
+    def test_detect_load_balancer_drift(self):
+        """Compare the target groups of a group with its load balancers"""
+
+        live_group = dict(id="sig-1", name="group", compute=dict(launch_specification=dict(load_balancers_config=dict(
+            load_balancers=[dict(arn="arn:old", type="TARGET_GROUP")]))))
+
+        drift, summary = detect_drift([dict(type="group", params=dict(name="group", target_group_arns=["arn:new"]))],
+                                      [live_group], [])
+
+        self.assertEqual(dict(in_sync=0, drifted=1, missing=0, unknown=0), summary)
+        self.assertEqual("compute.launch_specification.load_balancers_config.load_balancers.[0].arn",
+                         drift[0]['diffs'][0]['path'])
+
+    def test_detect_unmapped_params(self):
+        """Report a group with params that are not compared as unknown instead of in sync"""
+
+        drift, summary = detect_drift([dict(type="group", params=dict(name="group", uniqueness_by="name",
+                                                                      new_param=True))],
+                                      [dict(id="sig-1", name="group")], [])
+
+        self.assertEqual(1, summary['unknown'])
+        self.assertEqual(["new_param"], drift[0]['unmapped_params'])
+
+    def test_ocean_config(self):
+        """Leave the module params out of the Ocean configuration"""
+
+        self.assertEqual(dict(name="ocean"), to_ocean_config(dict(name="ocean", uniqueness_by="name", state="present")))
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from mock import MagicMock
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst.spotinst_fleet_export import open_snapshot, read_snapshot_index, write_snapshot
+
+
+class TestSpotinstFleetExport(unittest.TestCase):
+    """Unit test for the spotinst_fleet_export module"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def export(self, path, resources_by_type, previous_index):
+        with open_snapshot(path, 'w', 'gzip') as snapshot:
+            return write_snapshot(snapshot=snapshot, resources_by_type=resources_by_type,
+                                  previous_index=previous_index)
+
+    def test_incremental_snapshot(self):
+        """Reuse the records of unchanged resources and report the change set"""
+
+        path = os.path.join(self.tmp_dir, "fleet.ndjson.gz")
+        groups = [dict(id="sig-1", name="first", updated_at="2020-01-01T00:00:00.000Z"),
+                  dict(id="sig-2", name="second", updated_at="2020-01-01T00:00:00.000Z"),
+                  dict(id="sig-3", name="third", updated_at="2020-01-01T00:00:00.000Z")]
+
+        first_hash, summary = self.export(path, [("group", groups)], dict())
+        self.assertEqual(3, summary['added'])
+
+        index = read_snapshot_index(path, 'gzip')
+        self.assertEqual(3, len(index))
+        self.assertEqual("2020-01-01T00:00:00.000Z", index[("group", "sig-1")][0])
+
+        changed_groups = [dict(groups[0]), dict(groups[1], name="renamed", updated_at="2020-02-01T00:00:00.000Z"),
+                          dict(id="sig-4", name="fourth", updated_at="2020-02-01T00:00:00.000Z")]
+
+        second_hash, summary = self.export(path, [("group", changed_groups)], index)
+
+        self.assertNotEqual(first_hash, second_hash)
+        self.assertEqual(dict(counts=dict(group=3), added=1, changed=1, removed=1, unchanged=1, reused=1), summary)
+        self.assertEqual(["sig-1", "sig-2", "sig-4"],
+                         sorted(resource_id for _, resource_id in read_snapshot_index(path, 'gzip')))
+
+    def test_snapshot_hash(self):
+        """Equal resources give equal snapshot hashes, whatever their key order"""
+
+        first_hash, _ = self.export(os.path.join(self.tmp_dir, "first.gz"),
+                                    [("ocean", [dict(id="o-1", name="ocean", region="us-west-2")])], dict())
+        second_hash, _ = self.export(os.path.join(self.tmp_dir, "second.gz"),
+                                     [("ocean", [dict(region="us-west-2", name="ocean", id="o-1")])], dict())
+
+        self.assertEqual(first_hash, second_hash)
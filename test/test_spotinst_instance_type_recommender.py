@@ -0,0 +1,67 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from ansible.modules.cloud.spotinst.spotinst_instance_type_recommender import read_catalog, get_candidates, \
+    rank_candidates
+
+CATALOG = """instance_type,vcpu,memory,on_demand_price,availability_zone,spot_price,interruption_rate
+c5.large,2,4,0.085,us-west-2a,0.030,0.05
+c5.large,2,4,0.085,us-west-2b,0.034,0.10
+m5.large,2,8,0.096,us-west-2a,0.036,0.05
+m5.large,2,8,0.096,us-west-2b,0.036,0.05
+c5.xlarge,4,8,0.17,us-west-2a,0.060,0.20
+c5.xlarge,4,8,0.17,us-west-2b,0.064,0.20
+t2.large,2,8,0.093,us-west-2a,0.020,0.05
+t2.large,2,8,0.093,us-west-2b,0.020,0.05
+r5.large,2,16,0.126,us-west-2a,0.030,0.05
+"""
+
+
+class TestSpotinstInstanceTypeRecommender(unittest.TestCase):
+    """Unit test for the spotinst_instance_type_recommender module"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.catalog_path = os.path.join(self.tmp_dir, "catalog.csv")
+
+        with open(self.catalog_path, "w") as catalog:
+            catalog.write(CATALOG)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_candidates(self):
+        """Keep the types that meet the requirements in all the zones"""
+
+        candidates = get_candidates(rows=read_catalog(self.catalog_path),
+                                    zone_names={"us-west-2a", "us-west-2b"}, min_vcpu=2, max_vcpu=4, min_memory=4,
+                                    max_memory=None, exclude_patterns=["t2.*"])
+
+        self.assertEqual(["c5.large", "c5.xlarge", "m5.large"],
+                         [candidate['instance_type'] for candidate in candidates])
+        self.assertEqual(0.032, candidates[0]['spot_price'])
+        self.assertEqual(0.1, candidates[0]['interruption_rate'])
+
+    def test_rank(self):
+        """Rank by price per vCPU and interruption rate"""
+
+        candidates = get_candidates(rows=read_catalog(self.catalog_path),
+                                    zone_names={"us-west-2a", "us-west-2b"}, min_vcpu=None, max_vcpu=None,
+                                    min_memory=None, max_memory=None, exclude_patterns=[])
+
+        ranked = rank_candidates(candidates, price_weight=0.7, interruption_weight=0.3)
+
+        self.assertEqual(["t2.large", "c5.large", "m5.large", "c5.xlarge"],
+                         [candidate['instance_type'] for candidate in ranked])
+        self.assertEqual(0.0, ranked[0]['score'])
+
+    def test_invalid_catalog(self):
+        """Fail on catalogs without the expected columns"""
+
+        with open(self.catalog_path, "w") as catalog:
+            catalog.write("instance_type,vcpu\nc5.large,2\n")
+
+        with self.assertRaises(ValueError):
+            read_catalog(self.catalog_path)
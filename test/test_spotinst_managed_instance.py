@@ -5,7 +5,7 @@ from mock import MagicMock
 sys.modules['spotinst_sdk'] = MagicMock()
 
 
-from ansible.modules.cloud.spotinst.spotinst_aws_managed_instance import turn_to_model
+from ansible.modules.cloud.spotinst.spotinst_aws_managed_instance import turn_to_model, clean_do_not_update_fields
 from spotinst_sdk2.models.managed_instance.aws import *
 
 
@@ -181,3 +181,23 @@ class TestTurnToModel(unittest.TestCase):
         self.assertEqual(exp_first_record_set.name, act_first_record_set.name)
         self.assertEqual(exp_first_record_set.use_public_ip, act_first_record_set.use_public_ip)
         self.assertEqual(exp_first_record_set.use_public_dns, act_first_record_set.use_public_dns)
+
+
+class TestCleanDoNotUpdateFields(unittest.TestCase):
+    """Unit test for the do_not_update pruning helper"""
+
+    def test_prunes_without_mutating_input(self):
+        record_sets = [{'name': 'some_name', 'use_public_ip': True}]
+        input_dict = {'name': 'mi',
+                      'compute': {'product': 'Linux/UNIX',
+                                  'launch_specification': {'image_id': 'ami-123', 'user_data': 'abc'}},
+                      'integrations': {'route53': {'domains': [{'record_sets': record_sets}]}}}
+
+        actual = clean_do_not_update_fields(
+            input_dict, ['compute.product', 'compute.launch_specification.image_id', 'strategy.revert_to_spot'])
+
+        self.assertEqual({'launch_specification': {'user_data': 'abc'}}, actual['compute'])
+        self.assertEqual('Linux/UNIX', input_dict['compute']['product'])
+        self.assertEqual('ami-123', input_dict['compute']['launch_specification']['image_id'])
+        self.assertIs(input_dict['integrations'], actual['integrations'])
+        self.assertIs(input_dict, clean_do_not_update_fields(input_dict, None))
@@ -1,9 +1,12 @@
 import unittest
 import sys
-from mock import MagicMock
+from mock import MagicMock, patch
 sys.modules['spotinst_sdk'] = MagicMock()
 
-from ansible.modules.cloud.spotinst.spotinst_mrscaler import expand_emr_request
+from ansible.modules.cloud.spotinst import spotinst_mrscaler
+from datetime import datetime
+from ansible.modules.cloud.spotinst.spotinst_mrscaler import expand_emr_request, wait_for_emr, generate_step_policies, \
+    preview_scheduling
 
 
 class MockModule:
@@ -51,3 +54,135 @@ class TestSpotinstMrScaler(unittest.TestCase):
 
         self.assertEqual("ON_DEMAND", actual_mrScaler.compute.instance_groups.core_group.life_cycle)
         self.assertEqual(1, actual_mrScaler.compute.instance_groups.core_group.target)
+
+    def test_wait_for_emr(self):
+        """Poll the cluster until master and core are running and time every phase"""
+
+        class ClientException(Exception):
+            pass
+
+        master = dict(instance_group_type="MASTER", status="running")
+        core = dict(instance_group_type="CORE", status="running")
+        statuses = [ClientException(),
+                    (dict(status=dict(state="STARTING")), []),
+                    (dict(status=dict(state="BOOTSTRAPPING")), [master]),
+                    (dict(status=dict(state="WAITING")), [master]),
+                    (dict(status=dict(state="WAITING")), [master, core])]
+        clock = dict(now=1000.0)
+
+        def get_emr_cluster(emr_id):
+            status = statuses.pop(0)
+            if isinstance(status, Exception):
+                raise status
+
+            client.get_emr_instances.return_value = status[1]
+            return status[0]
+
+        def sleep(seconds):
+            clock['now'] += seconds
+
+        client = MagicMock()
+        client.get_emr_cluster.side_effect = get_emr_cluster
+
+        input_dict = dict(wait_timeout=600, compute=dict(instance_groups=dict(
+            master_group=dict(target=1), core_group=dict(target=1))))
+        module = MockModule(input_dict=input_dict)
+
+        with patch.object(spotinst_mrscaler, 'SpotinstClientException', ClientException), \
+                patch('time.time', side_effect=lambda: clock['now']), patch('time.sleep', side_effect=sleep):
+            actual_cluster = wait_for_emr(client=client, module=module, emr_id="simrs-1")
+
+        self.assertEqual("WAITING", actual_cluster['state'])
+        self.assertEqual(dict(provisioning=10.0, starting=10.0, bootstrapping=10.0, waiting=10.0),
+                         actual_cluster['phases'])
+        self.assertEqual(dict(target=1, running=1), actual_cluster['instance_groups']['CORE'])
+        self.assertEqual(40.0, actual_cluster['duration'])
+
+    def test_expand_scaling_metrics(self):
+        """Set every field of the scaling policies"""
+
+        input_dict = dict(
+            name="test_name",
+            scaling=dict(
+                down=[dict(metric_name="YARNMemoryAvailablePercentage", namespace="AWS/ElasticMapReduce",
+                           statistic="average", unit="percent", threshold=80, period=300, evaluation_periods=3,
+                           cooldown=600, operator="gt", action=dict(type="adjustment", adjustment=1))]))
+
+        actual_mrScaler = expand_emr_request(module=MockModule(input_dict=input_dict), is_update=False)
+        actual_metric = actual_mrScaler.scaling.down[0]
+
+        self.assertEqual("YARNMemoryAvailablePercentage", actual_metric.metric_name)
+        self.assertEqual("AWS/ElasticMapReduce", actual_metric.namespace)
+        self.assertEqual(80, actual_metric.threshold)
+        self.assertEqual(3, actual_metric.evaluation_periods)
+        self.assertEqual(600, actual_metric.cooldown)
+        self.assertEqual("gt", actual_metric.operator)
+        self.assertEqual(1, actual_metric.action.adjustment)
+
+    def test_generate_step_policies(self):
+        """Replace a policy with steps by one policy per step"""
+
+        metric = dict(metric_name="YARNMemoryAvailablePercentage", operator="lt", action=dict(type="adjustment"),
+                      steps=dict(start=40, stop=10, step=-10, adjustment=1, adjustment_step=1))
+        other_metric = dict(metric_name="AppsPending", threshold=5)
+
+        policies = generate_step_policies([metric, other_metric])
+
+        self.assertEqual([40, 30, 20, 10, 5], [policy['threshold'] for policy in policies])
+        self.assertEqual([1, 2, 3, 4], [policy['action']['adjustment'] for policy in policies[:4]])
+        self.assertTrue(all("steps" not in policy and policy['operator'] == "lt" for policy in policies[:4]))
+        self.assertIs(other_metric, policies[4])
+
+        policies = generate_step_policies([dict(steps=dict(thresholds=[0.5, 0.25], adjustments=[2, 4]))])
+        self.assertEqual([(0.5, 2), (0.25, 4)],
+                         [(policy['threshold'], policy['action']['adjustment']) for policy in policies])
+
+        with self.assertRaises(ValueError):
+            generate_step_policies([dict(steps=dict(start=10, stop=40, step=-10))])
+
+    def test_expand_scheduling(self):
+        """Send the scheduled tasks"""
+
+        input_dict = dict(
+            name="test_name",
+            scheduling=dict(tasks=[dict(is_enabled=True, instance_group_type="task", task_type="setCapacity",
+                                        cron_expression="0 8 * * 1-5", target_capacity=10, min_capacity=5,
+                                        max_capacity=20)]))
+
+        actual_mrScaler = expand_emr_request(module=MockModule(input_dict=input_dict), is_update=False)
+
+        self.assertEqual(1, len(actual_mrScaler.scheduling.tasks))
+        self.assertEqual("0 8 * * 1-5", actual_mrScaler.scheduling.tasks[0].cron_expression)
+        self.assertEqual(10, actual_mrScaler.scheduling.tasks[0].target_capacity)
+
+    def test_preview_scheduling(self):
+        """Expand the cron expressions of the enabled tasks and report the overlapping firings"""
+
+        scheduling = dict(tasks=[
+            dict(instance_group_type="task", cron_expression="0 8 * * 1-5", target_capacity=10),
+            dict(instance_group_type="task", cron_expression="0 8,20 * * MON", target_capacity=2),
+            dict(instance_group_type="core", cron_expression="0 8 * * *", target_capacity=4),
+            dict(instance_group_type="task", cron_expression="0 8 * * *", is_enabled=False)])
+
+        # a friday
+        preview, overlaps = preview_scheduling(scheduling=scheduling, count=2, start=datetime(2020, 1, 3, 7, 30))
+
+        self.assertEqual(3, len(preview))
+        self.assertEqual(["2020-01-03T08:00:00Z", "2020-01-06T08:00:00Z"],
+                         [firing['time'] for firing in preview[0]['firings']])
+        self.assertEqual(["2020-01-06T08:00:00Z", "2020-01-06T20:00:00Z"],
+                         [firing['time'] for firing in preview[1]['firings']])
+        self.assertEqual(10, preview[0]['firings'][0]['target_capacity'])
+        self.assertEqual([dict(time="2020-01-06T08:00:00Z", instance_group_type="task", tasks=[0, 1])], overlaps)
+
+        with self.assertRaises(ValueError):
+            preview_scheduling(scheduling=dict(tasks=[dict(cron_expression="0 25 * * *")]), count=1,
+                               start=datetime(2020, 1, 3))
+
+    def test_preview_scheduling_count(self):
+        """Reject a preview of less than one firing instead of expanding years of them"""
+
+        for count in (0, -1):
+            with self.assertRaises(ValueError):
+                preview_scheduling(scheduling=dict(tasks=[dict(cron_expression="* * * * *")]), count=count,
+                                   start=datetime(2020, 1, 3))
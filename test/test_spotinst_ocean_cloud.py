@@ -1,9 +1,10 @@
 import unittest
 import sys
-from mock import MagicMock
+from mock import MagicMock, patch
 sys.modules['spotinst_sdk'] = MagicMock()
 
-from ansible.modules.cloud.spotinst.spotinst_ocean_cloud import expand_ocean_request
+from ansible.modules.cloud.spotinst.spotinst_ocean_cloud import expand_ocean_request, expand_roll, wait_for_roll, \
+    plan_auto_scaler
 
 
 class MockModule:
@@ -41,3 +42,50 @@ class TestSpotinstOceanCloud(unittest.TestCase):
         self.assertEqual("test_key_pair", actual_ocean.compute.launch_specification.key_pair)
         self.assertEqual("test_image_id", actual_ocean.compute.launch_specification.image_id)
         self.assertEqual(["test_security_group_ids"], actual_ocean.compute.launch_specification.security_group_ids)
+
+    def test_expand_roll(self):
+        """Format roll config into the roll request body"""
+
+        roll_config = dict(batch_size_percentage=20, respect_pdb=True, launch_spec_ids=["ols-1"], wait=True)
+
+        self.assertEqual(dict(batchSizePercentage=20, respectPdb=True, launchSpecIds=["ols-1"]),
+                         expand_roll(roll_config=roll_config))
+
+    def test_wait_for_roll(self):
+        """Poll the roll until it ends and time every batch"""
+
+        statuses = [dict(id="scr-1", status="IN_PROGRESS", current_batch=1),
+                    dict(id="scr-1", status="IN_PROGRESS", current_batch=2),
+                    dict(id="scr-1", status="IN_PROGRESS", current_batch=2),
+                    dict(id="scr-1", status="COMPLETED", current_batch=2)]
+        clock = dict(now=1000.0)
+
+        def sleep(seconds):
+            clock['now'] += seconds
+
+        client = MagicMock()
+        client.send_get.side_effect = [dict(response=dict(items=[status])) for status in statuses]
+        client.convert_json.side_effect = lambda response, convert: response
+
+        with patch('time.time', side_effect=lambda: clock['now']), patch('time.sleep', side_effect=sleep):
+            actual_roll = wait_for_roll(client=client, ocean_id="o-1",
+                                        roll=dict(id="scr-1", status="IN_PROGRESS", current_batch=1),
+                                        wait_timeout=600)
+
+        self.assertEqual("COMPLETED", actual_roll['status'])
+        self.assertEqual([dict(batch=1, duration=15.0), dict(batch=2, duration=15.0)], actual_roll['batches'])
+        self.assertEqual(30.0, actual_roll['duration'])
+
+    def test_plan_auto_scaler(self):
+        """Bin-pack the pods histogram onto the whitelist and recommend headroom and limits"""
+
+        pods = [dict(cpu=1000, memory=1024, count=10)]
+
+        actual_auto_scaler, actual_plan = plan_auto_scaler(
+            pods=pods, instance_types=["m5.large", "c5.xlarge", "unknown.size"],
+            auto_scaler_plan=dict(headroom_percentage=10))
+
+        self.assertEqual(dict(cpu_per_unit=1000, memory_per_unit=1024, num_of_units=1), actual_auto_scaler['headroom'])
+        self.assertEqual(dict(max_vCpu=20, max_memory_gib=39), actual_auto_scaler['resource_limits'])
+        self.assertEqual("c5.xlarge", actual_plan['instance_type'])
+        self.assertEqual([11, 4, None], [plan['nodes'] for plan in actual_plan['instance_types']])
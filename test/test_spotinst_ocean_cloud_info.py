@@ -0,0 +1,45 @@
+import unittest
+import sys
+from mock import MagicMock
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst.spotinst_ocean_cloud_info import fetch_clusters
+
+
+class MockModule:
+
+    def __init__(self, input_dict):
+        self.params = input_dict
+
+
+class TestSpotinstOceanCloudInfo(unittest.TestCase):
+    """Unit test for the spotinst_ocean_cloud_info module"""
+
+    def test_fetch_clusters(self):
+        """Attach launch specs and nodes grouped by launch spec and instance type"""
+
+        def send_get(url, entity_name, query_params=None):
+            if url.endswith("/launchSpec"):
+                return dict(response=dict(items=[dict(id="ols-1", ocean_id=query_params['oceanId'])]))
+
+            return dict(response=dict(items=[
+                dict(instance_id="i-1", instance_type="m5.large", launch_spec_id="ols-1"),
+                dict(instance_id="i-2", instance_type="m5.large"),
+                dict(instance_id="i-3", instance_type="c5.xlarge", launch_spec_id="ols-1")]))
+
+        client = MagicMock()
+        client.get_all_ocean_cluster.return_value = [dict(id="o-1", name="test_name"), dict(id="o-2", name="other")]
+        client.send_get.side_effect = send_get
+        client.convert_json.side_effect = lambda response, convert: response
+
+        input_dict = dict(id=None, name="test_name", include_launch_specs=True, include_nodes=True, max_workers=4)
+        module = MockModule(input_dict=input_dict)
+        actual_clusters = fetch_clusters(client=client, module=module)
+
+        self.assertEqual(1, len(actual_clusters))
+        self.assertEqual("o-1", actual_clusters[0]['launch_specs'][0]['ocean_id'])
+        self.assertEqual(3, len(actual_clusters[0]['nodes']))
+        self.assertEqual(dict(default=["i-2"], **{"ols-1": ["i-1", "i-3"]}),
+                         actual_clusters[0]['nodes_by_launch_spec'])
+        self.assertEqual({"m5.large": ["i-1", "i-2"], "c5.xlarge": ["i-3"]},
+                         actual_clusters[0]['nodes_by_instance_type'])
@@ -0,0 +1,37 @@
+import unittest
+import sys
+from mock import MagicMock
+sys.modules['spotinst_sdk'] = MagicMock()
+
+from ansible.modules.cloud.spotinst.spotinst_ocean_launch_spec import plan_launch_specs
+
+
+class TestSpotinstOceanLaunchSpec(unittest.TestCase):
+    """Unit test for the spotinst_ocean_launch_spec module"""
+
+    def test_plan_launch_specs(self):
+        """Match desired launch specs by name and pick the action for each one"""
+
+        existing_launch_specs = [
+            dict(id="ols-1", ocean_id="o-1", name="unchanged", image_id="ami-1",
+                 iam_instance_profile=dict(arn="test_arn", name=None), root_volume_size=30),
+            dict(id="ols-2", ocean_id="o-1", name="changed", image_id="ami-1"),
+            dict(id="ols-3", ocean_id="o-1", name="removed", image_id="ami-1"),
+            dict(id="ols-4", ocean_id="o-1", name="unlisted", image_id="ami-1")]
+
+        launch_specs = [
+            dict(name="unchanged", image_id="ami-1", iam_instance_profile=dict(arn="test_arn"), user_data=None),
+            dict(name="changed", image_id="ami-2"),
+            dict(name="removed", state="absent"),
+            dict(name="new", image_id="ami-2", labels=[dict(key="test_key", value="test_value")])]
+
+        actual_plan = plan_launch_specs(ocean_id="o-1", launch_specs=launch_specs,
+                                        existing_launch_specs=existing_launch_specs, purge=True)
+        actions = dict((item['name'], item['action']) for item in actual_plan)
+
+        self.assertEqual(dict(unchanged="unchanged", changed="updated", removed="deleted", new="created",
+                              unlisted="deleted"), actions)
+
+        created = [item for item in actual_plan if item['action'] == "created"][0]
+        self.assertEqual(dict(ocean_id="o-1", name="new", image_id="ami-2",
+                              labels=[dict(key="test_key", value="test_value")]), created['request'])